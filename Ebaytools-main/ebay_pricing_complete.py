@@ -19,8 +19,9 @@ from tkinter import ttk, messagebox, filedialog
 import threading
 import logging
 import os
+import sys
 import statistics
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from typing import List, Dict, Optional, Union
 import webbrowser
 
@@ -31,6 +32,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Sold comps cache shared with the ebay_tools price analyzer
+try:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ebay_tools'))
+    from ebay_tools.core.comps_cache import CompsCache
+except ImportError:
+    CompsCache = None
+
 @dataclass
 class EbayItem:
     """Data class for eBay sold items."""
@@ -70,16 +78,18 @@ class EbayAPIClient:
     Supports both eBay Finding API and web scraping with proper rate limiting.
     """
     
-    def __init__(self, app_id: Optional[str] = None, use_scraping: bool = True):
+    def __init__(self, app_id: Optional[str] = None, use_scraping: bool = True, comps_cache=None):
         """
         Initialize eBay API client.
         
         Args:
             app_id: eBay Developer App ID (get from https://developer.ebay.com)
             use_scraping: Enable web scraping as fallback/primary method
+            comps_cache: CompsCache for reusing recent sold item searches (optional)
         """
         self.app_id = app_id
         self.use_scraping = use_scraping
+        self.comps_cache = comps_cache
         
         # API endpoints
         self.finding_api_url = "https://svcs.ebay.com/services/search/FindingService/v1"
@@ -121,6 +131,23 @@ class EbayAPIClient:
         Returns:
             List of EbayItem objects
         """
+        if self.comps_cache is None:
+            return self._fetch_sold_items_uncached(search_terms, limit, days_back, condition_filter)
+        
+        cached_items = self.comps_cache.get_or_fetch(
+            search_terms,
+            lambda: [asdict(item) for item in
+                     self._fetch_sold_items_uncached(search_terms, limit, days_back, condition_filter)],
+            limit,
+            condition=condition_filter,
+            days_back=days_back,
+            item_format="ebay-item"
+        )
+        return [EbayItem(**item) for item in cached_items]
+    
+    def _fetch_sold_items_uncached(self, search_terms: str, limit: int, days_back: int,
+                                   condition_filter: Optional[str]) -> List[EbayItem]:
+        """Fetch sold items from the API and/or web scraping without the comps cache."""
         items = []
         
         # Try API first if available
@@ -600,8 +627,6 @@ class PriceAnalyzer:
             app_id: eBay Developer App ID
             config: Configuration dictionary
         """
-        self.ebay_client = EbayAPIClient(app_id=app_id, use_scraping=True)
-        
         self.config = {
             'default_markup': 15,           # Percentage markup above median
             'max_results': 20,              # Maximum items to analyze
@@ -610,11 +635,21 @@ class PriceAnalyzer:
             'exclude_words': ['broken', 'for parts', 'not working', 'damaged', 'cracked'],
             'outlier_threshold': 0.3,       # 30% from median for outlier detection
             'confidence_min_items': 5,      # Minimum items for high confidence
-            'price_round_to': 0.99          # Round prices to X.99
+            'price_round_to': 0.99,         # Round prices to X.99
+            'comps_cache_ttl_hours': 24,    # Age after which cached sold items are refreshed
+            'comps_cache_stale_hours': 72   # How long past the TTL stale results may be served
         }
         
         if config:
             self.config.update(config)
+        
+        comps_cache = None
+        if CompsCache is not None:
+            comps_cache = CompsCache(
+                ttl_hours=self.config['comps_cache_ttl_hours'],
+                stale_hours=self.config['comps_cache_stale_hours']
+            )
+        self.ebay_client = EbayAPIClient(app_id=app_id, use_scraping=True, comps_cache=comps_cache)
     
     def analyze_item_pricing(self, search_terms: str, markup_percent: Optional[float] = None,
                            max_items: Optional[int] = None, condition_filter: Optional[str] = None) -> PriceAnalysis:
@@ -1158,8 +1193,22 @@ CONFIDENCE ANALYSIS
             messagebox.showerror("Connection Test", f"❌ Connection failed:\n\n{result}")
     
     def clear_cache(self):
-        """Clear application cache."""
-        messagebox.showinfo("Cache", "Cache cleared (feature not yet implemented)")
+        """Clear the cached sold item searches."""
+        if CompsCache is None:
+            messagebox.showwarning("Cache", "Caching requires the ebay_tools package")
+            return
+        
+        if self.analyzer and self.analyzer.ebay_client.comps_cache is not None:
+            comps_cache = self.analyzer.ebay_client.comps_cache
+            cleared = len(comps_cache.cache)
+            comps_cache.clear()
+        else:
+            comps_cache = CompsCache()
+            cleared = len(comps_cache.cache)
+            comps_cache.clear()
+            comps_cache.close()
+        
+        messagebox.showinfo("Cache", f"Cleared {cleared} cached searches")
     
     def export_results(self):
         """Export analysis results."""
@@ -40,3 +40,4 @@ if __name__ == "__main__":
     print("  - python -m ebay_tools.apps.price_analyzer")
     print("  - python -m ebay_tools.apps.csv_export")
     print("  - python -m ebay_tools.apps.direct_listing")
+    print("  - python -m ebay_tools process <queue.json>")
@@ -0,0 +1,12 @@
+"""
+Command line entry point for eBay Tools.
+
+Allows running the headless tools with ``python -m ebay_tools <command>``.
+"""
+
+import sys
+
+from ebay_tools.apps.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
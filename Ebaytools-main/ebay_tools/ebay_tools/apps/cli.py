@@ -0,0 +1,508 @@
+"""
+eBay Tools command line interface.
+
+This module provides headless entry points for the eBay listing tools:
+- Processing a work queue with an LLM API without the GUI
+- Progress output on stdout, suitable for cron jobs and servers
+- Non-zero exit status when any photo fails to process
+- Provider batch API submission for overnight runs, resumed on restart
+- Worker mode, where several processes or machines share one SQLite queue through leases
+- Items worked on by priority and deadline, as configured in the scheduler settings
+
+Usage:
+    python -m ebay_tools process queue.json
+    python -m ebay_tools.apps.cli process queue.json --no-final
+    python -m ebay_tools process queue.json --batch
+    python -m ebay_tools work queue.sqlite
+    python -m ebay_tools convert queue.json queue.sqlite
+    python -m ebay_tools status queue.sqlite
+"""
+
+import os
+import sys
+import logging
+import argparse
+from typing import List, Optional
+
+from ebay_tools.core.schema import load_queue, save_queue, iter_queue
+from ebay_tools.core.api import LLMApiClient, ApiConfig
+from ebay_tools.core.config import ConfigManager
+from ebay_tools.core.processing import QueueProcessor, find_unprocessed_photos, find_items_awaiting_description
+from ebay_tools.core.journal import open_queue_journal
+from ebay_tools.core.queue_store import QueueStore, is_queue_store_path
+from ebay_tools.core.batch_api import BatchProcessor, get_batch_state_path
+from ebay_tools.core.prefetch import DEFAULT_LOOKAHEAD
+from ebay_tools.core.pipeline import DEFAULT_STAGE_WORKERS
+from ebay_tools.core.ledger import JobLedger, get_ledger_path
+from ebay_tools.core.scheduler import WorkScheduler, SchedulerConfig
+from ebay_tools.core.leasing import (
+    LeasedQueueStore, LeaseWorker, DEFAULT_LEASE_SECONDS, DEFAULT_LEASE_BATCH, DEFAULT_MAX_FAILURES
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# API settings written by the processor GUI
+DEFAULT_API_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_config.json")
+
+# Exit statuses
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+def load_api_config(args: argparse.Namespace) -> ApiConfig:
+    """
+    Build the API configuration from the config file and command line overrides.
+
+    The processor's api_config.json is used when present, otherwise the API
+    section of the shared ~/.ebay_tools configuration.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        API configuration
+    """
+    config_path = args.config or DEFAULT_API_CONFIG_PATH
+
+    if os.path.exists(config_path):
+        config = ApiConfig.load_from_file(config_path)
+    elif args.config:
+        raise FileNotFoundError(f"API config file not found: {config_path}")
+    else:
+        config_manager = ConfigManager()
+        config_manager.load()
+        api_settings = config_manager.get_api_config()
+        config = ApiConfig(
+            api_key=api_settings.get("key", ""),
+            api_url=api_settings.get("url", ""),
+            delay=float(api_settings.get("delay", 2.0)),
+            max_retries=int(api_settings.get("max_retries", 3)),
+            timeout=int(api_settings.get("timeout", 60)),
+            max_concurrent=int(api_settings.get("max_concurrent", 1))
+        )
+
+    # Command line options take precedence
+    if args.api_key:
+        config.api_key = args.api_key
+    if args.api_url:
+        config.api_url = args.api_url
+    if args.delay is not None:
+        config.delay = args.delay
+    if args.max_concurrent is not None:
+        config.max_concurrent = max(1, args.max_concurrent)
+
+    return config
+
+
+def load_checked_api_config(args: argparse.Namespace) -> Optional[ApiConfig]:
+    """
+    Load the API configuration, printing an error if it is unusable.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        API configuration, or None if it could not be loaded or lacks a key or URL
+    """
+    try:
+        config = load_api_config(args)
+    except Exception as e:
+        print(f"Error loading API config: {str(e)}", file=sys.stderr)
+        return None
+
+    if not config.api_key or not config.api_url:
+        print("Error: API key or URL is missing. Use --api-key/--api-url or configure the processor first.",
+              file=sys.stderr)
+        return None
+
+    return config
+
+
+def load_scheduler(args: argparse.Namespace) -> Optional[WorkScheduler]:
+    """
+    Build the work scheduler from the scheduler section of the shared ~/.ebay_tools configuration.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Work scheduler, or None if items are processed in queue order
+    """
+    if args.queue_order:
+        return None
+
+    config_manager = ConfigManager()
+    config_manager.load()
+    settings = config_manager.get_scheduler_config()
+    if not settings.get("enabled", True):
+        return None
+    return WorkScheduler(SchedulerConfig.from_dict(settings))
+
+
+def print_progress(current: int, total: int, message: str) -> None:
+    """Print a progress line to stdout."""
+    print(f"[{current}/{total}] {message}", flush=True)
+
+
+def print_usage_stats(api_client: LLMApiClient) -> None:
+    """Print connection reuse and token usage of an API client."""
+    connections = api_client.get_connection_stats()
+    if connections["requests"]:
+        print(f"Connections: {connections['connections_opened']} opened for {connections['requests']} requests "
+              f"({connections['reuse_rate']:.0%} reused, {connections['protocol']})")
+
+    usage = api_client.get_token_usage()
+    if usage["responses"]:
+        print(f"Tokens: {usage['input_tokens']} input, {usage['cached_input_tokens']} read from the prompt cache "
+              f"({usage['cache_hit_rate']:.0%}), {usage['output_tokens']} output")
+
+
+def process_command(args: argparse.Namespace) -> int:
+    """
+    Process all unprocessed photos in a queue file.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Exit status
+    """
+    if not os.path.exists(args.queue):
+        print(f"Error: queue file not found: {args.queue}", file=sys.stderr)
+        return EXIT_USAGE
+
+    config = load_checked_api_config(args)
+    if not config:
+        return EXIT_USAGE
+
+    queue = load_queue(args.queue)
+    output_path = args.output or args.queue
+
+    unprocessed_photos = find_unprocessed_photos(queue)
+    # Descriptions an interrupted or failed run left behind are generated before the new photos
+    awaiting_description = []
+    if not (args.no_final or args.item_mode):
+        awaiting_description = find_items_awaiting_description(queue)
+    if not unprocessed_photos and not awaiting_description:
+        print(f"No unprocessed photos found in {args.queue}")
+        return EXIT_OK
+
+    print(f"Processing {len(unprocessed_photos)} photos from {len(queue)} items in {args.queue}")
+    if awaiting_description:
+        print(f"Generating {len(awaiting_description)} final descriptions left by an earlier run")
+
+    # Journal each processed item instead of rewriting the whole queue
+    if output_path != args.queue:
+        save_queue(queue, output_path)
+    journal = open_queue_journal(output_path, compact_every=args.compact_every)
+
+    api_client = LLMApiClient(config)
+    if args.batch:
+        if args.item_mode:
+            print("Note: --item-mode is not used with --batch, photos are sent one per request")
+        try:
+            processor = BatchProcessor(
+                api_client,
+                get_batch_state_path(output_path),
+                generate_final=not args.no_final,
+                log=print,
+                save_callback=lambda item_idx: journal.record(queue, [item_idx]),
+                poll_interval=args.poll_interval,
+                structured_output=args.structured
+            )
+        except Exception as e:
+            api_client.close()
+            print(f"Error: {str(e)}", file=sys.stderr)
+            return EXIT_USAGE
+    else:
+        # Record the run so a crashed or interrupted run resumes without resending answered requests
+        ledger = None if args.no_ledger else JobLedger(get_ledger_path(output_path))
+        processor = QueueProcessor(
+            api_client,
+            generate_final=not args.no_final,
+            item_mode=args.item_mode,
+            structured_output=args.structured,
+            log=print,
+            save_callback=lambda item_idx: journal.record(queue, [item_idx]),
+            prefetch=args.prefetch,
+            final_workers=args.final_workers,
+            ledger=ledger,
+            scheduler=load_scheduler(args)
+        )
+
+    try:
+        result = processor.run(queue, unprocessed_photos, report_progress=print_progress)
+    except KeyboardInterrupt:
+        journal.compact(queue)
+        print(f"Interrupted, progress saved to {output_path}", file=sys.stderr)
+        if args.batch:
+            print("Submitted batches keep running; run the same command again to collect their results",
+                  file=sys.stderr)
+        return EXIT_INTERRUPTED
+    finally:
+        if args.batch:
+            processor.close()
+        elif processor.ledger:
+            processor.ledger.close()
+        api_client.close()
+
+    journal.compact(queue)
+
+    elapsed = result["elapsed_time"]
+    print(f"Processing completed: {result['processed']}/{result['total']} photos processed, "
+          f"{result['failed']} failed in {int(elapsed // 60)}m {int(elapsed % 60)}s")
+    if "described" in result:
+        print(f"Final descriptions: {result['described']} generated, {result['description_failed']} failed")
+    elif result.get("description_failed"):
+        print(f"Final descriptions: {result['description_failed']} failed, the items are left unprocessed")
+    if "ledger" in result:
+        summary = result["ledger"]
+        print(f"Run {result['run_id']}: {summary['done']}/{summary['tasks']} tasks done "
+              f"({summary['replayed']} from recorded responses), {summary['failed']} failed, "
+              f"{summary['requests']} requests sent, {summary['cached']} answered from cache")
+    print(f"Queue saved to {output_path}")
+    print_usage_stats(api_client)
+
+    # Items whose final description failed are left unprocessed
+    return EXIT_FAILED if result["failed"] or result.get("description_failed") else EXIT_OK
+
+
+def work_command(args: argparse.Namespace) -> int:
+    """
+    Process a shared SQLite queue store together with other workers.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Exit status
+    """
+    if not is_queue_store_path(args.queue):
+        print(f"Error: workers need an SQLite queue store; convert the queue first, "
+              f"e.g. convert {args.queue} queue.sqlite", file=sys.stderr)
+        return EXIT_USAGE
+
+    if not os.path.exists(args.queue):
+        print(f"Error: queue file not found: {args.queue}", file=sys.stderr)
+        return EXIT_USAGE
+
+    config = load_checked_api_config(args)
+    if not config:
+        return EXIT_USAGE
+
+    scheduler = load_scheduler(args)
+    store = LeasedQueueStore(args.queue, worker_id=args.worker_id, lease_seconds=args.lease_seconds,
+                             max_failures=args.max_failures, shared_filesystem=args.network_share,
+                             scheduler=scheduler)
+    worker = LeaseWorker(store, batch_size=args.lease_batch, log=print)
+    api_client = LLMApiClient(config)
+    processor = QueueProcessor(
+        api_client,
+        generate_final=not args.no_final,
+        item_mode=args.item_mode,
+        structured_output=args.structured,
+        log=print,
+        save_callback=worker.save_item,
+        prefetch=args.prefetch,
+        final_workers=args.final_workers,
+        scheduler=scheduler
+    )
+
+    print(f"Worker {store.worker_id} processing {args.queue}")
+    try:
+        result = worker.run(processor, report_progress=print_progress)
+    except KeyboardInterrupt:
+        print("Interrupted, leased items returned to the pool", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    finally:
+        api_client.close()
+        store.close()
+
+    elapsed = result["elapsed_time"]
+    print(f"Worker finished: {result['processed']}/{result['total']} photos of {result['items']} items processed "
+          f"in {result['batches']} batches, {result['failed']} failed in {int(elapsed // 60)}m {int(elapsed % 60)}s")
+    print_usage_stats(api_client)
+
+    return EXIT_FAILED if result["failed"] else EXIT_OK
+
+
+def convert_command(args: argparse.Namespace) -> int:
+    """
+    Convert a queue between the JSON and SQLite formats.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Exit status
+    """
+    if not os.path.exists(args.source):
+        print(f"Error: queue file not found: {args.source}", file=sys.stderr)
+        return EXIT_USAGE
+
+    queue = load_queue(args.source)
+    save_queue(queue, args.destination)
+    print(f"Converted {len(queue)} items from {args.source} to {args.destination}")
+    return EXIT_OK
+
+
+def status_command(args: argparse.Namespace) -> int:
+    """
+    Print processing and pricing status counts of a queue.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Exit status
+    """
+    if not os.path.exists(args.queue):
+        print(f"Error: queue file not found: {args.queue}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if is_queue_store_path(args.queue):
+        with QueueStore(args.queue) as store:
+            counts = store.get_status_counts()
+    else:
+        # Stream the items so large queues are never fully loaded
+        counts = dict.fromkeys(("items", "processed_items", "priced_items",
+                                "photos_to_process", "processed_photos"), 0)
+        for item in iter_queue(args.queue, normalize=False):
+            photos = item.get("photos", [])
+            selected = [idx for idx in item.get("process_photos", []) if idx < len(photos)]
+            counts["items"] += 1
+            counts["processed_items"] += 1 if item.get("processed", False) else 0
+            counts["priced_items"] += 1 if item.get("start_price") else 0
+            counts["photos_to_process"] += len(item.get("process_photos", []))
+            counts["processed_photos"] += sum(1 for idx in selected if photos[idx].get("processed", False))
+
+    print(f"Queue: {counts['items']} items ({counts['processed_items']} processed, {counts['priced_items']} priced), "
+          f"{counts['processed_photos']}/{counts['photos_to_process']} photos processed")
+    return EXIT_OK
+
+
+def add_processing_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the API and processing options shared by the process and work commands.
+
+    Args:
+        parser: Command parser to add the options to
+    """
+    parser.add_argument("--config", help="API config JSON file (defaults to the processor's api_config.json)")
+    parser.add_argument("--api-key", help="API key (overrides the config file)")
+    parser.add_argument("--api-url", help="API URL (overrides the config file)")
+    parser.add_argument("--delay", type=float, help="Initial delay between requests in seconds (adapted to the API's rate limits)")
+    parser.add_argument("--max-concurrent", type=int,
+                        help="Photos or items processed at once (overrides the config file)")
+    parser.add_argument("--no-final", action="store_true",
+                        help="Don't generate a final description when an item is complete")
+    parser.add_argument("--item-mode", action="store_true",
+                        help="Send all photos of an item in one request")
+    parser.add_argument("--structured", action="store_true",
+                        help="Request listings as validated JSON instead of free text")
+    parser.add_argument("--prefetch", type=int, default=DEFAULT_LOOKAHEAD,
+                        help="Photos read and encoded ahead of the request in flight "
+                             f"(default: {DEFAULT_LOOKAHEAD}, 0 disables prefetching)")
+    parser.add_argument("--final-workers", type=int, default=DEFAULT_STAGE_WORKERS,
+                        help="Threads generating final descriptions while photos are processed "
+                             f"(default: {DEFAULT_STAGE_WORKERS}, 0 generates them between photos)")
+    parser.add_argument("--queue-order", action="store_true",
+                        help="Work on items in queue order instead of by priority and deadline")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line argument parser.
+
+    Returns:
+        Argument parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="ebay-tools",
+        description="eBay listing tools command line interface"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    process_parser = subparsers.add_parser(
+        "process",
+        help="Process the unprocessed photos of a work queue with the LLM API"
+    )
+    process_parser.add_argument("queue", help="Work queue JSON file")
+    add_processing_arguments(process_parser)
+    process_parser.add_argument("--no-ledger", action="store_true",
+                                help="Don't record the run in the job ledger next to the queue file")
+    process_parser.add_argument("--output", help="Write the processed queue here instead of updating the input")
+    process_parser.add_argument("--compact-every", type=int, default=200,
+                                help="Rewrite the queue file after this many journaled item saves (default: 200)")
+    process_parser.add_argument("--batch", action="store_true",
+                                help="Submit the photos as a provider batch job (Anthropic or OpenAI API URLs only); "
+                                     "rerunning the command resumes an interrupted batch")
+    process_parser.add_argument("--poll-interval", type=float, default=60.0,
+                                help="Seconds between batch status checks with --batch (default: 60)")
+    process_parser.add_argument("-v", "--verbose", action="store_true", help="Show debug logging")
+    process_parser.set_defaults(func=process_command)
+
+    work_parser = subparsers.add_parser(
+        "work",
+        help="Process a shared SQLite queue together with other workers, leasing a few items at a time"
+    )
+    work_parser.add_argument("queue", help="SQLite queue store (.sqlite/.db) shared by the workers")
+    add_processing_arguments(work_parser)
+    work_parser.add_argument("--lease-batch", type=int, default=DEFAULT_LEASE_BATCH,
+                             help=f"Items leased at a time (default: {DEFAULT_LEASE_BATCH})")
+    work_parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                             help="Seconds before the items of a worker that stopped renewing return to the pool "
+                                  f"(default: {DEFAULT_LEASE_SECONDS:.0f})")
+    work_parser.add_argument("--max-failures", type=int, default=DEFAULT_MAX_FAILURES,
+                             help=f"Failed or expired leases after which an item is skipped (default: {DEFAULT_MAX_FAILURES})")
+    work_parser.add_argument("--worker-id", help="Name of this worker (defaults to host, process ID and a random suffix)")
+    work_parser.add_argument("--network-share", action="store_true",
+                             help="The queue is shared with workers on other machines over a network filesystem")
+    work_parser.add_argument("-v", "--verbose", action="store_true", help="Show debug logging")
+    work_parser.set_defaults(func=work_command)
+
+    convert_parser = subparsers.add_parser(
+        "convert",
+        help="Convert a queue between JSON and SQLite (.sqlite/.db) formats"
+    )
+    convert_parser.add_argument("source", help="Queue file to read")
+    convert_parser.add_argument("destination", help="Queue file to write")
+    convert_parser.add_argument("-v", "--verbose", action="store_true", help="Show debug logging")
+    convert_parser.set_defaults(func=convert_command)
+
+    status_parser = subparsers.add_parser("status", help="Show processing and pricing status of a queue")
+    status_parser.add_argument("queue", help="Queue file (JSON or SQLite)")
+    status_parser.add_argument("-v", "--verbose", action="store_true", help="Show debug logging")
+    status_parser.set_defaults(func=status_command)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the command line interface.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        Exit status
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not getattr(args, "func", None):
+        parser.print_help()
+        return EXIT_USAGE
+
+    # Keep stdout for progress output unless debugging was requested
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.WARNING)
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,7 +11,7 @@ import json
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import sys
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 # Add parent directory to path to allow direct script execution
 if __name__ == "__main__":
@@ -43,7 +43,7 @@ except ImportError:
         window.geometry(f'+{x}+{y}')
 
 # Import CSV and Excel export functionality
-from ebay_csv_export import export_items_to_csv, export_items_to_excel, load_json_queue
+from ebay_csv_export import export_items_to_csv, export_items_to_excel, load_json_queue, iter_json_queue
 
 class EbayExportGUI:
     """GUI for exporting eBay listing data from JSON to CSV and Excel formats."""
@@ -178,14 +178,13 @@ class EbayExportGUI:
             
             # Try to load and display info about the file
             try:
-                items = load_json_queue(file_path)
+                item_count, processed_count = count_queue_items(file_path)
                 
                 # Update information display
-                self.update_info_text(f"Loaded {len(items)} items from {os.path.basename(file_path)}\n\n")
+                self.update_info_text(f"Loaded {item_count} items from {os.path.basename(file_path)}\n\n")
                 
                 # Add information about items
-                processed_count = sum(1 for item in items if item.get("processed", False))
-                unprocessed_count = len(items) - processed_count
+                unprocessed_count = item_count - processed_count
                 self.append_info_text(f"Processed items: {processed_count}\n")
                 self.append_info_text(f"Unprocessed items: {unprocessed_count}\n")
                 
@@ -321,26 +320,24 @@ class EbayExportGUI:
                     return
         
         try:
-            # Load the items
-            items = load_json_queue(input_file)
-            
             # Show a progress indicator
             export_format = self.export_format_var.get()
             format_name = "Excel" if export_format == "excel" else "CSV"
-            self.status_bar.update(f"Exporting {len(items)} items to {format_name}...")
+            self.status_bar.update(f"Exporting items to {format_name}...")
             self.root.update_idletasks()
             
             # Export based on selected format
             if export_format == "excel":
                 success, message = export_items_to_excel(
-                    items,
+                    load_json_queue(input_file),
                     output_file,
                     default_values=default_values,
                     description_dir=desc_dir
                 )
             else:
+                # CSV rows are written from a stream of items
                 success, message = export_items_to_csv(
-                    items,
+                    iter_json_queue(input_file),
                     output_file,
                     default_values=default_values,
                     description_dir=desc_dir
@@ -362,6 +359,25 @@ class EbayExportGUI:
             messagebox.showerror("Error", error_message)
 
 
+def count_queue_items(file_path: str) -> Tuple[int, int]:
+    """
+    Count the items of a queue file without keeping them in memory.
+    
+    Args:
+        file_path: Path to the JSON file
+        
+    Returns:
+        Tuple of (total items, processed items)
+    """
+    item_count = 0
+    processed_count = 0
+    for item in iter_json_queue(file_path):
+        item_count += 1
+        if item.get("processed", False):
+            processed_count += 1
+    return item_count, processed_count
+
+
 def main():
     """Main function to start the application."""
     root = tk.Tk()
@@ -375,10 +391,9 @@ def main():
             app.input_file_var.set(input_file)
             # Try to load file info
             try:
-                items = load_json_queue(input_file)
-                app.update_info_text(f"Loaded {len(items)} items from {os.path.basename(input_file)}\n\n")
-                processed_count = sum(1 for item in items if item.get("processed", False))
-                unprocessed_count = len(items) - processed_count
+                item_count, processed_count = count_queue_items(input_file)
+                app.update_info_text(f"Loaded {item_count} items from {os.path.basename(input_file)}\n\n")
+                unprocessed_count = item_count - processed_count
                 app.append_info_text(f"Processed items: {processed_count}\n")
                 app.append_info_text(f"Unprocessed items: {unprocessed_count}\n")
             except Exception:
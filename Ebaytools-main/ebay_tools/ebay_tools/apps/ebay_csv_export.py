@@ -10,13 +10,13 @@ import os
 import csv
 import json
 import sys
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator
 from datetime import datetime
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from core.schema import EbayItemSchema, load_queue
+from core.schema import EbayItemSchema, load_queue, iter_queue
 
 # Excel support (optional, graceful fallback if not available)
 try:
@@ -48,15 +48,31 @@ def load_json_queue(file_path: str) -> List[Dict[str, Any]]:
     return load_queue(file_path)
 
 
-def export_items_to_csv(items: List[Dict[str, Any]], 
+def iter_json_queue(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the items of a queue file without loading it all at once.
+    
+    Args:
+        file_path: Path to the JSON file
+        
+    Yields:
+        Item dictionaries
+    """
+    return iter_queue(file_path)
+
+
+def export_items_to_csv(items: Iterable[Dict[str, Any]], 
                        output_file: str, 
                        default_values: Dict[str, str] = None,
                        description_dir: Optional[str] = None) -> Tuple[bool, str]:
     """
     Export items to CSV format suitable for eBay bulk upload.
     
+    Items are consumed in a single pass, so a streaming iterator (see
+    iter_json_queue) can be passed for queues that don't fit in memory.
+    
     Args:
-        items: List of item dictionaries to export
+        items: Item dictionaries to export (list or iterator)
         output_file: Path to output CSV file
         default_values: Default values for CSV fields
         description_dir: Directory to save HTML description files
@@ -65,17 +81,24 @@ def export_items_to_csv(items: List[Dict[str, Any]],
         Tuple of (success: bool, message: str)
     """
     try:
-        if not items:
-            return False, "No items to export"
-        
         if default_values is None:
             default_values = {}
         
-        # Convert all items to CSV format
+        if description_dir:
+            os.makedirs(description_dir, exist_ok=True)
+        
+        # Convert all items to CSV format, writing descriptions as we go so
+        # only the CSV rows are kept in memory
         csv_rows = []
+        created_descriptions = 0
         for item in items:
             row = EbayItemSchema.to_csv_row(item, default_values)
             csv_rows.append(row)
+            if description_dir and _create_html_description(item, description_dir):
+                created_descriptions += 1
+        
+        if not csv_rows:
+            return False, "No items to export"
         
         # Get all unique field names from all rows
         all_fields = set()
@@ -103,16 +126,8 @@ def export_items_to_csv(items: List[Dict[str, Any]],
             writer.writeheader()
             writer.writerows(csv_rows)
         
-        # Create HTML description files if requested
-        created_descriptions = 0
-        if description_dir:
-            os.makedirs(description_dir, exist_ok=True)
-            for item in items:
-                if _create_html_description(item, description_dir):
-                    created_descriptions += 1
-        
         # Prepare success message
-        message = f"Successfully exported {len(items)} items to {output_file}"
+        message = f"Successfully exported {len(csv_rows)} items to {output_file}"
         if created_descriptions > 0:
             message += f"\nCreated {created_descriptions} HTML description files in {description_dir}"
         
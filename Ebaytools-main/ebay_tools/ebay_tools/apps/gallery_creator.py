@@ -565,16 +565,18 @@ Please create a description that:
 
 Format the response as plain text suitable for a classified ad."""
 
-            # Process photos and get description
-            # Here we would normally call the API with the photos
-            # For now, using a placeholder
-            description = f"""[AI-generated description based on {len(photos)} photos]
+            # Send the photos with the prompt, showing the text as it streams in
+            photo_paths = [photo for photo in photos if os.path.exists(photo)]
 
-This {item_data.get('title', 'item')} is available for sale. Based on the provided images, it appears to be in {item_data.get('condition', 'good')} condition.
+            def on_delta(delta, text):
+                self.root.after(0, self._show_partial_description, text)
 
-[Additional details would be generated from actual photo analysis]
-
-Serious inquiries only. {item_data.get('contact_info', 'Contact for more information')}."""
+            if len(photo_paths) > 1 and self.api_client.supports_multi_image():
+                description = self.api_client.process_item(photo_paths, prompt, on_delta=on_delta)
+            elif photo_paths:
+                description = self.api_client.process_photo(photo_paths[0], prompt, on_delta=on_delta)
+            else:
+                description = self.api_client.generate_text(prompt, on_delta=on_delta)
 
             # Update UI in main thread
             self.root.after(0, self._update_description, description)
@@ -584,6 +586,13 @@ Serious inquiries only. {item_data.get('contact_info', 'Contact for more informa
         finally:
             self.root.after(0, self._stop_progress)
             
+    def _show_partial_description(self, text):
+        """Show a description while it is being generated (main thread)"""
+        self.description_text.delete(1.0, tk.END)
+        self.description_text.insert(1.0, text)
+        self.description_text.see(tk.END)
+        self.status_bar.set_status("Generating description...")
+
     def _update_description(self, description):
         """Update description in UI (main thread)"""
         self.description_text.delete(1.0, tk.END)
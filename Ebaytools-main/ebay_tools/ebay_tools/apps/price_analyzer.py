@@ -21,9 +21,11 @@ import csv
 import os
 import string
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     from bs4 import BeautifulSoup
 except ImportError:
     print("Required packages not found. Install with: pip install requests beautifulsoup4")
@@ -31,10 +33,14 @@ except ImportError:
 # Import from ebay_tools package
 try:
     from ebay_tools.core import schema, config, exceptions
+    from ebay_tools.core.api import TokenBucket
+    from ebay_tools.core.comps_cache import CompsCache
     from ebay_tools.utils import ui_utils, background_utils
 except ImportError:
     # For standalone use
     print("Running in standalone mode without ebay_tools package")
+    TokenBucket = None
+    CompsCache = None
 
 
 class eBaySearchURLGenerator:
@@ -525,6 +531,14 @@ class PriceAnalyzer:
         self.research_manager = ResearchDataManager()
         self.search_extractor = SmartSearchExtractor()
         
+        # Pooled keep-alive session and per-host rate limiters shared by all workers
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._host_limiters = {}
+        self._comps_cache = None
+        # Lower priority strategy searches still running after analyze_item returned
+        self._strategy_futures = set()
+        
     def _load_config(self, config_file=None):
         """Load configuration from file or use defaults."""
         default_config = {
@@ -533,7 +547,13 @@ class PriceAnalyzer:
             "min_results": 3,      # Minimum results needed for analysis
             "days_back": 90,       # How far back to look for sold items
             "exclude_words": ["broken", "for parts", "not working", "damaged"],
-            "price_threshold": 0.3  # Threshold for excluding outliers (30% from median)
+            "price_threshold": 0.3,  # Threshold for excluding outliers (30% from median)
+            "max_concurrent": 4,   # Items priced (and strategies tried) in parallel
+            "requests_per_second": 1.0,  # Default per-host request rate
+            "host_rate_limits": {},      # Per-host overrides, e.g. {"serpapi.com": 0.5}
+            "comps_cache": True,         # Reuse sold comps for repeated searches
+            "comps_cache_ttl_hours": 24,     # Age after which cached comps are refreshed
+            "comps_cache_stale_hours": 72    # How long past the TTL stale comps may be served
         }
         
         if config_file:
@@ -577,37 +597,177 @@ class PriceAnalyzer:
         if not search_strategies:
             raise ValueError("Search terms or item data must be provided")
         
-        # Try each search strategy until we find results
-        best_result = None
+        # Evaluate the strategies in parallel, but accept results in priority
+        # order so the outcome matches trying them one after another
+        first_result = None
+        listings_result = None
         tried_strategies = []
+        workers = max(1, min(len(search_strategies), int(self.config.get("max_concurrent", 1))))
         
-        for strategy in search_strategies:
-            search_terms = strategy['terms']
-            tried_strategies.append({
-                'terms': search_terms,
-                'strategy': strategy['strategy'],
-                'confidence': strategy['confidence']
-            })
-            
-            result = self._analyze_with_search_terms(search_terms, markup_percent, sample_limit, strategy)
-            
-            if result['success'] or (result.get('current_items') and len(result['current_items']) > 0):
-                # Found results with this strategy
-                result['search_strategies_tried'] = tried_strategies
-                result['successful_strategy'] = strategy
-                return result
+        # Not a with block: leaving it would wait for the lower priority searches still running
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="PriceStrategy")
+        futures = []
+        try:
+            futures = [
+                executor.submit(self._analyze_with_search_terms, strategy['terms'], markup_percent, sample_limit, strategy)
+                for strategy in search_strategies
+            ]
             
-            # If this strategy didn't work, try the next one
-            print(f"Strategy '{strategy['strategy']}' with terms '{search_terms}' returned no results, trying next...")
+            for strategy, future in zip(search_strategies, futures):
+                search_terms = strategy['terms']
+                tried_strategies.append({
+                    'terms': search_terms,
+                    'strategy': strategy['strategy'],
+                    'confidence': strategy['confidence']
+                })
+                
+                result = future.result()
+                if first_result is None:
+                    first_result = result
+                
+                if result['success']:
+                    # Enough sold items (min_results) with this strategy, the others are not needed
+                    result['search_strategies_tried'] = list(tried_strategies)
+                    result['successful_strategy'] = strategy
+                    return result
+                
+                if listings_result is None and result.get('current_items'):
+                    listings_result = (result, strategy)
+                
+                # If this strategy didn't work, use the next one
+                print(f"Strategy '{strategy['strategy']}' with terms '{search_terms}' returned no results, trying next...")
+        finally:
+            # Searches not started yet are dropped; running ones finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+            running = [future for future in futures if not future.done()]
+            with self._session_lock:
+                self._strategy_futures.update(running)
+            for future in running:
+                future.add_done_callback(self._strategy_finished)
+        
+        # Without enough sold items, current listings of the highest priority strategy are the next best thing
+        if listings_result:
+            result, strategy = listings_result
+            result['search_strategies_tried'] = tried_strategies
+            result['successful_strategy'] = strategy
+            return result
+        
+        # If no strategies worked, return the first attempt with all tried strategies
+        first_result['search_strategies_tried'] = tried_strategies
+        first_result['message'] = f"No results found with {len(tried_strategies)} search strategies. Consider manual research."
+        
+        return first_result
+    
+    def iter_price_batch(self, items, max_workers=None, check_cancelled=None):
+        """
+        Price several items concurrently, yielding results as they complete.
         
-        # If no strategies worked, return the last attempt with all tried strategies
-        if best_result is None:
-            best_result = self._analyze_with_search_terms(search_strategies[0]['terms'], markup_percent, sample_limit, search_strategies[0])
+        At most max_workers items are analyzed at once; all of them share the
+        analyzer's pooled session and per-host rate limits. When check_cancelled
+        returns True no new items are started and in-flight ones are drained.
         
-        best_result['search_strategies_tried'] = tried_strategies
-        best_result['message'] = f"No results found with {len(tried_strategies)} search strategies. Consider manual research."
+        Args:
+            items: List of (key, search terms) tuples
+            max_workers: Number of items priced in parallel (defaults to config max_concurrent)
+            check_cancelled: Optional function returning True when the batch should stop
+            
+        Yields:
+            Tuples of (key, search terms, results or exception) in completion order
+        """
+        workers = max(1, int(max_workers or self.config.get("max_concurrent", 1)))
+        pending = iter(items)
+        in_flight = {}
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="PriceBatch") as executor:
+            while True:
+                # Keep the pool full unless cancellation was requested
+                while len(in_flight) < workers and not (check_cancelled and check_cancelled()):
+                    try:
+                        key, search_terms = next(pending)
+                    except StopIteration:
+                        break
+                    future = executor.submit(self.analyze_item, search_terms)
+                    in_flight[future] = (key, search_terms)
+                
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, search_terms = in_flight.pop(future)
+                    try:
+                        yield key, search_terms, future.result()
+                    except Exception as e:
+                        yield key, search_terms, e
+    
+    def _get_session(self):
+        """Get the pooled keep-alive HTTP session, creating it on first use."""
+        with self._session_lock:
+            if self._session is None:
+                pool_size = max(1, int(self.config.get("max_concurrent", 1))) * 2
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = self.user_agent
+                self._session = session
+            return self._session
+    
+    def _get_host_limiter(self, host):
+        """Get the rate limiter for a host."""
+        with self._session_lock:
+            if host not in self._host_limiters:
+                rate = self.config.get("host_rate_limits", {}).get(host, self.config.get("requests_per_second", 0))
+                self._host_limiters[host] = TokenBucket(float(rate)) if TokenBucket and rate else None
+            return self._host_limiters[host]
+    
+    def _http_get(self, url, params=None, timeout=10):
+        """
+        Perform a rate-limited GET through the pooled session.
         
-        return best_result
+        Args:
+            url: Request URL
+            params: Query parameters
+            timeout: Request timeout in seconds
+            
+        Returns:
+            requests.Response
+        """
+        limiter = self._get_host_limiter(urllib.parse.urlparse(url).netloc)
+        if limiter:
+            limiter.acquire()
+        return self._get_session().get(url, params=params, timeout=timeout)
+    
+    def _get_comps_cache(self):
+        """Get the shared sold comps cache, or None if caching is disabled."""
+        if CompsCache is None or not self.config.get("comps_cache", True):
+            return None
+        with self._session_lock:
+            if self._comps_cache is None:
+                self._comps_cache = CompsCache(
+                    ttl_hours=float(self.config.get("comps_cache_ttl_hours", 24)),
+                    stale_hours=float(self.config.get("comps_cache_stale_hours", 72))
+                )
+            return self._comps_cache
+    
+    def _strategy_finished(self, future):
+        """Forget a background strategy search once it has finished."""
+        with self._session_lock:
+            self._strategy_futures.discard(future)
+    
+    def close(self):
+        """Wait for background strategy searches, then close pooled connections and the comps cache."""
+        # They would otherwise reopen the session and use the closed comps cache
+        with self._session_lock:
+            running = list(self._strategy_futures)
+        wait(running)
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._comps_cache is not None:
+                self._comps_cache.close()
+                self._comps_cache = None
     
     def _analyze_with_search_terms(self, search_terms, markup_percent, sample_limit, strategy_info):
         """
@@ -719,8 +879,24 @@ class PriceAnalyzer:
         2. eBay Terapeak (requires seller account)
         3. Third-party services like SerpApi (paid, legal)
         4. Manual verification via eBay sold listings search
+        
+        Results are served from the comps cache when the same (or an
+        equivalent) search was made recently.
         """
+        comps_cache = self._get_comps_cache()
+        if comps_cache is not None:
+            return comps_cache.get_or_fetch(
+                search_terms,
+                lambda: self._fetch_real_sold_items_uncached(search_terms, limit),
+                limit,
+                days_back=self.config.get("days_back", 90),
+                item_format="price-analyzer"
+            )
         
+        return self._fetch_real_sold_items_uncached(search_terms, limit)
+    
+    def _fetch_real_sold_items_uncached(self, search_terms, limit=10):
+        """Fetch real sold items data from the available services."""
         # Try SerpApi integration (example implementation)
         try:
             return self._try_serpapi_integration(search_terms, limit)
@@ -765,7 +941,7 @@ class PriceAnalyzer:
                 'num': min(limit, 100)
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self._http_get(url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -26,6 +26,9 @@ from ebay_tools.core.schema import EbayItemSchema, load_queue, save_queue
 from ebay_tools.core.api import LLMApiClient, ApiConfig, ApiError
 from ebay_tools.core.config import ConfigManager
 from ebay_tools.core.exceptions import EbayToolsError
+from ebay_tools.core.processing import (
+    PHOTO_SYSTEM_PROMPT, LISTING_SYSTEM_PROMPT, build_photo_prompt, build_final_description_prompt
+)
 
 # Import utility modules
 from ebay_tools.utils.image_utils import open_image_with_orientation, create_thumbnail
@@ -1115,54 +1118,8 @@ class EbayLLMProcessor:
         return False
     
     def build_photo_prompt(self, item, photo_data):
-        """Build an enhanced prompt for photo processing."""
-        # Extract item details
-        item_title = item.get('temp_title', '')
-        item_sku = item.get('sku', '')
-        item_notes = item.get('notes', '')
-        item_category = item.get('category', '')
-        
-        # Start with comprehensive base prompt
-        base_prompt = f"Describe this eBay item in detail: {item_title} (SKU: {item_sku})."
-        
-        # Add item category if available
-        if item_category:
-            base_prompt += f" Category: {item_category}."
-            
-        # Add condition if available
-        if item.get('condition'):
-            condition_code = item.get('condition')
-            condition_desc = EbayItemSchema.CONDITION_MAP.get(condition_code, condition_code)
-            base_prompt += f" Condition: {condition_desc}."
-        
-        # Add condition description if available
-        if item.get('conditionDescription'):
-            base_prompt += f" Condition details: {item.get('conditionDescription')}."
-            
-        # Add item notes if available
-        if item_notes and item_notes != "Optional notes about this item":
-            base_prompt += f" Additional notes: {item_notes}."
-        
-        # Add photo context if available
-        if photo_data.get("context"):
-            base_prompt += f" This specific photo shows: {photo_data.get('context')}"
-        
-        # Make it eBay specific with detailed instructions
-        prompt = base_prompt + """
-
-This will be used for an eBay listing. Please provide:
-1. A detailed description of what you see in this specific photo
-2. Item condition details visible in this photo
-3. Any important measurements, features, or specifications visible
-4. Any defects, wear, or issues visible in this photo
-5. Brand information if visible
-6. Model information if visible
-
-Format your response as a cohesive paragraph that would be useful for a buyer. 
-Focus on facts visible in this image, not speculation.
-"""
-        
-        return prompt
+        """Build an enhanced prompt for photo processing (send with PHOTO_SYSTEM_PROMPT)."""
+        return build_photo_prompt(item, photo_data)
     
     def process_current_photo(self):
         """Process the current photo using the API client."""
@@ -1214,7 +1171,7 @@ Focus on facts visible in this image, not speculation.
             self.log(f"Processing photo: {os.path.basename(photo_path)}")
             
             # Process the photo using the API client
-            response = self.api_client.process_photo(photo_path, prompt)
+            response = self.api_client.process_photo(photo_path, prompt, system=PHOTO_SYSTEM_PROMPT)
             
             # Update photo data with result
             photo_data["processed"] = True
@@ -1263,51 +1220,8 @@ Focus on facts visible in this image, not speculation.
             return False
     
     def build_final_description_prompt(self, item, descriptions):
-        """Build a prompt for generating the final item description."""
-        item_sku = item.get("sku", "")
-        item_notes = item.get("notes", "")
-        item_category = item.get("category", "")
-        
-        # Create a prompt that includes all descriptions
-        prompt = f"I need to create an eBay listing for this item (SKU: {item_sku}).\n\n"
-        
-        if item_notes:
-            prompt += f"Seller notes: {item_notes}\n\n"
-            
-        if item_category:
-            prompt += f"Category: {item_category}\n\n"
-            
-        prompt += "I have descriptions of the item from different angles:\n\n"
-        
-        for idx, (context, desc) in enumerate(descriptions):
-            prompt += f"View {idx+1} ({context}):\n{desc}\n\n"
-        
-        prompt += """Based on all these descriptions, please provide:
-
-1. A concise, SEO-friendly title that would be good for an eBay listing (80 characters max)
-2. A comprehensive description that combines all the information
-3. Suggested primary category for the item
-4. Item condition (New, New Other, New with defects, Certified Refurbished, Seller Refurbished, Used, Very Good, Good, Acceptable, For parts)
-5. Item specifics in a structured format with the following fields (where applicable):
-   - Brand
-   - Model
-   - Type
-   - Size
-   - Color
-   - Material
-   - Style
-   - Features
-   - UPC/EAN/ISBN/MPN (if visible)
-   - Dimensions
-   - Weight
-   - Country/Region of Manufacture
-   - Condition details
-
-Format the response with clear sections like "Title:", "Description:", "Category:", "Condition:", and "Item specifics:". 
-For item specifics, use a format like "Brand: Apple" with each item specific on a new line.
-"""
-        
-        return prompt
+        """Build a prompt for generating the final item description (send with LISTING_SYSTEM_PROMPT)."""
+        return build_final_description_prompt(item, descriptions)
     
     def generate_final_description(self, item):
         """Generate a final comprehensive description and extract item specifics."""
@@ -1342,7 +1256,7 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
             
             # Generate the final description
             self.log("Generating final description...")
-            final_description = self.api_client.generate_text(prompt)
+            final_description = self.api_client.generate_text(prompt, system=LISTING_SYSTEM_PROMPT)
             
             # Extract title from the final description
             title = item.get("temp_title", "")
@@ -1567,7 +1481,7 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
                 prompt = self.build_photo_prompt(item, photo_data)
                 
                 # Process the photo
-                response = self.api_client.process_photo(photo_path, prompt)
+                response = self.api_client.process_photo(photo_path, prompt, system=PHOTO_SYSTEM_PROMPT)
                 
                 # Update photo data
                 photo_data["processed"] = True
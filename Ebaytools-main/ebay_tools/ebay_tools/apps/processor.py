@@ -9,7 +9,6 @@ import os
 import sys
 import json
 import base64
-import time
 import logging
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
@@ -27,12 +26,19 @@ from ebay_tools.core.schema import EbayItemSchema, load_queue, save_queue
 from ebay_tools.core.api import LLMApiClient, ApiConfig, ApiError
 from ebay_tools.core.config import ConfigManager
 from ebay_tools.core.exceptions import EbayToolsError
+from ebay_tools.core.processing import QueueProcessor, find_unprocessed_photos, find_items_awaiting_description
+from ebay_tools.core.journal import open_queue_journal
+from ebay_tools.core.ledger import JobLedger, get_ledger_path
+from ebay_tools.core.scheduler import WorkScheduler, SchedulerConfig, ScheduledWorkQueue
 
 # Import utility modules
 from ebay_tools.utils.image_utils import open_image_with_orientation, create_thumbnail
 from ebay_tools.utils.file_utils import ensure_directory_exists, safe_load_json, safe_save_json
 from ebay_tools.utils.ui_utils import StatusBar
 from ebay_tools.utils.background_utils import BackgroundTask, BackgroundTaskManager
+from ebay_tools.utils.events import (
+    EventBus, PhotoStarted, PhotoFinished, PhotoFailed, ItemCompleted, ResponseStreamed
+)
 from ebay_tools.utils.launcher_utils import ToolLauncher, create_tools_menu
 from ebay_tools.utils.version_utils import show_about_dialog, PROCESSOR_FEATURES
 
@@ -87,10 +93,14 @@ class EbayLLMProcessor:
         self.selected_items = set()  # Track selected items for processing
         self.item_checkboxes = {}  # Store checkbox widgets
         self.api_client = None  # Will be initialized with configuration
+        self.queue_journal = None  # Incremental saves during batch processing
+        self.job_ledger = None  # Record of processing runs for the loaded queue file
         self.processing = False
         self.processing_thread = None  # For background processing
         self.thread_stop_flag = False  # Flag to stop background thread
         self.auto_pricing = False  # Flag for auto pricing process
+        self.pricing_queue = None  # Items waiting to be auto priced, fed by processing while both run
+        self.queue_lock = threading.RLock()  # Held by processing and pricing while they change or save items
         
         # Store the current photo image reference to prevent garbage collection
         self.current_photo_image = None
@@ -115,8 +125,11 @@ class EbayLLMProcessor:
             self.log(f"Error during initialization: {str(e)}")
             logger.error(f"Error during initialization: {str(e)}")
 
-        # Initialize task manager for background processing
-        self.task_manager = BackgroundTaskManager(root)
+        # Initialize task manager for background processing; its tasks order their work by the scheduler
+        self.scheduler = self._load_scheduler()
+        self.task_manager = BackgroundTaskManager(
+            root, scheduler=self.scheduler if self.prioritize_var.get() else None
+        )
         
         # Create menu bar
         self.create_menu()
@@ -280,8 +293,13 @@ class EbayLLMProcessor:
         self.test_api_btn = ttk.Button(self.api_frame, text="Test API", command=self.test_api_connection)
         self.test_api_btn.grid(row=3, column=2, sticky=tk.W, padx=5, pady=5)
         
+        ttk.Label(self.api_frame, text="Concurrent requests:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=5)
+        self.max_concurrent_var = tk.IntVar(value=1)
+        self.max_concurrent_entry = ttk.Spinbox(self.api_frame, from_=1, to=16, increment=1, textvariable=self.max_concurrent_var, width=5)
+        self.max_concurrent_entry.grid(row=4, column=1, sticky=tk.W, padx=5, pady=5)
+        
         self.save_api_config_btn = ttk.Button(self.api_frame, text="Save Config", command=self.save_api_config)
-        self.save_api_config_btn.grid(row=4, column=0, columnspan=3, pady=10)
+        self.save_api_config_btn.grid(row=5, column=0, columnspan=3, pady=10)
         
         # Current item widgets
         self.item_info_label = ttk.Label(self.item_frame, text="No item selected")
@@ -389,6 +407,43 @@ class EbayLLMProcessor:
         )
         self.generate_final_check.pack(side=tk.LEFT, padx=5)
         
+        # Item mode sends all selected photos of an item in a single request
+        self.item_mode_var = tk.BooleanVar(value=False)
+        self.item_mode_check = ttk.Checkbutton(
+            self.progress_frame,
+            text="One Request per Item",
+            variable=self.item_mode_var
+        )
+        self.item_mode_check.pack(side=tk.LEFT, padx=5)
+        
+        # Structured output requests listings as validated JSON instead of free text
+        self.structured_output_var = tk.BooleanVar(value=False)
+        self.structured_output_check = ttk.Checkbutton(
+            self.progress_frame,
+            text="Structured Listings",
+            variable=self.structured_output_var
+        )
+        self.structured_output_check.pack(side=tk.LEFT, padx=5)
+        
+        # Following shows each photo as it is processed; off, the display stays put during a batch
+        self.follow_processing_var = tk.BooleanVar(value=True)
+        self.follow_processing_check = ttk.Checkbutton(
+            self.progress_frame,
+            text="Follow Processing",
+            variable=self.follow_processing_var
+        )
+        self.follow_processing_check.pack(side=tk.LEFT, padx=5)
+        
+        # Prioritizing works on urgent and valuable items first instead of in queue order
+        self.prioritize_var = tk.BooleanVar(value=True)
+        self.prioritize_check = ttk.Checkbutton(
+            self.progress_frame,
+            text="Prioritize Items",
+            variable=self.prioritize_var,
+            command=self._on_prioritize_changed
+        )
+        self.prioritize_check.pack(side=tk.LEFT, padx=5)
+        
         # Initialize navigation buttons state
         self.update_navigation_buttons()
     
@@ -412,6 +467,8 @@ class EbayLLMProcessor:
         process_menu.add_command(label="Reprocess Current", command=self.reprocess_current)
         process_menu.add_separator()
         process_menu.add_command(label="Find Next Unprocessed", command=self.find_next_unprocessed)
+        process_menu.add_separator()
+        process_menu.add_command(label="Clear Response Cache", command=self.clear_response_cache)
         menubar.add_cascade(label="Process", menu=process_menu)
         
         # Tools menu
@@ -463,6 +520,7 @@ class EbayLLMProcessor:
         api_key = self.api_key_entry.get().strip()
         api_url = self.api_url_entry.get().strip()
         delay = self.delay_var.get()
+        max_concurrent = max(1, self.max_concurrent_var.get())
         
         if not api_key or not api_url:
             self.log("API key or URL is missing. Cannot initialize API client.")
@@ -474,7 +532,8 @@ class EbayLLMProcessor:
                 api_url=api_url,
                 delay=delay,
                 max_retries=3,
-                timeout=60
+                timeout=60,
+                max_concurrent=max_concurrent
             )
             self.api_client = LLMApiClient(config)
             self.log("API client initialized")
@@ -505,6 +564,25 @@ class EbayLLMProcessor:
             self.log(f"API test failed: {str(e)}")
             messagebox.showerror("Error", f"API test failed: {str(e)}")
     
+    def clear_response_cache(self):
+        """Clear the persistent LLM response cache after confirmation."""
+        if not self.api_client:
+            self.init_api_client()
+            if not self.api_client:
+                messagebox.showerror("Error", "Could not initialize API client. Please check your settings.")
+                return
+        
+        stats = self.api_client.get_cache_stats()
+        if not messagebox.askyesno(
+            "Confirm",
+            f"Clear {stats['entries']} cached responses ({stats['size_bytes'] / 1024:.0f} KB)?\n\n"
+            f"This session: {stats['hits']} hits, {stats['misses']} misses."
+        ):
+            return
+        
+        self.api_client.clear_cache()
+        self.log("Response cache cleared")
+    
     def load_api_config(self):
         """Load API configuration from a local file."""
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_config.json")
@@ -531,6 +609,9 @@ class EbayLLMProcessor:
                 if "delay" in config:
                     self.delay_var.set(float(config["delay"]))
                 
+                if "max_concurrent" in config:
+                    self.max_concurrent_var.set(int(config["max_concurrent"]))
+                
                 self.log("API configuration loaded")
             except Exception as e:
                 self.log(f"Error loading API config: {str(e)}")
@@ -542,12 +623,14 @@ class EbayLLMProcessor:
             api_key = self.api_key_entry.get().strip()
             api_url = self.api_url_entry.get().strip()
             delay = self.delay_var.get()
+            max_concurrent = max(1, self.max_concurrent_var.get())
             
             # Create config dict
             config = {
                 "api_key": api_key,
                 "api_url": api_url,
-                "delay": delay
+                "delay": delay,
+                "max_concurrent": max_concurrent
             }
             
             # Save to file
@@ -575,7 +658,7 @@ class EbayLLMProcessor:
             # Ask for file
             file_path = filedialog.askopenfilename(
                 title="Load Work Queue",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+                filetypes=[("JSON files", "*.json"), ("SQLite queues", "*.sqlite *.db"), ("All files", "*.*")]
             )
             
             if not file_path:
@@ -671,7 +754,7 @@ class EbayLLMProcessor:
                 file_path = filedialog.asksaveasfilename(
                     title="Save Work Queue",
                     defaultextension=".json",
-                    filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+                    filetypes=[("JSON files", "*.json"), ("SQLite queues", "*.sqlite *.db"), ("All files", "*.*")]
                 )
             
             if not file_path:
@@ -1408,55 +1491,103 @@ class EbayLLMProcessor:
         except Exception as e:
             messagebox.showerror("Error", f"Error opening pricing dialog: {e}")
     
-    def build_photo_prompt(self, item, photo_data):
-        """Build an enhanced prompt for photo processing."""
-        # Extract item details
-        item_title = item.get('temp_title', '')
-        item_sku = item.get('sku', '')
-        item_notes = item.get('notes', '')
-        item_category = item.get('category', '')
-        
-        # Start with comprehensive base prompt
-        base_prompt = f"Describe this eBay item in detail: {item_title} (SKU: {item_sku})."
-        
-        # Add item category if available
-        if item_category:
-            base_prompt += f" Category: {item_category}."
-            
-        # Add condition if available
-        if item.get('condition'):
-            condition_code = item.get('condition')
-            condition_desc = EbayItemSchema.CONDITION_MAP.get(condition_code, condition_code)
-            base_prompt += f" Condition: {condition_desc}."
-        
-        # Add condition description if available
-        if item.get('conditionDescription'):
-            base_prompt += f" Condition details: {item.get('conditionDescription')}."
-            
-        # Add item notes if available
-        if item_notes and item_notes != "Optional notes about this item":
-            base_prompt += f" Additional notes: {item_notes}."
-        
-        # Add photo context if available
-        if photo_data.get("context"):
-            base_prompt += f" This specific photo shows: {photo_data.get('context')}"
+    def _load_scheduler(self):
+        """Create the work scheduler from the scheduler settings of the shared configuration."""
+        config_manager = ConfigManager()
+        config_manager.load()
+        settings = config_manager.get_scheduler_config()
+        self.prioritize_var.set(bool(settings.get("enabled", True)))
+        return WorkScheduler(SchedulerConfig.from_dict(settings))
+    
+    def _on_prioritize_changed(self):
+        """Give tasks started from now on the scheduler, or none for queue order."""
+        self.task_manager.scheduler = self.scheduler if self.prioritize_var.get() else None
+    
+    def create_queue_processor(self, publish_event=None, scheduler=None):
+        """
+        Create a queue processor using the current API client and processing options.
+        
+        Args:
+            publish_event: Optional event bus publish function; streamed responses
+                           then go through the bus instead of updating the UI directly
+            scheduler: Optional work scheduler ordering the photos by item priority
+        """
+        if publish_event:
+            stream_callback = lambda stage, text: publish_event(ResponseStreamed(stage, text))
+        else:
+            stream_callback = self._show_streamed_response
+        
+        return QueueProcessor(
+            self.api_client,
+            generate_final=self.generate_final_var.get(),
+            item_mode=self.item_mode_var.get(),
+            structured_output=self.structured_output_var.get(),
+            log=self.log,
+            save_callback=self._auto_save_queue,
+            stream_callback=stream_callback,
+            publish_event=publish_event,
+            ledger=self._get_job_ledger(),
+            scheduler=scheduler,
+            state_lock=self.queue_lock
+        )
+    
+    def _get_job_ledger(self):
+        """Get the job ledger of the queue file, if it has one."""
+        if not self.queue_file_path:
+            return None
+        
+        ledger_path = get_ledger_path(self.queue_file_path)
+        if not self.job_ledger or self.job_ledger.path != ledger_path:
+            if self.job_ledger:
+                self.job_ledger.close()
+            self.job_ledger = JobLedger(ledger_path)
+        return self.job_ledger
+    
+    def _show_streamed_response(self, stage, text):
+        """Show a response in the photo info panel while it streams in (called from worker threads)."""
+        self.root.after(0, lambda: self._display_streamed_text(stage, text))
+    
+    def _display_streamed_text(self, stage, text):
+        """Show the text of a response that is streaming in."""
+        # Late updates must not overwrite the finished item display
+        if not self.processing:
+            return
+        label = {"final": "Final description", "item": "Listing"}.get(stage, "Description")
+        preview = text if len(text) <= 800 else "..." + text[-800:]
+        self.photo_info_label.config(text=f"{label} (receiving):\n{preview}")
+    
+    def _full_queue(self):
+        """Get the whole queue, also while a selected subset is being processed."""
+        return getattr(self, '_original_queue', self.work_queue)
+    
+    def _full_queue_index(self, item_idx):
+        """Map an index into the queue being processed to its index in the whole queue."""
+        if hasattr(self, '_original_queue'):
+            return self._selected_indices[item_idx]
+        return item_idx
+    
+    def _auto_save_queue(self, item_idx):
+        """Journal a changed item of the queue being processed (processor save callback)."""
+        self._journal_item(self._full_queue_index(item_idx))
+    
+    def _journal_item(self, item_idx):
+        """Journal a changed item, by its index in the whole queue, to the queue file if it has one."""
+        if not self.queue_file_path:
+            return
         
-        # Make it eBay specific with detailed instructions
-        prompt = base_prompt + """
-
-This will be used for an eBay listing. Please provide:
-1. A detailed description of what you see in this specific photo
-2. Item condition details visible in this photo
-3. Any important measurements, features, or specifications visible
-4. Any defects, wear, or issues visible in this photo
-5. Brand information if visible
-6. Model information if visible
-
-Format your response as a cohesive paragraph that would be useful for a buyer. 
-Focus on facts visible in this image, not speculation.
-"""
+        if not self.queue_journal or self.queue_journal.file_path != self.queue_file_path:
+            self.queue_journal = open_queue_journal(self.queue_file_path)
         
-        return prompt
+        # The file holds the whole queue, also when a selected subset is being processed.
+        # Recording may compact the journal, serializing every item.
+        with self.queue_lock:
+            self.queue_journal.record(self._full_queue(), [item_idx])
+    
+    def _compact_queue_journal(self):
+        """Fold journaled item saves into the queue file."""
+        if self.queue_journal and self.queue_journal.file_path == self.queue_file_path:
+            with self.queue_lock:
+                self.queue_journal.compact(self._full_queue())
     
     def process_current_photo(self):
         """Process the current photo using the API client."""
@@ -1501,41 +1632,16 @@ Focus on facts visible in this image, not speculation.
                 return False
         
         try:
-            # Build enhanced prompt
-            prompt = self.build_photo_prompt(item, photo_data)
-            
             # Log the request
             self.log(f"Processing photo: {os.path.basename(photo_path)}")
             
-            # Process the photo using the API client
-            response = self.api_client.process_photo(photo_path, prompt)
-            
-            # Update photo data with result
-            photo_data["processed"] = True
-            photo_data["processed_at"] = datetime.now().isoformat()
-            photo_data["api_result"] = {"response": response}
+            # Process the photo, completing the item if it was the last one
+            response = self.create_queue_processor().process_photo(item, self.current_photo_index)
             
             # Log success
             self.log(f"Successfully processed {os.path.basename(photo_path)}")
             self.log(f"Description: {response[:100]}...")
             
-            # Check if all selected photos in this item are processed
-            all_processed = True
-            for idx in process_photos:
-                if idx < len(photos) and not photos[idx].get("processed", False):
-                    all_processed = False
-                    break
-            
-            if all_processed:
-                self.log(f"All selected photos processed for item {self.current_item_index + 1}")
-                
-                # Generate final description if requested
-                if self.generate_final_var.get():
-                    self.generate_final_description(item)
-                else:
-                    item["processed"] = True
-                    item["processed_at"] = datetime.now().isoformat()
-            
             # Update display
             self.display_current_item()
             self.update_queue_status()
@@ -1549,222 +1655,26 @@ Focus on facts visible in this image, not speculation.
         
         except Exception as e:
             self.log(f"Error processing photo: {str(e)}")
-            
-            # Mark as failed
-            photo_data["last_error"] = str(e)
-            photo_data["last_attempt"] = datetime.now().isoformat()
-            
             return False
     
-    def build_final_description_prompt(self, item, descriptions):
-        """Build a prompt for generating the final item description."""
-        item_sku = item.get("sku", "")
-        item_notes = item.get("notes", "")
-        item_category = item.get("category", "")
-        
-        # Create a prompt that includes all descriptions
-        prompt = f"I need to create an eBay listing for this item (SKU: {item_sku}).\n\n"
-        
-        if item_notes:
-            prompt += f"Seller notes: {item_notes}\n\n"
-            
-        if item_category:
-            prompt += f"Category: {item_category}\n\n"
-            
-        prompt += "I have descriptions of the item from different angles:\n\n"
-        
-        for idx, (context, desc) in enumerate(descriptions):
-            prompt += f"View {idx+1} ({context}):\n{desc}\n\n"
-        
-        prompt += """Based on all these descriptions, please provide:
-
-1. A concise, SEO-friendly title that would be good for an eBay listing (80 characters max)
-2. A comprehensive description that combines all the information
-3. Suggested primary category for the item
-4. Item condition (New, New Other, New with defects, Certified Refurbished, Seller Refurbished, Used, Very Good, Good, Acceptable, For parts)
-5. Item specifics in a structured format with the following fields (where applicable):
-   - Brand
-   - Model
-   - Type
-   - Size
-   - Color
-   - Material
-   - Style
-   - Features
-   - UPC/EAN/ISBN/MPN (if visible)
-   - Dimensions
-   - Weight
-   - Country/Region of Manufacture
-   - Condition details
-
-Format the response with clear sections like "Title:", "Description:", "Category:", "Condition:", and "Item specifics:". 
-For item specifics, use a format like "Brand: Apple" with each item specific on a new line.
-"""
-        
-        return prompt
-    
     def generate_final_description(self, item):
         """Generate a final comprehensive description and extract item specifics."""
-        try:
-            photos = item.get("photos", [])
-            process_photos = item.get("process_photos", [])
-            
-            # Collect all descriptions
-            descriptions = []
-            for idx in process_photos:
-                if idx < len(photos) and photos[idx].get("processed", False):
-                    photo = photos[idx]
-                    if photo.get("api_result") and "response" in photo["api_result"]:
-                        desc = photo["api_result"]["response"]
-                        context = photo.get("context", f"Photo {idx+1}")
-                        descriptions.append((context, desc))
-            
-            if not descriptions:
-                self.log("No descriptions available to generate final description")
-                return False
-            
-            # Build the prompt
-            prompt = self.build_final_description_prompt(item, descriptions)
-            
-            # Check API client
+        # Check API client
+        if not self.api_client:
+            self.init_api_client()
             if not self.api_client:
-                self.init_api_client()
-                if not self.api_client:
-                    self.log("API client initialization failed")
-                    messagebox.showerror("Error", "API client initialization failed. Please check your settings.")
-                    return False
-            
-            # Generate the final description
-            self.log("Generating final description...")
-            final_description = self.api_client.generate_text(prompt)
-            
-            # Extract title from the final description
-            title = item.get("temp_title", "")
-            
-            # Try to extract a better title from the response
-            if "Title:" in final_description:
-                title_parts = final_description.split("Title:", 1)
-                if len(title_parts) > 1:
-                    title_line = title_parts[1].strip().split("\n")[0].strip()
-                    if title_line:
-                        title = title_line
-            
-            # Extract item specifics
-            item_specifics = {}
-            if "Item specifics:" in final_description or "Item Specifics:" in final_description:
-                # Find the item specifics section
-                spec_marker = "Item specifics:" if "Item specifics:" in final_description else "Item Specifics:"
-                spec_parts = final_description.split(spec_marker, 1)
-                
-                if len(spec_parts) > 1:
-                    spec_text = spec_parts[1]
-                    
-                    # Find the end of the section (next section heading or end of text)
-                    end_markers = ["Description:", "Category:", "Condition:"]
-                    end_pos = len(spec_text)
-                    
-                    for marker in end_markers:
-                        marker_pos = spec_text.find(marker)
-                        if marker_pos > 0 and marker_pos < end_pos:
-                            end_pos = marker_pos
-                    
-                    # Extract the item specifics section
-                    spec_section = spec_text[:end_pos].strip()
-                    
-                    # Parse each line for item specifics
-                    for line in spec_section.split('\n'):
-                        line = line.strip()
-                        if not line or line.startswith('-'):
-                            continue
-                            
-                        # Look for "Key: Value" pattern
-                        if ':' in line:
-                            key, value = line.split(':', 1)
-                            key = key.strip()
-                            value = value.strip()
-                            
-                            # Skip bullet points or empty values
-                            if key and value and not key.startswith('-'):
-                                item_specifics[key] = value
-            
-            # Extract condition
-            condition_code = "1000"  # Default to New
-            condition_text = ""
-            
-            if "Condition:" in final_description:
-                condition_parts = final_description.split("Condition:", 1)
-                if len(condition_parts) > 1:
-                    condition_line = condition_parts[1].strip().split('\n')[0].strip()
-                    condition_text = condition_line
-                    
-                    # Map condition text to eBay condition codes
-                    for code, desc in EbayItemSchema.CONDITION_MAP.items():
-                        if desc.lower() in condition_text.lower():
-                            condition_code = code
-                            break
-            
-            # Extract category
-            category = ""
-            if "Category:" in final_description:
-                category_parts = final_description.split("Category:", 1)
-                if len(category_parts) > 1:
-                    category_line = category_parts[1].strip().split('\n')[0].strip()
-                    category = category_line
-            
-            # Update the item with the final results
-            item["processed"] = True
-            item["processed_at"] = datetime.now().isoformat()
-            item["title"] = title  # Use the extracted title
-            
-            if category:
-                item["category"] = category
-                
-            item["condition"] = condition_code
-            item["conditionDescription"] = condition_text
-            
-            # Save item specifics
-            item["item_specifics"] = item_specifics
-            
-            # Save full description
-            item["description"] = final_description
-            
-            if "api_results" not in item:
-                item["api_results"] = []
-            
-            item["api_results"].append({
-                "processed_at": datetime.now().isoformat(),
-                "final_description": final_description,
-                "item_specifics": item_specifics
-            })
-            
-            self.log(f"Generated final description for item {self.current_item_index + 1}")
-            self.log(f"Title: {title}")
-            self.log(f"Extracted {len(item_specifics)} item specifics")
-            
-            # Auto-save queue
-            if self.queue_file_path:
-                save_queue(self.work_queue, self.queue_file_path)
-                self.log("Queue auto-saved with final description")
-            
-            return True
+                self.log("API client initialization failed")
+                messagebox.showerror("Error", "API client initialization failed. Please check your settings.")
+                return False
         
-        except Exception as e:
-            error_msg = f"Error generating final description: {str(e)}"
-            self.log(error_msg)
-            
-            # Mark the item as processed even if final description fails
-            item["processed"] = True
-            item["processed_at"] = datetime.now().isoformat()
-            
-            if "api_results" not in item:
-                item["api_results"] = []
-            
-            item["api_results"].append({
-                "processed_at": datetime.now().isoformat(),
-                "error": error_msg
-            })
-            
-            return False
+        success = self.create_queue_processor().generate_final_description(item)
+        
+        # Auto-save queue
+        if success and self.queue_file_path:
+            save_queue(self.work_queue, self.queue_file_path)
+            self.log("Queue auto-saved with final description")
+        
+        return success
     
     def start_processing(self):
         """Start processing all unprocessed photos in the queue."""
@@ -1784,16 +1694,14 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
                 return
         
         # Find unprocessed photos in the queue
-        unprocessed_photos = []
-        for i, item in enumerate(self.work_queue):
-            photos = item.get("photos", [])
-            process_photos = item.get("process_photos", [])
-            
-            for photo_idx in process_photos:
-                if photo_idx < len(photos) and not photos[photo_idx].get("processed", False):
-                    unprocessed_photos.append((i, photo_idx))
+        unprocessed_photos = find_unprocessed_photos(self.work_queue)
+        
+        # Final descriptions a stopped run handed off are generated by the description stage
+        awaiting_description = []
+        if self.generate_final_var.get() and not self.item_mode_var.get():
+            awaiting_description = find_items_awaiting_description(self.work_queue)
         
-        if not unprocessed_photos:
+        if not unprocessed_photos and not awaiting_description:
             messagebox.showinfo("Info", "No unprocessed photos found in the queue.")
             return
         
@@ -1807,6 +1715,10 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
         self.progress_label.config(text=f"Processing 0/{len(unprocessed_photos)} photos")
         self.progress_bar["value"] = 0
         
+        # Processing events reach the UI at most once per frame, coalesced
+        events = EventBus()
+        events.subscribe(self._on_processing_event)
+        
         # Create background task for processing
         self.task_manager.create_and_start_task(
             name="Process Photos",
@@ -1816,103 +1728,49 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
             },
             on_progress=self._update_processing_progress,
             on_complete=self._on_processing_complete,
-            on_error=self._on_processing_error
+            on_error=self._on_processing_error,
+            on_paused=self._on_processing_paused,
+            events=events
         )
     
-    def _process_photos_task(self, unprocessed_photos, report_progress, check_cancelled):
+    def _process_photos_task(self, unprocessed_photos, report_progress, check_cancelled, report_paused=None,
+                             publish_event=None, scheduler=None):
         """Background task to process all unprocessed photos."""
-        total_photos = len(unprocessed_photos)
-        processed_count = 0
-        start_time = time.time()
+        return self.create_queue_processor(publish_event, scheduler).run(
+            self.work_queue,
+            unprocessed_photos,
+            report_progress=report_progress,
+            check_cancelled=check_cancelled,
+            on_pause=report_paused
+        )
+    
+    def _on_processing_event(self, event):
+        """Update the UI for a processing event (called on the main thread, once per frame at most)."""
+        if isinstance(event, PhotoStarted):
+            # Decoding and resizing the photo is only worth it if someone is watching
+            if self.follow_processing_var.get():
+                self.current_item_index = event.item_index
+                self.current_photo_index = event.photo_index
+                self.display_current_item()
+        elif isinstance(event, ResponseStreamed):
+            if self.follow_processing_var.get():
+                self._display_streamed_text(event.stage, event.text)
+        elif isinstance(event, (PhotoFinished, PhotoFailed, ItemCompleted)):
+            if isinstance(event, ItemCompleted):
+                self._queue_for_pricing(event.item_index)
+            self._schedule_queue_status_update()
+    
+    def _schedule_queue_status_update(self):
+        """Update the queue status once the current batch of events has been handled."""
+        if getattr(self, "_queue_status_pending", False):
+            return
+        self._queue_status_pending = True
         
-        for i, (item_idx, photo_idx) in enumerate(unprocessed_photos):
-            # Check if processing was cancelled
-            if check_cancelled():
-                break
-            
-            # Process photo
-            try:
-                # Navigate to the photo
-                self.current_item_index = item_idx
-                self.current_photo_index = photo_idx
-                
-                # Use the main thread to update UI
-                self.root.after(0, self.display_current_item)
-                
-                # Get item and photo data
-                item = self.work_queue[item_idx]
-                photos = item.get("photos", [])
-                photo_data = photos[photo_idx]
-                photo_path = photo_data.get("path", "")
-                
-                # Report progress
-                elapsed = time.time() - start_time
-                if i > 0:
-                    avg_time_per_photo = elapsed / i
-                    remaining_photos = total_photos - i
-                    estimated_time = remaining_photos * avg_time_per_photo
-                    time_str = f"EST: {int(estimated_time // 60)}m {int(estimated_time % 60)}s"
-                else:
-                    time_str = "Estimating time..."
-                
-                report_progress(i, total_photos, f"Processing {os.path.basename(photo_path)}... {time_str}")
-                
-                # Build prompt
-                prompt = self.build_photo_prompt(item, photo_data)
-                
-                # Process the photo
-                response = self.api_client.process_photo(photo_path, prompt)
-                
-                # Update photo data
-                photo_data["processed"] = True
-                photo_data["processed_at"] = datetime.now().isoformat()
-                photo_data["api_result"] = {"response": response}
-                
-                # Check if all selected photos in this item are processed
-                process_photos = item.get("process_photos", [])
-                all_processed = True
-                for idx in process_photos:
-                    if idx < len(photos) and not photos[idx].get("processed", False):
-                        all_processed = False
-                        break
-                
-                if all_processed:
-                    # Generate final description if requested
-                    if self.generate_final_var.get():
-                        self.generate_final_description(item)
-                    else:
-                        item["processed"] = True
-                        item["processed_at"] = datetime.now().isoformat()
-                
-                # Auto-save queue after each successful processing
-                if self.queue_file_path:
-                    save_queue(self.work_queue, self.queue_file_path)
-                
-                processed_count += 1
-                
-            except Exception as e:
-                # Log error and continue with next photo
-                self.log(f"Error processing photo: {str(e)}")
-                
-                # Mark as failed if we have valid indices
-                try:
-                    item = self.work_queue[item_idx]
-                    photos = item.get("photos", [])
-                    photo_data = photos[photo_idx]
-                    photo_data["last_error"] = str(e)
-                    photo_data["last_attempt"] = datetime.now().isoformat()
-                except:
-                    pass
-            
-            # Delay between photos to avoid rate limiting
-            time.sleep(self.delay_var.get())
-        
-        # Return results
-        return {
-            "total": total_photos,
-            "processed": processed_count,
-            "elapsed_time": time.time() - start_time
-        }
+        def update():
+            self._queue_status_pending = False
+            self.update_queue_status()
+        
+        self.root.after_idle(update)
     
     def _update_processing_progress(self, current, total, message):
         """Update progress UI during processing."""
@@ -1922,13 +1780,19 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
         self.progress_bar["value"] = progress_pct
         self.progress_label.config(text=f"Processing {current}/{total} photos")
         self.time_remaining_label.config(text=message)
-        
-        # Update the queue status
-        self.update_queue_status()
+    
+    def _on_processing_paused(self, paused, message):
+        """Show that processing is waiting for the API to become available again."""
+        if paused:
+            self.progress_label.config(text=f"Paused: {message}")
+            self.time_remaining_label.config(text="Resumes automatically")
+        else:
+            self.time_remaining_label.config(text=message)
     
     def _on_processing_complete(self, result):
         """Handle completion of processing task."""
         self.processing = False
+        self._close_pricing_queue()
         
         # Update UI
         self.start_btn.config(state=tk.NORMAL)
@@ -1940,6 +1804,9 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
         else:
             time_str = f"{int(elapsed)}s"
         
+        # Write journaled saves into the queue file
+        self._compact_queue_journal()
+        
         final_message = f"Processing completed: {result['processed']}/{result['total']} photos processed in {time_str}"
         self.progress_label.config(text=final_message)
         self.time_remaining_label.config(text="")
@@ -1949,6 +1816,18 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
         
         # Log completion
         self.log(final_message)
+        if "described" in result:
+            self.log(f"Final descriptions: {result['described']} generated, {result['description_failed']} failed")
+        if "ledger" in result:
+            summary = result["ledger"]
+            self.log(f"Run {result['run_id']}: {summary['done']}/{summary['tasks']} tasks done "
+                     f"({summary['replayed']} from recorded responses), {summary['failed']} failed, "
+                     f"{summary['requests']} requests sent, {summary['cached']} answered from cache")
+        if self.api_client:
+            connections = self.api_client.get_connection_stats()
+            if connections["requests"]:
+                self.log(f"Connections: {connections['connections_opened']} opened for "
+                         f"{connections['requests']} requests ({connections['reuse_rate']:.0%} reused)")
         
         # If we were processing a selected subset, restore original queue
         if hasattr(self, '_original_queue'):
@@ -1973,6 +1852,8 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
     def _on_processing_error(self, error):
         """Handle error in processing task."""
         self.processing = False
+        self._close_pricing_queue()
+        self._compact_queue_journal()
         
         # Update UI
         self.start_btn.config(state=tk.NORMAL)
@@ -2029,12 +1910,12 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
             self.work_queue = selected_queue
             self.current_item_index = 0
             
-            # Start processing
-            self.start_processing()
-            
             # After processing completes, we'll need to restore the original queue
             # This would be done in the process_queue method when processing completes
             self._selected_indices = sorted(self.selected_items)
+            
+            # Start processing
+            self.start_processing()
         else:
             self.log("Processing cancelled.")
     
@@ -2140,26 +2021,29 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
             messagebox.showinfo("Info", "No queue loaded. Please load a queue first.")
             return
         
+        # Pricing works on the whole queue, also while a selected subset is being processed
+        queue = self._full_queue()
+        
         # Find processed items that don't have prices yet
         items_to_price = []
-        for i, item in enumerate(self.work_queue):
-            if (item.get("processed", False) and 
-                item.get("title") and 
-                not item.get("start_price")):
-                items_to_price.append((i, item))
+        for i, item in enumerate(queue):
+            if self._needs_pricing(item):
+                items_to_price.append(i)
                 logger.debug(f"Item {i} added to pricing queue: {item.get('title', 'Unknown')[:50]}")
         
         logger.info(f"Found {len(items_to_price)} items that need pricing")
         
-        if not items_to_price:
+        # While photos are being processed, items are priced as processing completes them
+        if not items_to_price and not self.processing:
             logger.info("No items found that need pricing")
             messagebox.showinfo("Info", "No processed items found that need pricing.")
             return
         
         # Confirm with user
+        following = "\nItems will also be priced as processing completes them.\n" if self.processing else ""
         response = messagebox.askyesno(
             "Confirm Auto Pricing",
-            f"Automatically price {len(items_to_price)} processed items?\n\n"
+            f"Automatically price {len(items_to_price)} processed items?\n{following}\n"
             f"This will search eBay sold listings for each item and apply suggested pricing."
         )
         
@@ -2170,21 +2054,48 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
         self.auto_pricing = True
         self.auto_price_btn.config(state=tk.DISABLED, text="Pricing...")
         
+        # Items are handed to the pricing task by schedule, most urgent and valuable first
+        self.pricing_queue = ScheduledWorkQueue(self.task_manager.scheduler, queue)
+        for item_index in items_to_price:
+            self.pricing_queue.put(item_index)
+        if not self.processing:
+            self.pricing_queue.close()
+        
         # Create background task for pricing
         self.task_manager.create_and_start_task(
             name="Auto Price Items",
             target_function=self._auto_price_task,
             kwargs={
-                'items_to_price': items_to_price
+                'pricing_queue': self.pricing_queue
             },
             on_progress=self._update_auto_pricing_progress,
             on_complete=self._on_auto_pricing_complete,
             on_error=self._on_auto_pricing_error
         )
     
-    def _auto_price_task(self, items_to_price, report_progress, check_cancelled):
+    @staticmethod
+    def _needs_pricing(item):
+        """Check whether an item is processed but has no price yet."""
+        return bool(item.get("processed", False) and item.get("title") and not item.get("start_price"))
+    
+    def _queue_for_pricing(self, item_index):
+        """Hand an item completed by processing (by its index in the queue being processed) to auto pricing."""
+        if self.pricing_queue is None or self.pricing_queue.closed or item_index >= len(self.work_queue):
+            return
+        
+        # The pricing queue holds indices into the whole queue
+        item_index = self._full_queue_index(item_index)
+        if self._needs_pricing(self.pricing_queue.queue[item_index]):
+            self.pricing_queue.put(item_index)
+    
+    def _close_pricing_queue(self):
+        """Let the auto pricing task finish once it has priced the items processing completed."""
+        if self.pricing_queue is not None:
+            self.pricing_queue.close()
+    
+    def _auto_price_task(self, pricing_queue, report_progress, check_cancelled):
         """Background task to automatically price items."""
-        logger.info(f"Starting auto pricing task for {len(items_to_price)} items")
+        logger.info(f"Starting auto pricing task for {pricing_queue.total} items")
         
         try:
             from ebay_tools.apps.price_analyzer import PriceAnalyzer
@@ -2195,8 +2106,8 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
             logger.error(f"Import traceback: {traceback.format_exc()}")
             raise
         
-        total_items = len(items_to_price)
         priced_count = 0
+        completed = 0
         
         try:
             analyzer = PriceAnalyzer()
@@ -2207,77 +2118,100 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
             logger.error(f"Instance creation traceback: {traceback.format_exc()}")
             raise
         
-        for i, (item_index, item) in enumerate(items_to_price):
-            logger.info(f"Processing item {i+1}/{total_items}: {item.get('title', 'Unknown')[:50]}")
-            
-            # Check if task was cancelled
-            if check_cancelled():
-                logger.info("Auto pricing task was cancelled")
-                break
-            
-            try:
-                # Extract search terms from item
-                logger.debug(f"Extracting search terms for item {item_index}")
-                search_terms = analyzer._extract_search_terms(item)
-                logger.info(f"Search terms extracted: {search_terms}")
-                
-                # Report progress
-                report_progress(i, total_items, f"Pricing: {item.get('title', 'Unknown')[:50]}...")
+        # Items are priced concurrently with per-host rate limits instead of a fixed delay
+        # between items. Taking only as many items as are priced at once lets an urgent
+        # item that processing completes in the meantime go ahead of the rest.
+        workers = max(1, int(analyzer.config.get("max_concurrent", 1)))
+        report_progress(0, pricing_queue.total, f"Pricing {pricing_queue.total} items...")
+        
+        try:
+            while not check_cancelled():
+                batch = []
+                items_by_index = {}
+                taken = pricing_queue.take(limit=workers, timeout=0.5)
+                if not taken:
+                    if pricing_queue.closed and not len(pricing_queue):
+                        break
+                    continue
                 
-                # Analyze prices
-                logger.info(f"Starting price analysis for: {search_terms}")
-                results = analyzer.analyze_item(search_terms)
-                logger.info(f"Price analysis results: {results}")
+                for item_index in taken:
+                    item = pricing_queue.queue[item_index]
+                    try:
+                        logger.debug(f"Extracting search terms for item {item_index}")
+                        with self.queue_lock:
+                            search_terms = analyzer._extract_search_terms(item)
+                        logger.info(f"Search terms extracted: {search_terms}")
+                        batch.append((item_index, search_terms))
+                        items_by_index[item_index] = item
+                    except Exception as e:
+                        completed += 1
+                        logger.error(f"Error extracting search terms for item {item_index + 1}: {str(e)}")
+                        self.log(f"Error pricing item {item_index + 1}: {str(e)}")
                 
-                if results and results.get("success"):
-                    # Use final_price if available (from user approval), otherwise use suggested_price
-                    final_price = results.get("final_price", results["suggested_price"])
-                    suggested_price = results["suggested_price"]
-                    logger.info(f"Successfully got price: ${final_price:.2f} (suggested: ${suggested_price:.2f})")
+                for item_index, search_terms, results in analyzer.iter_price_batch(batch, check_cancelled=check_cancelled):
+                    item = items_by_index[item_index]
+                    completed += 1
                     
-                    # Update item with pricing info
-                    item["start_price"] = final_price
-                    item["auto_priced"] = True
-                    item["auto_priced_at"] = datetime.now().isoformat()
-                    item["pricing_data"] = {
-                        "final_price": final_price,
-                        "suggested_price": suggested_price,
-                        "user_approved": results.get("user_approved", False),
-                        "search_terms": search_terms,
-                        "price_analysis": results.get("price_analysis", {}),
-                        "sold_items_count": len(results.get("sold_items", [])),
-                        "current_items_count": len(results.get("current_items", []))
-                    }
+                    if isinstance(results, Exception):
+                        logger.error(f"Error pricing item {item_index + 1}: {str(results)}")
+                        self.log(f"Error pricing item {item_index + 1}: {str(results)}")
+                        continue
                     
-                    priced_count += 1
-                    self.log(f"Auto-priced item {item_index + 1}: ${final_price:.2f}")
-                    logger.info(f"Successfully priced item {item_index + 1}: ${final_price:.2f}")
-                else:
-                    logger.warning(f"Price analysis failed for item {item_index + 1}. Results: {results}")
-                    self.log(f"Could not price item {item_index + 1}: {item.get('title', 'Unknown')}")
-                
-                # Auto-save queue after each pricing
-                if self.queue_file_path:
-                    save_queue(self.work_queue, self.queue_file_path)
-                    logger.debug(f"Queue saved after pricing item {item_index + 1}")
-                
-                # Delay to avoid rate limiting
-                logger.debug("Waiting 2 seconds before next item...")
-                time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error pricing item {item_index + 1}: {str(e)}")
-                logger.error(f"Error traceback: {traceback.format_exc()}")
-                self.log(f"Error pricing item {item_index + 1}: {str(e)}")
-                continue
+                    logger.info(f"Price analysis results: {results}")
+                    
+                    if results and results.get("success"):
+                        # Use final_price if available (from user approval), otherwise use suggested_price
+                        final_price = results.get("final_price", results["suggested_price"])
+                        suggested_price = results["suggested_price"]
+                        logger.info(f"Successfully got price: ${final_price:.2f} (suggested: ${suggested_price:.2f})")
+                        
+                        # Update and save the item while processing, which runs alongside, can't save the queue
+                        with self.queue_lock:
+                            item["start_price"] = final_price
+                            item["auto_priced"] = True
+                            item["auto_priced_at"] = datetime.now().isoformat()
+                            item["pricing_data"] = {
+                                "final_price": final_price,
+                                "suggested_price": suggested_price,
+                                "user_approved": results.get("user_approved", False),
+                                "search_terms": search_terms,
+                                "price_analysis": results.get("price_analysis", {}),
+                                "sold_items_count": len(results.get("sold_items", [])),
+                                "current_items_count": len(results.get("current_items", []))
+                            }
+                            
+                            # Auto-save the item after each pricing
+                            if self.queue_file_path:
+                                self._journal_item(item_index)
+                                logger.debug(f"Queue journaled after pricing item {item_index + 1}")
+                        
+                        priced_count += 1
+                        self.log(f"Auto-priced item {item_index + 1}: ${final_price:.2f}")
+                        logger.info(f"Successfully priced item {item_index + 1}: ${final_price:.2f}")
+                    else:
+                        logger.warning(f"Price analysis failed for item {item_index + 1}. Results: {results}")
+                        self.log(f"Could not price item {item_index + 1}: {item.get('title', 'Unknown')}")
+                    
+                    # Report progress
+                    report_progress(completed, pricing_queue.total, f"Priced: {item.get('title', 'Unknown')[:50]}...")
+        finally:
+            analyzer.close()
+        
+        if check_cancelled():
+            logger.info("Auto pricing task was cancelled")
         
         return {
-            "total": total_items,
+            "total": pricing_queue.total,
             "priced": priced_count
         }
     
     def _update_auto_pricing_progress(self, current, total, message):
         """Update progress during auto pricing."""
+        # The progress bar belongs to photo processing while both run
+        if self.processing:
+            self.auto_price_btn.config(text=f"Pricing {current}/{total}...")
+            return
+        
         progress_pct = (current / total) * 100 if total > 0 else 0
         self.progress_bar["value"] = progress_pct
         self.progress_label.config(text=f"Auto Pricing {current}/{total}")
@@ -2286,6 +2220,8 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
     def _on_auto_pricing_complete(self, result):
         """Handle completion of auto pricing."""
         self.auto_pricing = False
+        self.pricing_queue = None
+        self._compact_queue_journal()
         
         # Update UI
         self.auto_price_btn.config(state=tk.NORMAL, text="Auto Price All")
@@ -2305,6 +2241,8 @@ For item specifics, use a format like "Brand: Apple" with each item specific on
         """Handle error in auto pricing."""
         logger.error(f"Auto pricing task failed with error: {error}")
         self.auto_pricing = False
+        self.pricing_queue = None
+        self._compact_queue_journal()
         
         # Update UI
         self.auto_price_btn.config(state=tk.NORMAL, text="Auto Price All")
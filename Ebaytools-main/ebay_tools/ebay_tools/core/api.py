@@ -1,16 +1,38 @@
 """
 LLM API Client for eBay listing tools.
-Handles API authentication, requests, retrying, rate limiting, and caching.
+Handles API authentication, requests, retrying, rate limiting, and caching,
+with failover between endpoints, hedged requests for slow responses, and
+cacheable system prompts with token usage accounting.
 """
 
 import os
+import re
 import json
+import gzip
 import time
+import hashlib
+import mimetypes
+import threading
 import requests
 import logging
-from typing import Dict, Any, List, Optional, Union, Callable
-from dataclasses import dataclass
+import urllib.parse
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Optional, Union, Callable, Iterable, Iterator, Tuple
+from dataclasses import dataclass, field
 import base64
+import email.utils
+from datetime import datetime, timezone
+
+from ebay_tools.core.cache import ResponseCache
+
+# Optional HTTP/2 transport
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 # Configure logging with more detail for debugging
 logging.basicConfig(
@@ -23,6 +45,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Where a response came from (see LLMApiClient.last_response_source)
+RESPONSE_FROM_NETWORK = "network"
+RESPONSE_FROM_CACHE = "cache"
+RESPONSE_COALESCED = "coalesced"  # Shared with an identical request in flight
+
 
 @dataclass
 class ApiConfig:
@@ -32,6 +59,23 @@ class ApiConfig:
     delay: float = 2.0  # Delay between requests in seconds
     max_retries: int = 3
     timeout: int = 60
+    max_concurrent: int = 1  # Maximum number of requests in flight at once
+    cache_path: Optional[str] = None  # Response cache database, ":memory:" to disable persistence
+    cache_max_age_days: float = 30.0
+    cache_max_size_mb: float = 100.0
+    image_max_edge: int = 1568  # Long edge cap for uploaded photos, 0 keeps the original size
+    image_format: str = "JPEG"  # Upload encoding ("JPEG" or "WEBP"), empty sends the original file
+    image_quality: int = 85
+    pool_size: int = 0  # Keep-alive connections per endpoint, 0 sizes the pool to max_concurrent
+    http2: bool = False  # Use HTTP/2 when httpx (with h2) is installed
+    gzip_requests: bool = False  # Gzip request bodies (the endpoint must accept Content-Encoding: gzip)
+    adaptive_rate_limit: bool = True  # Adapt pacing and concurrency to throttling and rate limit headers
+    max_requests_per_second: float = 10.0  # Upper bound for adaptive pacing
+    fallback_endpoints: List[Dict[str, str]] = field(default_factory=list)  # Ordered {"api_url", "api_key"} fallbacks
+    hedge_percentile: float = 0.0  # Hedge to a fallback endpoint when a response is slower than this percentile, 0 disables
+    circuit_failure_threshold: int = 5  # Consecutive failures that take an endpoint out of rotation, 0 disables
+    circuit_reset_seconds: float = 60.0  # Time before an open circuit lets a trial request through
+    prompt_caching: bool = True  # Mark system prompts for provider prompt caching (Claude)
     
     @classmethod
     def load_from_file(cls, file_path: str) -> "ApiConfig":
@@ -47,7 +91,24 @@ class ApiConfig:
             api_url=config.get("api_url", ""),
             delay=float(config.get("delay", 2.0)),
             max_retries=int(config.get("max_retries", 3)),
-            timeout=int(config.get("timeout", 60))
+            timeout=int(config.get("timeout", 60)),
+            max_concurrent=int(config.get("max_concurrent", 1)),
+            cache_path=config.get("cache_path"),
+            cache_max_age_days=float(config.get("cache_max_age_days", 30.0)),
+            cache_max_size_mb=float(config.get("cache_max_size_mb", 100.0)),
+            image_max_edge=int(config.get("image_max_edge", 1568)),
+            image_format=config.get("image_format", "JPEG"),
+            image_quality=int(config.get("image_quality", 85)),
+            pool_size=int(config.get("pool_size", 0)),
+            http2=bool(config.get("http2", False)),
+            gzip_requests=bool(config.get("gzip_requests", False)),
+            adaptive_rate_limit=bool(config.get("adaptive_rate_limit", True)),
+            max_requests_per_second=float(config.get("max_requests_per_second", 10.0)),
+            fallback_endpoints=list(config.get("fallback_endpoints", [])),
+            hedge_percentile=float(config.get("hedge_percentile", 0.0)),
+            circuit_failure_threshold=int(config.get("circuit_failure_threshold", 5)),
+            circuit_reset_seconds=float(config.get("circuit_reset_seconds", 60.0)),
+            prompt_caching=bool(config.get("prompt_caching", True))
         )
     
     def save_to_file(self, file_path: str) -> None:
@@ -57,28 +118,950 @@ class ApiConfig:
             "api_url": self.api_url,
             "delay": self.delay,
             "max_retries": self.max_retries,
-            "timeout": self.timeout
+            "timeout": self.timeout,
+            "max_concurrent": self.max_concurrent,
+            "cache_path": self.cache_path,
+            "cache_max_age_days": self.cache_max_age_days,
+            "cache_max_size_mb": self.cache_max_size_mb,
+            "image_max_edge": self.image_max_edge,
+            "image_format": self.image_format,
+            "image_quality": self.image_quality,
+            "pool_size": self.pool_size,
+            "http2": self.http2,
+            "gzip_requests": self.gzip_requests,
+            "adaptive_rate_limit": self.adaptive_rate_limit,
+            "max_requests_per_second": self.max_requests_per_second,
+            "fallback_endpoints": self.fallback_endpoints,
+            "hedge_percentile": self.hedge_percentile,
+            "circuit_failure_threshold": self.circuit_failure_threshold,
+            "circuit_reset_seconds": self.circuit_reset_seconds,
+            "prompt_caching": self.prompt_caching
         }
         
         with open(file_path, 'w') as f:
             json.dump(config_dict, f, indent=2)
 
 
+# HTTP status codes that are worth retrying
+RETRIABLE_STATUS_CODES = (429, 500, 502, 503, 504, 529)
+
+# Tool (Claude) or response format (OpenAI) name used for structured output
+STRUCTURED_OUTPUT_NAME = "structured_output"
+
+
 class ApiError(Exception):
     """Exception raised for API errors."""
-    def __init__(self, message: str, status_code: Optional[int] = None, response_text: Optional[str] = None):
+    def __init__(self, message: str, status_code: Optional[int] = None, response_text: Optional[str] = None,
+                 retry_after: Optional[float] = None):
         self.message = message
         self.status_code = status_code
         self.response_text = response_text
+        self.retry_after = retry_after  # Seconds the server asked us to wait, if it said
         super().__init__(self.message)
 
 
+class CircuitOpenError(ApiError):
+    """Exception raised when every endpoint's circuit is open and requests fail fast."""
+    def __init__(self, message: str, retry_in: float):
+        super().__init__(message, retry_after=retry_in)
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    
+    A single bucket is shared by every worker of a client so that the
+    configured request rate holds no matter how many requests are in flight.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Initialize the token bucket.
+        
+        Args:
+            rate: Tokens added per second (0 or less disables limiting)
+            capacity: Maximum number of tokens the bucket can hold
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last refill."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+    
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until the requested tokens are available and take them.
+        
+        Args:
+            tokens: Number of tokens to take
+            
+        Returns:
+            Total time spent waiting in seconds
+        """
+        if self.rate <= 0:
+            return 0.0
+        
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                sleep_time = (tokens - self.tokens) / self.rate
+            
+            logger.debug(f"Rate limiting: Sleeping for {sleep_time:.2f} seconds")
+            time.sleep(sleep_time)
+            waited += sleep_time
+
+
+class AdaptiveRateLimiter:
+    """
+    Rate and concurrency limiter that adapts to the provider's limits.
+    
+    Pacing follows additive-increase/multiplicative-decrease: until the first
+    throttling response the rate grows by a quarter per success (slow start),
+    afterwards by a fixed step. Every throttling response (429, 503, 529)
+    halves the rate and the number of requests in flight.
+    Rate limit headers (Retry-After, x-ratelimit-*, anthropic-ratelimit-*)
+    cap the rate to the remaining request and token budgets and pause all
+    workers until the budget resets when it is used up.
+    """
+    
+    # Status codes that mean the provider is throttling us
+    THROTTLE_STATUS_CODES = (429, 503, 529)
+    
+    # Multiplicative decreases closer together than this count as one
+    DECREASE_INTERVAL = 1.0
+    
+    def __init__(self,
+                 initial_rate: float,
+                 max_rate: float = 10.0,
+                 min_rate: float = 0.05,
+                 max_concurrent: int = 1,
+                 increase: float = 0.1,
+                 adaptive: bool = True):
+        """
+        Initialize the limiter.
+        
+        Args:
+            initial_rate: Starting request rate per second (0 or less starts at max_rate)
+            max_rate: Highest request rate the limiter will probe up to
+            min_rate: Lowest request rate after repeated throttling
+            max_concurrent: Highest number of requests in flight
+            increase: Requests per second added after each successful response
+            adaptive: Adjust rate and concurrency (False keeps them fixed but still honours headers)
+        """
+        self.max_rate = max(max_rate, min_rate)
+        self.min_rate = min_rate
+        self.max_concurrent = max(1, max_concurrent)
+        self.increase = increase
+        self.adaptive = adaptive
+        
+        self.aimd_rate = min(initial_rate, self.max_rate) if initial_rate > 0 else self.max_rate
+        self.budget_rate = None
+        self.budget_expires = 0.0
+        self.concurrency = self.max_concurrent
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.successes = 0
+        self.throttled = 0
+        self.slow_start = True
+        self.token_cost = None  # Estimated tokens per request, from header deltas
+        self.budgets = {}
+        
+        self.bucket = TokenBucket(self.aimd_rate)
+        self.condition = threading.Condition()
+    
+    def _apply_rate(self, now: float) -> None:
+        """Set the bucket rate from the AIMD rate and the header budget (condition must be held)."""
+        rate = self.aimd_rate
+        if self.budget_rate is not None and now < self.budget_expires:
+            rate = min(rate, self.budget_rate)
+        self.bucket.rate = max(self.min_rate, rate)
+    
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent and reserve an in-flight slot.
+        
+        Callers must call release() once the response has been received.
+        
+        Returns:
+            Total time spent waiting in seconds
+        """
+        start = time.monotonic()
+        with self.condition:
+            while True:
+                pause = self.blocked_until - time.time()
+                if pause > 0:
+                    logger.debug(f"Rate limit reached, pausing for {pause:.2f} seconds")
+                    self.condition.wait(pause)
+                elif self.in_flight >= self.concurrency:
+                    self.condition.wait()
+                else:
+                    break
+            self.in_flight += 1
+        
+        self.bucket.acquire()
+        return time.monotonic() - start
+    
+    def release(self) -> None:
+        """Release the in-flight slot reserved by acquire()."""
+        with self.condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.condition.notify_all()
+    
+    def update(self, status_code: int, headers: Dict[str, str]) -> Optional[float]:
+        """
+        Adapt pacing to a response.
+        
+        Args:
+            status_code: HTTP status code
+            headers: Response headers
+            
+        Returns:
+            Seconds the server asked us to wait before retrying, or None
+        """
+        now = time.time()
+        headers = {key.lower(): value for key, value in headers.items()}
+        retry_after = parse_retry_after(headers)
+        
+        with self.condition:
+            self._update_budgets(headers, now)
+            
+            if status_code in self.THROTTLE_STATUS_CODES:
+                self.throttled += 1
+                if self.adaptive and now - self.last_decrease >= self.DECREASE_INTERVAL:
+                    self.aimd_rate = max(self.min_rate, self.aimd_rate / 2)
+                    self.concurrency = max(1, self.concurrency // 2)
+                    self.last_decrease = now
+                    self.slow_start = False
+                    logger.info(f"Throttled by API, reducing to {self.aimd_rate:.2f} requests/s "
+                                f"and {self.concurrency} in flight")
+            elif status_code < 400 and self.adaptive:
+                self.successes += 1
+                step = self.aimd_rate / 4 if self.slow_start else self.increase
+                self.aimd_rate = min(self.max_rate, self.aimd_rate + max(step, self.increase))
+                # The headers tell us exactly how much headroom there is
+                if self.budget_rate is not None and now < self.budget_expires:
+                    self.aimd_rate = min(self.max_rate, max(self.aimd_rate, self.budget_rate))
+                # One more request in flight per window of successful responses
+                if self.concurrency < self.max_concurrent and self.successes % (self.concurrency * 4) == 0:
+                    self.concurrency += 1
+            
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            
+            self._apply_rate(now)
+            self.condition.notify_all()
+        
+        return retry_after
+    
+    def _update_budgets(self, headers: Dict[str, str], now: float) -> None:
+        """Derive the request and token budgets from rate limit headers (condition must be held)."""
+        budget_rate = None
+        reset_at = now
+        
+        for kind in ("requests", "tokens"):
+            remaining, reset_in = parse_rate_limit_budget(headers, kind)
+            if remaining is None:
+                continue
+            
+            previous = self.budgets.get(kind)
+            self.budgets[kind] = (remaining, now + reset_in if reset_in is not None else None)
+            
+            if kind == "tokens":
+                # Estimate the cost of a request from how far the budget dropped
+                if previous and previous[0] > remaining:
+                    used = previous[0] - remaining
+                    self.token_cost = used if self.token_cost is None else 0.8 * self.token_cost + 0.2 * used
+                cost = max(1.0, self.token_cost or 1.0)
+            else:
+                cost = 1.0
+            
+            if reset_in is None:
+                continue
+            
+            if remaining < cost:
+                # Budget used up: everyone waits for the reset
+                self.blocked_until = max(self.blocked_until, now + reset_in)
+                logger.info(f"API {kind} budget exhausted, pausing for {reset_in:.2f} seconds")
+            elif reset_in > 0:
+                rate = remaining / cost / reset_in
+                budget_rate = rate if budget_rate is None else min(budget_rate, rate)
+                reset_at = max(reset_at, now + reset_in)
+        
+        if budget_rate is not None:
+            self.budget_rate = budget_rate
+            self.budget_expires = reset_at
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the current limiter state.
+        
+        Returns:
+            Dictionary with rate, concurrency, in_flight, throttled, paused_for and budgets
+        """
+        with self.condition:
+            return {
+                "rate": self.bucket.rate,
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "throttled": self.throttled,
+                "paused_for": max(0.0, self.blocked_until - time.time()),
+                "budgets": {kind: remaining for kind, (remaining, _) in self.budgets.items()}
+            }
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse a rate limit reset value into seconds from now.
+    
+    Accepts plain seconds ("1.5"), Unix timestamps, durations like "6m0s"
+    or "20ms", and RFC 3339 or HTTP dates.
+    
+    Args:
+        value: Header value
+        
+    Returns:
+        Seconds from now (never negative), or None if the value can't be parsed
+    """
+    value = value.strip()
+    if not value:
+        return None
+    
+    try:
+        seconds = float(value)
+        # Large numbers are absolute Unix timestamps
+        return max(0.0, seconds - time.time()) if seconds > 1e9 else max(0.0, seconds)
+    except ValueError:
+        pass
+    
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(number) * units[unit] for number, unit in parts)
+    
+    try:
+        when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+
+def parse_retry_after(headers: Dict[str, str]) -> Optional[float]:
+    """
+    Get the wait the server asked for from Retry-After style headers.
+    
+    Args:
+        headers: Response headers with lowercase names
+        
+    Returns:
+        Seconds to wait, or None if the response has no such header
+    """
+    if "retry-after-ms" in headers:
+        try:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        except ValueError:
+            pass
+    if "retry-after" in headers:
+        return parse_duration(headers["retry-after"])
+    return None
+
+
+def parse_rate_limit_budget(headers: Dict[str, str], kind: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Get the remaining budget and time to reset from rate limit headers.
+    
+    Understands the Anthropic (anthropic-ratelimit-requests-remaining),
+    OpenAI (x-ratelimit-remaining-requests) and generic
+    (x-ratelimit-remaining) header families.
+    
+    Args:
+        headers: Response headers with lowercase names
+        kind: "requests" or "tokens"
+        
+    Returns:
+        (remaining, seconds until reset) tuple, with None for missing values
+    """
+    candidates = [
+        (f"anthropic-ratelimit-{kind}-remaining", f"anthropic-ratelimit-{kind}-reset"),
+        (f"x-ratelimit-remaining-{kind}", f"x-ratelimit-reset-{kind}"),
+    ]
+    if kind == "requests":
+        candidates.append(("x-ratelimit-remaining", "x-ratelimit-reset"))
+    
+    for remaining_header, reset_header in candidates:
+        if remaining_header in headers:
+            try:
+                remaining = float(headers[remaining_header])
+            except ValueError:
+                continue
+            reset = headers.get(reset_header)
+            return remaining, parse_duration(reset) if reset else None
+    
+    return None, None
+
+
+def is_event_stream(response) -> bool:
+    """Check whether a response is a server-sent event stream."""
+    return response.headers.get("content-type", "").startswith("text/event-stream")
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Parse server-sent events from the lines of an event stream.
+    
+    Args:
+        lines: Lines of the stream without line endings
+        
+    Yields:
+        (event name, data) tuples; the event name is "message" when not given
+    """
+    event = "message"
+    data = []
+    for line in lines:
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event = "message"
+            data = []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            if value.startswith(" "):
+                value = value[1:]
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+    
+    if data:
+        yield event, "\n".join(data)
+
+
+class HttpTransport:
+    """
+    Pooled keep-alive HTTP transport shared by all workers of a client.
+    
+    Each endpoint (scheme and host) gets its own connection pool sized to the
+    client's concurrency, so consecutive requests reuse open TCP/TLS
+    connections instead of reconnecting for every photo.
+    """
+    
+    # Request bodies smaller than this are sent uncompressed
+    GZIP_MIN_BYTES = 1024
+    
+    def __init__(self, pool_size: int = 1, http2: bool = False, gzip_requests: bool = False):
+        """
+        Initialize the transport.
+        
+        Args:
+            pool_size: Maximum number of keep-alive connections per endpoint
+            http2: Use HTTP/2 through httpx if it is installed
+            gzip_requests: Gzip-compress request bodies
+        """
+        self.pool_size = max(1, pool_size)
+        self.gzip_requests = gzip_requests
+        self.http2 = http2 and httpx is not None
+        if http2 and httpx is None:
+            logger.warning("HTTP/2 requested but httpx is not installed, using HTTP/1.1 keep-alive")
+        
+        self.lock = threading.Lock()
+        self._clients = {}
+        self._http2_streams = set()
+        self._closed_connections = 0
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+    
+    @staticmethod
+    def _endpoint(url: str) -> str:
+        """Get the pool key (scheme and host) of a URL."""
+        parts = urllib.parse.urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+    
+    def _get_client(self, url: str):
+        """Get (and create if needed) the pooled client for a URL's endpoint."""
+        endpoint = self._endpoint(url)
+        with self.lock:
+            client = self._clients.get(endpoint)
+            if client is not None:
+                return client
+            
+            if self.http2:
+                try:
+                    client = httpx.Client(
+                        http2=True,
+                        limits=httpx.Limits(max_connections=self.pool_size,
+                                            max_keepalive_connections=self.pool_size)
+                    )
+                except ImportError:
+                    logger.warning("HTTP/2 requires the h2 package, using HTTP/1.1 keep-alive")
+                    self.http2 = False
+            
+            if client is None:
+                client = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                client.mount("http://", adapter)
+                client.mount("https://", adapter)
+            
+            self._clients[endpoint] = client
+            return client
+    
+    def post(self, url: str, headers: Dict[str, str], payload: Dict[str, Any], timeout: float,
+             stream: bool = False):
+        """
+        POST a JSON payload over a pooled connection.
+        
+        Args:
+            url: Request URL
+            headers: Request headers
+            payload: JSON payload
+            timeout: Request timeout in seconds
+            stream: Don't read the body of event stream responses (read them with iter_lines)
+            
+        Returns:
+            Response object with status_code, headers, text and json()
+            
+        Raises:
+            requests.RequestException: On network errors (also for the HTTP/2 transport)
+        """
+        body = json.dumps(payload).encode("utf-8")
+        headers = dict(headers)
+        headers.setdefault("Content-Type", "application/json")
+        
+        uncompressed_size = len(body)
+        if self.gzip_requests and uncompressed_size >= self.GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        
+        client = self._get_client(url)
+        if isinstance(client, requests.Session):
+            response = client.post(url, data=body, headers=headers, timeout=timeout, stream=stream)
+        else:
+            try:
+                request = client.build_request("POST", url, content=body, headers=headers, timeout=timeout)
+                response = client.send(request, stream=stream)
+                if stream and not is_event_stream(response):
+                    response.read()
+            except httpx.TransportError as e:
+                raise requests.ConnectionError(str(e)) from e
+        
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += len(body)
+            self.bytes_saved += uncompressed_size - len(body)
+            network_stream = getattr(response, "extensions", {}).get("network_stream")
+            if network_stream is not None:
+                self._http2_streams.add(id(network_stream))
+        
+        return response
+    
+    @staticmethod
+    def iter_lines(response) -> Iterator[str]:
+        """
+        Iterate over the lines of a streamed response body as UTF-8 text.
+        
+        Args:
+            response: Response returned by post(stream=True)
+            
+        Yields:
+            Lines without line endings
+            
+        Raises:
+            requests.RequestException: On network errors (also for the HTTP/2 transport)
+        """
+        try:
+            if isinstance(response, requests.Response):
+                # Hand over data as it arrives instead of waiting to fill fixed-size chunks
+                if hasattr(response.raw, "read1"):
+                    chunks = iter(lambda: response.raw.read1(65536), b"")
+                else:
+                    chunks = response.iter_content(chunk_size=None)
+                
+                pending = b""
+                try:
+                    for chunk in chunks:
+                        pending += chunk
+                        *lines, pending = pending.split(b"\n")
+                        for line in lines:
+                            yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+                except Urllib3Error as e:
+                    raise requests.ConnectionError(str(e)) from e
+                if pending:
+                    yield pending.rstrip(b"\r").decode("utf-8", errors="replace")
+            else:
+                try:
+                    yield from response.iter_lines()
+                except httpx.TransportError as e:
+                    raise requests.ConnectionError(str(e)) from e
+        finally:
+            response.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get connection reuse statistics.
+        
+        Returns:
+            Dictionary with requests, connections_opened, connections_reused, reuse_rate,
+            bytes_sent, bytes_saved, endpoints and protocol
+        """
+        with self.lock:
+            opened = self._closed_connections + self._count_connections() + len(self._http2_streams)
+            requests_sent = self.requests
+            
+            reused = max(0, requests_sent - opened)
+            return {
+                "requests": requests_sent,
+                "connections_opened": opened,
+                "connections_reused": reused,
+                "reuse_rate": reused / requests_sent if requests_sent else 0.0,
+                "bytes_sent": self.bytes_sent,
+                "bytes_saved": self.bytes_saved,
+                "endpoints": len(self._clients),
+                "protocol": "HTTP/2" if self.http2 else "HTTP/1.1"
+            }
+    
+    def _count_connections(self) -> int:
+        """Count the connections opened by the HTTP/1.1 pools (lock must be held)."""
+        opened = 0
+        for endpoint, client in self._clients.items():
+            if isinstance(client, requests.Session):
+                pools = client.get_adapter(endpoint).poolmanager.pools
+                opened += sum(pools[key].num_connections for key in pools.keys())
+        return opened
+    
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self.lock:
+            self._closed_connections += self._count_connections()
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker guarding an API endpoint.
+    
+    After failure_threshold consecutive failures the circuit opens and
+    requests fail fast instead of waiting for timeouts. Once reset_timeout
+    has passed the circuit is half-open and lets one trial request through:
+    success closes it, failure opens it for another reset_timeout.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0, name: str = ""):
+        """
+        Initialize the breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit (0 never opens it)
+            reset_timeout: Seconds before an open circuit allows a trial request
+            name: Name used in log messages
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.failures = 0
+        self.times_opened = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probe_started = 0.0
+        self.lock = threading.Lock()
+    
+    def _current_state(self, now: float) -> str:
+        """Get the state, turning an expired open circuit half-open (lock must be held)."""
+        if self._state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+    
+    def _probe_pending(self, now: float) -> bool:
+        """Check whether a trial request is still out (lock must be held)."""
+        # A trial request that never reported back stops blocking after reset_timeout
+        return bool(self._probe_started) and now - self._probe_started < self.reset_timeout
+    
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self.lock:
+            return self._current_state(time.monotonic())
+    
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent, claiming the trial request when half-open.
+        
+        Returns:
+            True if the request may be sent
+        """
+        with self.lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == self.CLOSED:
+                return True
+            if state == self.OPEN or self._probe_pending(now):
+                return False
+            
+            self._state = self.HALF_OPEN
+            self._probe_started = now
+            logger.info(f"Circuit for {self.name} half-open, sending trial request")
+            return True
+    
+    def is_available(self) -> bool:
+        """Check whether allow_request() would let a request through, without claiming anything."""
+        with self.lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            return state == self.CLOSED or (state == self.HALF_OPEN and not self._probe_pending(now))
+    
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit."""
+        with self.lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self.failures = 0
+            self._probe_started = 0.0
+    
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit at the threshold or after a failed trial."""
+        with self.lock:
+            now = time.monotonic()
+            self.failures += 1
+            state = self._current_state(now)
+            if not self.failure_threshold or state == self.OPEN:
+                return
+            if state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self.opened_at = now
+                self._probe_started = 0.0
+                self.times_opened += 1
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures, "
+                               f"retrying in {self.reset_timeout:.0f} seconds")
+    
+    def retry_in(self) -> float:
+        """
+        Get the time until an open circuit allows a trial request.
+        
+        Returns:
+            Seconds until the circuit turns half-open (0 if it isn't open)
+        """
+        with self.lock:
+            if self._current_state(time.monotonic()) != self.OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the breaker state.
+        
+        Returns:
+            Dictionary with state, failures, times_opened and retry_in
+        """
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "retry_in": self.retry_in()
+        }
+
+
+class ApiEndpoint:
+    """
+    An API endpoint of the client's pool with its rate limiter, circuit
+    breaker and recent response latencies.
+    """
+    
+    # Latencies kept for the hedging percentile
+    LATENCY_WINDOW = 100
+    
+    # Latencies needed before the percentile is trusted
+    MIN_LATENCY_SAMPLES = 20
+    
+    def __init__(self, url: str, api_key: str, rate_limiter: AdaptiveRateLimiter, breaker: CircuitBreaker):
+        """
+        Initialize the endpoint.
+        
+        Args:
+            url: API URL
+            api_key: API key for this endpoint
+            rate_limiter: Rate limiter for requests to this endpoint
+            breaker: Circuit breaker tracking the endpoint's health
+        """
+        self.url = url
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.successes = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+    
+    def record_success(self, latency: Optional[float] = None) -> None:
+        """
+        Record a successful response.
+        
+        Args:
+            latency: Seconds until the complete response arrived (None to leave it out of the percentile)
+        """
+        with self.lock:
+            self.successes += 1
+            if latency is not None:
+                self.latencies.append(latency)
+        self.breaker.record_success()
+    
+    def record_failure(self) -> None:
+        """Record a server error or network failure."""
+        with self.lock:
+            self.failures += 1
+        self.breaker.record_failure()
+    
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Get a percentile of the recent response latencies.
+        
+        Args:
+            percentile: Percentile between 0 and 100
+            
+        Returns:
+            Latency in seconds, or None if there are too few samples
+        """
+        with self.lock:
+            samples = sorted(self.latencies)
+        if len(samples) < self.MIN_LATENCY_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get endpoint statistics.
+        
+        Returns:
+            Dictionary with url, successes, failures, p50 and p95 latency and the circuit state
+        """
+        stats = {
+            "url": self.url,
+            "successes": self.successes,
+            "failures": self.failures,
+            "p50_latency": self.latency_percentile(50),
+            "p95_latency": self.latency_percentile(95)
+        }
+        stats["circuit"] = self.breaker.stats()
+        return stats
+
+
+class InFlightRequest:
+    """
+    A request that concurrent identical calls share.
+    
+    The first caller sends the request; later callers with the same cache
+    key wait for its result (or its error) instead of sending their own, and
+    receive its streamed text as it arrives.
+    """
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.text = ""
+        self.listeners = []
+        self.lock = threading.Lock()
+    
+    def subscribe(self, on_delta: Optional[Callable[[str, str], None]]) -> None:
+        """
+        Add a delta callback, catching it up on the text received so far.
+        
+        Args:
+            on_delta: Function called with (delta, text so far), or None
+        """
+        if not on_delta:
+            return
+        with self.lock:
+            self.listeners.append(on_delta)
+            text = self.result if self.done.is_set() and self.result else self.text
+        if text:
+            LLMApiClient._report_delta(on_delta, text, text)
+    
+    def publish(self, delta: str, text: str) -> None:
+        """Pass a streamed delta on to every subscriber."""
+        with self.lock:
+            self.text = text
+            listeners = list(self.listeners)
+        for on_delta in listeners:
+            LLMApiClient._report_delta(on_delta, delta, text)
+    
+    def finish(self, result: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        """
+        Complete the request and wake up the waiting callers.
+        
+        Args:
+            result: Response text on success
+            error: Exception the request failed with
+        """
+        with self.lock:
+            self.result = result
+            self.error = error
+            # Subscribers of a request that didn't stream get the text in one piece
+            listeners = list(self.listeners) if result and result != self.text else []
+        for on_delta in listeners:
+            LLMApiClient._report_delta(on_delta, result, result)
+        self.done.set()
+    
+    def wait(self) -> str:
+        """
+        Wait for the request to complete.
+        
+        Returns:
+            Response text
+            
+        Raises:
+            Exception: The error the shared request failed with
+        """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@dataclass
+class PreparedRequest:
+    """Request content read and encoded ahead of sending (see LLMApiClient.prepare_request)."""
+    prompt: str
+    image_files: List[str] = field(default_factory=list)
+    image_bytes: List[bytes] = field(default_factory=list)  # Raw file content, used for the cache key
+    system: Optional[str] = None
+    response_schema: Optional[Dict[str, Any]] = None
+    images: Optional[List[Tuple[str, str]]] = None  # (base64 data, media type) pairs, None until encoded
+
+
 class LLMApiClient:
     """
     Client for interacting with various LLM APIs (Claude, LLaVA, etc.)
     with retrying, rate limiting, and caching.
     """
     
+    # Number of prepared (resized and re-encoded) images kept in memory
+    PREPARED_IMAGE_CACHE_SIZE = 64
+    
     def __init__(self, config: ApiConfig):
         """
         Initialize the API client.
@@ -87,32 +1070,154 @@ class LLMApiClient:
             config: API configuration
         """
         self.config = config
-        self.cache = {}  # Simple memory cache
+        self.cache = ResponseCache(
+            config.cache_path,
+            max_age_days=config.cache_max_age_days,
+            max_size_mb=config.cache_max_size_mb
+        )
         self.last_request_time = 0  # Time of last request for rate limiting
-    
-    def _enforce_rate_limit(self) -> None:
-        """Enforce rate limiting by delaying if needed."""
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
         
-        if elapsed < self.config.delay and self.last_request_time > 0:
-            # Need to wait
-            sleep_time = self.config.delay - elapsed
-            logger.debug(f"Rate limiting: Sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+        # Prepared upload bytes keyed by (path, mtime, size)
+        self._prepared_images = OrderedDict()
+        self._prepared_lock = threading.Lock()
+        
+        # Shared by all workers; the configured delay is the starting pace and
+        # the limiter adapts it to throttling and the provider's rate limit headers
+        rate = 1.0 / config.delay if config.delay > 0 else 0
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate,
+            max_rate=config.max_requests_per_second,
+            max_concurrent=config.max_concurrent,
+            adaptive=config.adaptive_rate_limit
+        )
+        
+        # Primary endpoint first, then the fallbacks in order; each has its own
+        # health tracking, and fallbacks have their own rate limits
+        self.endpoints = [self._create_endpoint(config.api_url, config.api_key, self.rate_limiter)]
+        for fallback in config.fallback_endpoints:
+            if fallback.get("api_url"):
+                self.endpoints.append(self._create_endpoint(
+                    fallback["api_url"],
+                    fallback.get("api_key") or config.api_key,
+                    AdaptiveRateLimiter(
+                        rate,
+                        max_rate=config.max_requests_per_second,
+                        max_concurrent=config.max_concurrent,
+                        adaptive=config.adaptive_rate_limit
+                    )
+                ))
+        self.failovers = 0
+        self.hedged_requests = 0
+        self._hedge_executor = None
+        self._hedge_workers = 2 * max(1, config.max_concurrent)
+        self._hedge_running = 0
+        self._hedge_lock = threading.Lock()
+        
+        # Token usage reported by the API, including prompt cache reads and writes
+        self.token_usage = dict.fromkeys(
+            ("responses", "input_tokens", "cached_input_tokens", "cache_write_tokens", "output_tokens"), 0
+        )
+        self._usage_lock = threading.Lock()
+        
+        # Identical requests in progress, keyed by cache key
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self.coalesced_requests = 0
+        
+        # Source of each thread's last response, so callers can tell requests sent from cache hits
+        self._response_source = threading.local()
+        
+        # Keep-alive connections, one pool per endpoint sized to the concurrency
+        self.transport = HttpTransport(
+            pool_size=config.pool_size or config.max_concurrent,
+            http2=config.http2,
+            gzip_requests=config.gzip_requests
+        )
+    
+    def _create_endpoint(self, url: str, api_key: str, rate_limiter: AdaptiveRateLimiter) -> ApiEndpoint:
+        """Create a pool endpoint with a circuit breaker from the configuration."""
+        breaker = CircuitBreaker(
+            failure_threshold=self.config.circuit_failure_threshold,
+            reset_timeout=self.config.circuit_reset_seconds,
+            name=url
+        )
+        return ApiEndpoint(url, api_key, rate_limiter, breaker)
+    
+    def _enforce_rate_limit(self, rate_limiter: Optional[AdaptiveRateLimiter] = None) -> None:
+        """Enforce rate limiting by delaying if needed (release the slot with rate_limiter.release())."""
+        (rate_limiter or self.rate_limiter).acquire()
         
         # Update last request time
         self.last_request_time = time.time()
     
-    def _get_cache_key(self, endpoint: str, data: Dict[str, Any]) -> str:
-        """Generate a cache key for a request."""
-        # Simple string representation of the request
-        return f"{endpoint}:{hash(json.dumps(data, sort_keys=True))}"
+    def _get_cache_key(self, prompt: str, image_bytes: Optional[Union[bytes, List[bytes]]] = None,
+                       system: Optional[str] = None, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """Generate a cache key for a request from its content."""
+        if system:
+            prompt = f"{system}\x00{prompt}"
+        if response_schema:
+            prompt = f"{json.dumps(response_schema, sort_keys=True)}\x00{prompt}"
+        if isinstance(image_bytes, list):
+            # Several images are keyed on the digests of each image in order
+            image_bytes = image_bytes[0] if len(image_bytes) == 1 else b"".join(
+                hashlib.sha256(data).digest() for data in image_bytes
+            ) or None
+        if image_bytes:
+            # Responses depend on how the image was prepared for upload
+            settings = f"{self.config.image_format}:{self.config.image_max_edge}:{self.config.image_quality}"
+            return ResponseCache.make_key(prompt, self.config.api_url, image_bytes, settings)
+        return ResponseCache.make_key(prompt, self.config.api_url)
     
-    def _detect_api_type(self) -> str:
-        """Detect the API type from the URL."""
-        url = self.config.api_url.lower()
-        if "claude" in url:
+    def _prepare_image(self, image_path: str, image_bytes: bytes) -> Tuple[bytes, str]:
+        """
+        Prepare an image for upload, reusing earlier results for unchanged files.
+        
+        Args:
+            image_path: Path to the image file
+            image_bytes: Raw content of the image file
+            
+        Returns:
+            Tuple of (bytes to upload, media type)
+        """
+        original_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+        if not self.config.image_format:
+            return image_bytes, original_type
+        
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        with self._prepared_lock:
+            if key in self._prepared_images:
+                self._prepared_images.move_to_end(key)
+                return self._prepared_images[key]
+        
+        try:
+            from ebay_tools.utils.image_utils import prepare_image_for_upload
+            prepared = prepare_image_for_upload(
+                image_path,
+                max_edge=self.config.image_max_edge,
+                format=self.config.image_format,
+                quality=self.config.image_quality
+            )
+        except Exception as e:
+            logger.warning(f"Could not prepare {os.path.basename(image_path)} for upload, "
+                           f"sending original file: {str(e)}")
+            return image_bytes, original_type
+        
+        # Never upload more than the original
+        if len(prepared[0]) >= len(image_bytes) and original_type in ("image/jpeg", "image/png", "image/webp"):
+            prepared = (image_bytes, original_type)
+        
+        with self._prepared_lock:
+            self._prepared_images[key] = prepared
+            while len(self._prepared_images) > self.PREPARED_IMAGE_CACHE_SIZE:
+                self._prepared_images.popitem(last=False)
+        
+        return prepared
+    
+    def _detect_api_type(self, api_url: Optional[str] = None) -> str:
+        """Detect the API type from the URL (defaults to the configured URL)."""
+        url = (api_url or self.config.api_url).lower()
+        if "claude" in url or "anthropic" in url:
             return "claude"
         elif "llava" in url:
             return "llava"
@@ -129,18 +1234,192 @@ class LLMApiClient:
         else:
             return "unknown"
     
-    def create_request_payload(self, prompt: str, image_data: Optional[str] = None) -> Dict[str, Any]:
+    def supports_multi_image(self) -> bool:
+        """Check whether the API accepts several images in one request."""
+        return self._detect_api_type() in ("claude", "openai")
+    
+    def supports_streaming(self, api_url: Optional[str] = None) -> bool:
+        """Check whether the API (at api_url, defaults to the configured URL) can stream server-sent events."""
+        return self._detect_api_type(api_url) in ("claude", "openai")
+    
+    def extract_stream_delta(self, event_data: Dict[str, Any], api_url: Optional[str] = None) -> Optional[str]:
+        """
+        Extract the text delta from a streamed response event.
+        
+        Args:
+            event_data: Parsed JSON data of a server-sent event
+            api_url: URL the response came from (defaults to the configured URL)
+            
+        Returns:
+            Text added by the event, or None if it carries no text
+            
+        Raises:
+            ApiError: If the event reports an error
+        """
+        if event_data.get("type") == "error" or "error" in event_data:
+            error = event_data.get("error", event_data)
+            message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+            raise ApiError(f"API error during streaming: {message}", response_text=json.dumps(event_data))
+        
+        api_type = self._detect_api_type(api_url)
+        if api_type == "claude":
+            # Claude: content_block_delta events with text_delta payloads
+            delta = event_data.get("delta", {})
+            if event_data.get("type") == "content_block_delta" and delta.get("type") == "text_delta":
+                return delta.get("text")
+            # Structured output arrives as the input of a forced tool call
+            if event_data.get("type") == "content_block_delta" and delta.get("type") == "input_json_delta":
+                return delta.get("partial_json")
+        elif api_type == "openai":
+            # OpenAI: chat completion chunks
+            choices = event_data.get("choices") or []
+            if choices:
+                return (choices[0].get("delta") or {}).get("content")
+        
+        return None
+    
+    def _read_event_stream(self, response, on_delta: Callable[[str, str], None],
+                           api_url: Optional[str] = None) -> str:
+        """
+        Read a streamed response, reporting each text delta.
+        
+        Args:
+            response: Streamed response
+            on_delta: Function called with (delta, text so far) for each delta
+            api_url: URL the response came from (defaults to the configured URL)
+            
+        Returns:
+            Complete response text
+        """
+        text = ""
+        for event, data in iter_sse_events(self.transport.iter_lines(response)):
+            if data == "[DONE]":
+                break
+            try:
+                event_data = json.loads(data)
+            except json.JSONDecodeError:
+                logger.debug(f"Ignoring non-JSON stream event: {data[:100]}")
+                continue
+            
+            if event == "error" and "error" not in event_data:
+                event_data = {"error": event_data}
+            
+            # Claude reports input usage in message_start and the final output count in
+            # message_delta, OpenAI reports the whole usage in the last chunk
+            usage = event_data.get("usage") or (event_data.get("message") or {}).get("usage")
+            if isinstance(usage, dict):
+                if event_data.get("type") == "message_start":
+                    usage = dict(usage, output_tokens=0)
+                elif event_data.get("type") == "message_delta":
+                    usage = {"output_tokens": usage.get("output_tokens") or 0}
+                self._record_usage(usage, count_response=event_data.get("type") != "message_delta")
+            delta = self.extract_stream_delta(event_data, api_url)
+            if delta:
+                text += delta
+                self._report_delta(on_delta, delta, text)
+            
+            if event_data.get("type") == "message_stop":
+                break
+        
+        return text
+    
+    def _record_usage(self, usage: Dict[str, Any], count_response: bool = True) -> None:
+        """
+        Add the token usage of a response to the totals.
+        
+        Args:
+            usage: Usage object of a Claude or OpenAI response
+            count_response: Whether this is the first usage report of the response
+        """
+        cached = usage.get("cache_read_input_tokens") or 0
+        if "prompt_tokens" in usage:
+            # OpenAI counts cached tokens as part of the prompt tokens
+            cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+            input_tokens = (usage.get("prompt_tokens") or 0) - cached
+            output_tokens = usage.get("completion_tokens") or 0
+        else:
+            input_tokens = usage.get("input_tokens") or 0
+            output_tokens = usage.get("output_tokens") or 0
+        
+        with self._usage_lock:
+            self.token_usage["responses"] += 1 if count_response else 0
+            self.token_usage["input_tokens"] += input_tokens
+            self.token_usage["cached_input_tokens"] += cached
+            self.token_usage["cache_write_tokens"] += usage.get("cache_creation_input_tokens") or 0
+            self.token_usage["output_tokens"] += output_tokens
+    
+    @staticmethod
+    def _report_delta(on_delta: Callable[[str, str], None], delta: str, text: str) -> None:
+        """Call a delta callback, logging (not raising) its errors."""
+        try:
+            on_delta(delta, text)
+        except Exception as e:
+            logger.warning(f"Error in streaming callback: {str(e)}")
+    
+    def create_request_payload(self, prompt: str, image_data: Optional[str] = None,
+                               media_type: str = "image/jpeg",
+                               images: Optional[List[Tuple[str, str]]] = None,
+                               api_url: Optional[str] = None,
+                               system: Optional[str] = None,
+                               response_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Create a request payload based on the API type.
         
         Args:
             prompt: Text prompt for the LLM
             image_data: Base64-encoded image data (optional)
+            media_type: Media type of the image data
+            images: List of (base64 data, media type) tuples to send in a single
+                    message instead of image_data (Claude and OpenAI only)
+            api_url: URL the payload is for (defaults to the configured URL)
+            system: Static instructions shared by many requests (optional). Claude
+                    gets them as a system prompt marked for prompt caching, OpenAI as
+                    a leading system message (cached automatically), and other APIs
+                    after the prompt.
+            response_schema: JSON schema the response must follow (optional). Claude is
+                    made to answer with a call of a tool taking that input, OpenAI gets
+                    a JSON schema response format. Other APIs rely on the prompt asking
+                    for JSON.
             
         Returns:
             Request payload dictionary
+            
+        Raises:
+            ApiError: If several images are given for an API that doesn't support them
         """
-        api_type = self._detect_api_type()
+        api_type = self._detect_api_type(api_url)
+        
+        if system and api_type not in ("claude", "openai"):
+            return self._create_user_payload(api_type, f"{prompt}\n\n{system}", image_data, media_type, images)
+        
+        payload = self._create_user_payload(api_type, prompt, image_data, media_type, images)
+        if system and api_type == "claude":
+            if self.config.prompt_caching:
+                payload["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+            else:
+                payload["system"] = system
+        elif system:
+            payload["messages"].insert(0, {"role": "system", "content": system})
+        
+        if response_schema and api_type == "claude":
+            payload["tools"] = [{
+                "name": STRUCTURED_OUTPUT_NAME,
+                "description": "Record the requested information",
+                "input_schema": response_schema
+            }]
+            payload["tool_choice"] = {"type": "tool", "name": STRUCTURED_OUTPUT_NAME}
+        elif response_schema and api_type == "openai":
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": STRUCTURED_OUTPUT_NAME, "schema": response_schema}
+            }
+        return payload
+    
+    def _create_user_payload(self, api_type: str, prompt: str, image_data: Optional[str],
+                             media_type: str, images: Optional[List[Tuple[str, str]]]) -> Dict[str, Any]:
+        """Create a request payload with the prompt and images in the user turn."""
+        if images:
+            return self._create_multi_image_payload(api_type, prompt, images)
         
         if api_type == "claude" and image_data:
             # Claude multimodal API format
@@ -157,7 +1436,7 @@ class LLMApiClient:
                                 "type": "image",
                                 "source": {
                                     "type": "base64",
-                                    "media_type": "image/jpeg",
+                                    "media_type": media_type,
                                     "data": image_data
                                 }
                             }
@@ -238,7 +1517,7 @@ class LLMApiClient:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_data}"
+                                    "url": f"data:{media_type};base64,{image_data}"
                                 }
                             }
                         ]
@@ -270,23 +1549,72 @@ class LLMApiClient:
                     "prompt": prompt
                 }
     
-    def extract_response_text(self, response_data: Dict[str, Any]) -> str:
+    def _create_multi_image_payload(self, api_type: str, prompt: str,
+                                    images: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Create a payload that sends several images in one user message.
+        
+        Args:
+            api_type: Detected API type
+            prompt: Text prompt for the LLM
+            images: List of (base64 data, media type) tuples
+            
+        Returns:
+            Request payload dictionary
+        """
+        if api_type == "claude":
+            content = [{"type": "text", "text": prompt}]
+            for data, media_type in images:
+                content.append({
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": media_type,
+                        "data": data
+                    }
+                })
+            return {
+                "messages": [{"role": "user", "content": content}],
+                "max_tokens": 2000,
+                "temperature": 0.7
+            }
+        elif api_type == "openai":
+            content = [{"type": "text", "text": prompt}]
+            for data, media_type in images:
+                content.append({
+                    "type": "image_url",
+                    "image_url": {"url": f"data:{media_type};base64,{data}"}
+                })
+            return {
+                "model": "gpt-4-vision-preview",
+                "messages": [{"role": "user", "content": content}],
+                "max_tokens": 2000
+            }
+        
+        raise ApiError(f"API type '{api_type}' does not support multiple images per request")
+    
+    def extract_response_text(self, response_data: Dict[str, Any], api_url: Optional[str] = None) -> str:
         """
         Extract the response text from the API response data.
         
         Args:
             response_data: API response data
+            api_url: URL the response came from (defaults to the configured URL)
             
         Returns:
             Extracted text response
         """
-        api_type = self._detect_api_type()
+        api_type = self._detect_api_type(api_url)
         
         # Log the raw response for debugging
         logger.debug(f"Raw API response ({api_type}): {json.dumps(response_data, indent=2)[:500]}...")
         
         try:
             if api_type == "claude":
+                # Structured output: the input of the forced tool call
+                for block in response_data.get("content") or []:
+                    if isinstance(block, dict) and block.get("type") == "tool_use":
+                        return json.dumps(block.get("input", {}))
                 # Claude format: extract from content array
                 if "content" in response_data:
                     content_arr = response_data.get("content", [])
@@ -345,10 +1673,10 @@ class LLMApiClient:
             
             # Try common response fields as fallback
             common_fields = ["response", "text", "output", "generated_text", "completion", "answer", "result"]
-            for field in common_fields:
-                if field in response_data and isinstance(response_data[field], str):
-                    logger.info(f"Found response in field '{field}'")
-                    return response_data[field]
+            for name in common_fields:
+                if name in response_data and isinstance(response_data[name], str):
+                    logger.info(f"Found response in field '{name}'")
+                    return response_data[name]
             
             # If response_data is a string itself
             if isinstance(response_data, str):
@@ -367,7 +1695,12 @@ class LLMApiClient:
         self, 
         prompt: str, 
         image_path: Optional[str] = None,
-        use_cache: bool = True
+        use_cache: bool = True,
+        image_paths: Optional[List[str]] = None,
+        on_delta: Optional[Callable[[str, str], None]] = None,
+        system: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        prepared: Optional[PreparedRequest] = None
     ) -> str:
         """
         Make an API request with retrying and caching.
@@ -376,143 +1709,545 @@ class LLMApiClient:
             prompt: Text prompt for the LLM
             image_path: Path to an image file (optional)
             use_cache: Whether to use cache for this request
+            image_paths: Paths to several image files sent in one message (optional)
+            on_delta: Optional function called with (delta, text so far) as the response
+                      streams in. APIs that can't stream (and cached responses) report
+                      the whole text as one delta. A retried request starts again from
+                      an empty text.
+            system: Static instructions sent ahead of the prompt (see create_request_payload)
+            response_schema: JSON schema the response must follow (see create_request_payload);
+                             the response text is then the JSON object
+            prepared: Request prepared by prepare_request, used instead of prompt,
+                      images, system and response_schema (optional)
             
         Returns:
             Text response from the API
         """
         # Check API key
+        self._response_source.value = None
         if not self.config.api_key:
             raise ApiError("API key is missing")
+        self._response_source.value = RESPONSE_FROM_NETWORK
+        
+        # Read image data if provided; encoding waits until we know the response isn't cached
+        if prepared is None:
+            prepared = self.prepare_request(
+                prompt, ([image_path] if image_path else []) + list(image_paths or []),
+                system, response_schema, encode=False
+            )
+        image_files = prepared.image_files
+        
+        if image_files:
+            image_path = image_files[0]
+            image_label = image_path if len(image_files) == 1 else f"{len(image_files)} images"
+        
+        # Check cache before paying for encoding and the request
+        cache_key = self._get_cache_key(
+            prepared.prompt, prepared.image_bytes, prepared.system, prepared.response_schema
+        ) if use_cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Using cached response for: {image_label if image_files else 'text prompt'}")
+                self._response_source.value = RESPONSE_FROM_CACHE
+                if on_delta:
+                    self._report_delta(on_delta, cached, cached)
+                return cached
+        
+        if not cache_key:
+            return self._send_request(prepared, None, on_delta)
+        
+        # Share one network call between concurrent identical requests
+        in_flight, is_leader = self._join_in_flight(cache_key, on_delta)
+        if not is_leader:
+            logger.info(f"Waiting for identical request in flight: {image_label if image_files else 'text prompt'}")
+            self._response_source.value = RESPONSE_COALESCED
+            return in_flight.wait()
+        
+        try:
+            response_text = self._send_request(prepared, cache_key, in_flight.publish if on_delta else None)
+        except BaseException as e:
+            in_flight.finish(error=e)
+            raise
+        else:
+            in_flight.finish(result=response_text)
+        finally:
+            self._leave_in_flight(cache_key)
+        
+        return response_text
+    
+    def prepare_request(
+        self,
+        prompt: str,
+        image_paths: Optional[List[str]] = None,
+        system: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        encode: bool = True
+    ) -> PreparedRequest:
+        """
+        Read and encode the content of a request without sending it.
         
-        # Prepare image data if provided
-        image_data = None
-        if image_path:
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image file not found: {image_path}")
+        Preparing the next requests while one is in flight keeps file I/O and
+        image encoding off the critical path (see make_request's prepared).
+        Images of a request whose response is cached are not encoded.
+        
+        Args:
+            prompt: Text prompt for the LLM
+            image_paths: Paths of the images to send (optional)
+            system: Static instructions sent ahead of the prompt (optional)
+            response_schema: JSON schema the response must follow (optional)
+            encode: Whether to encode the images now rather than when sending
+            
+        Returns:
+            Prepared request
+            
+        Raises:
+            FileNotFoundError: If an image file doesn't exist
+            ApiError: If an image file can't be read
+        """
+        prepared = PreparedRequest(prompt, list(image_paths or []), [], system, response_schema)
+        for path in prepared.image_files:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Image file not found: {path}")
             
             try:
-                with open(image_path, "rb") as f:
-                    image_bytes = f.read()
-                    image_data = base64.b64encode(image_bytes).decode("utf-8")
+                with open(path, "rb") as f:
+                    prepared.image_bytes.append(f.read())
             except Exception as e:
                 raise ApiError(f"Failed to read image file: {str(e)}")
         
-        # Create request payload
-        payload = self.create_request_payload(prompt, image_data)
+        if encode and prepared.image_files:
+            cache_key = self._get_cache_key(prompt, prepared.image_bytes, system, response_schema)
+            # Membership test, so the lookup doesn't count as a cache hit or miss
+            if cache_key not in self.cache:
+                prepared.images = self._encode_images(prepared.image_files, prepared.image_bytes)
         
-        # Check cache
-        if use_cache:
-            cache_key = self._get_cache_key(self.config.api_url, payload)
-            if cache_key in self.cache:
-                logger.info(f"Using cached response for: {image_path if image_path else 'text prompt'}")
-                return self.cache[cache_key]
+        return prepared
+    
+    def _encode_images(self, image_files: List[str], image_bytes: List[bytes]) -> List[Tuple[str, str]]:
+        """Resize and base64-encode images for upload, returning (data, media type) pairs."""
+        prepared = [
+            self._prepare_image(path, data) for path, data in zip(image_files, image_bytes)
+        ]
+        return [(base64.b64encode(data).decode("utf-8"), media_type) for data, media_type in prepared]
+    
+    def _join_in_flight(self, cache_key: str,
+                        on_delta: Optional[Callable[[str, str], None]]) -> Tuple[InFlightRequest, bool]:
+        """
+        Join the in-flight request for a cache key, starting one if there is none.
         
-        # Prepare headers
-        headers = {
-            "x-api-key": self.config.api_key,
-            "Content-Type": "application/json"
-        }
+        Args:
+            cache_key: Cache key of the request
+            on_delta: Delta callback of the caller (optional)
+            
+        Returns:
+            (in-flight request, True if the caller must send it) tuple
+        """
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(cache_key)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = InFlightRequest()
+                self._in_flight[cache_key] = in_flight
+            else:
+                self.coalesced_requests += 1
         
-        # Set API-specific headers
-        api_type = self._detect_api_type()
-        if api_type == "openai":
-            headers = {
-                "Authorization": f"Bearer {self.config.api_key}",
-                "Content-Type": "application/json"
-            }
+        in_flight.subscribe(on_delta)
+        return in_flight, is_leader
+    
+    def _leave_in_flight(self, cache_key: str) -> None:
+        """Forget the in-flight request for a cache key once it has completed."""
+        with self._in_flight_lock:
+            self._in_flight.pop(cache_key, None)
+    
+    def _send_request(
+        self,
+        prepared: PreparedRequest,
+        cache_key: Optional[str],
+        on_delta: Optional[Callable[[str, str], None]]
+    ) -> str:
+        """
+        Encode and send a request with retrying and failover, caching the response.
+        
+        Attempts go to the first endpoint of the pool whose circuit is closed.
+        A retriable failure moves on to the next healthy endpoint right away,
+        and only backs off when no other endpoint is available.
+        
+        Args:
+            prepared: Request content, encoded here if it hasn't been yet
+            cache_key: Cache key for the response (None to skip caching)
+            on_delta: Optional function called with (delta, text so far) as the response streams in
+            
+        Returns:
+            Text response from the API
+            
+        Raises:
+            CircuitOpenError: If every endpoint's circuit was open, so nothing was sent
+            ApiError: If the request failed
+        """
+        # Encode the images once for all endpoints
+        images = prepared.images
+        if images is None:
+            images = self._encode_images(prepared.image_files, prepared.image_bytes)
+        prompt, system, response_schema = prepared.prompt, prepared.system, prepared.response_schema
         
-        # Make the request with retrying
+        # Create a request payload per API type in the pool
+        payloads = {}
+        candidates = []
+        payload_error = None
+        for endpoint in self.endpoints:
+            api_type = self._detect_api_type(endpoint.url)
+            if api_type not in payloads:
+                try:
+                    if len(images) > 1:
+                        payload = self.create_request_payload(prompt, images=images, api_url=endpoint.url,
+                                                              system=system, response_schema=response_schema)
+                    elif images:
+                        payload = self.create_request_payload(prompt, images[0][0], images[0][1],
+                                                              api_url=endpoint.url, system=system,
+                                                              response_schema=response_schema)
+                    else:
+                        payload = self.create_request_payload(prompt, api_url=endpoint.url, system=system,
+                                                              response_schema=response_schema)
+                except ApiError as e:
+                    payload = None
+                    payload_error = e
+                # Stream the response when someone is watching it arrive
+                if payload is not None and on_delta and self.supports_streaming(endpoint.url):
+                    payload["stream"] = True
+                    if api_type == "openai":
+                        # Token usage, including cached prompt tokens, is only sent when asked for
+                        payload["stream_options"] = {"include_usage": True}
+                payloads[api_type] = payload
+            if payloads[api_type] is not None:
+                candidates.append((endpoint, payloads[api_type]))
+        
+        if not candidates:
+            raise payload_error
+        
+        # Make the request with retrying and failover
+        last_error = None
+        failed_endpoint = None
         for attempt in range(self.config.max_retries):
-            try:
-                # Enforce rate limiting
-                self._enforce_rate_limit()
-                
-                # Log the request
-                logger.info(f"Sending request to {self.config.api_url}")
-                if image_path:
-                    logger.info(f"With image: {os.path.basename(image_path)}")
-                logger.info(f"Prompt: {prompt[:100]}...")
-                logger.debug(f"Request headers: {headers}")
-                logger.debug(f"Request payload (without image data): {json.dumps({k: v for k, v in payload.items() if k not in ['images', 'image_data']}, indent=2)[:500]}...")
-                
-                # Make the request
-                response = requests.post(
-                    self.config.api_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=self.config.timeout
+            endpoint, payload = self._choose_endpoint(candidates, avoid=failed_endpoint)
+            if endpoint is None:
+                if last_error is not None:
+                    # The circuits opened on this request's own failures
+                    raise last_error
+                retry_in = min(candidate.breaker.retry_in() for candidate, _ in candidates)
+                raise CircuitOpenError(
+                    f"API unavailable: circuit open for all endpoints, next trial in {retry_in:.0f} seconds",
+                    retry_in
                 )
-                
-                # Handle response
-                if response.status_code == 200:
-                    # Log raw response for debugging
-                    logger.debug(f"Response status: {response.status_code}")
-                    logger.debug(f"Response headers: {dict(response.headers)}")
-                    
-                    # Parse response
-                    try:
-                        result = response.json()
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse JSON response: {str(e)}")
-                        logger.error(f"Raw response text: {response.text[:500]}...")
-                        # Try to return raw text if it's not JSON
-                        if response.text.strip():
-                            return response.text.strip()
-                        raise ApiError(f"Invalid JSON response: {str(e)}", response.status_code, response.text)
-                    
-                    # Extract text
-                    response_text = self.extract_response_text(result)
-                    
-                    if not response_text or response_text == "{}" or response_text == "[]":
-                        logger.error(f"Empty or invalid response extracted")
-                        logger.error(f"Full response: {json.dumps(result, indent=2)[:1000]}...")
-                        raise ApiError("Empty response from API", response.status_code, json.dumps(result))
-                    
-                    # Cache the response
-                    if use_cache:
-                        cache_key = self._get_cache_key(self.config.api_url, payload)
-                        self.cache[cache_key] = response_text
-                    
-                    # Log successful response
-                    logger.info(f"Successfully received response: {response_text[:100]}...")
-                    
-                    # Return the response
-                    return response_text
-                else:
-                    error_msg = f"API Error: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    
-                    # Some status codes are worth retrying, others not
-                    if response.status_code in [429, 500, 502, 503, 504]:
-                        # Exponential backoff
-                        if attempt < self.config.max_retries - 1:
-                            wait_time = (2 ** attempt) * 1.5
-                            logger.info(f"Retrying in {wait_time:.1f} seconds... (Attempt {attempt+1}/{self.config.max_retries})")
-                            time.sleep(wait_time)
-                            continue
-                    
-                    # If we get here, either it's not a retriable error or we've exhausted retries
-                    raise ApiError(error_msg, response.status_code, response.text)
             
+            try:
+                response_text, cacheable = self._attempt_with_hedge(
+                    endpoint, payload, candidates, prompt, prepared.image_files, on_delta
+                )
             except requests.RequestException as e:
                 # Network-level errors
                 logger.error(f"Request error: {str(e)}")
+                last_error = ApiError(f"Max retries exceeded: {str(e)}")
+            except ApiError as e:
+                # Some status codes are worth retrying, others not
+                if e.status_code not in RETRIABLE_STATUS_CODES:
+                    raise
+                last_error = e
+            else:
+                # Cache the response
+                if cache_key and cacheable:
+                    self.cache.set(cache_key, response_text)
+                return response_text
+            
+            if attempt == self.config.max_retries - 1:
+                break
+            
+            # Fail over right away when another endpoint is healthy
+            failed_endpoint = endpoint
+            if any(other is not endpoint and other.breaker.is_available() for other, _ in candidates):
+                self.failovers += 1
+                logger.info(f"Failing over from {endpoint.url} (Attempt {attempt+1}/{self.config.max_retries})")
+                continue
+            
+            # No point in backing off once the circuit has opened
+            if not endpoint.breaker.is_available():
+                break
+            
+            # Wait as long as the server asked, otherwise back off exponentially
+            wait_time = last_error.retry_after if last_error.retry_after is not None else (2 ** attempt) * 1.5
+            logger.info(f"Retrying in {wait_time:.1f} seconds... (Attempt {attempt+1}/{self.config.max_retries})")
+            time.sleep(wait_time)
+        
+        raise last_error or ApiError("Max retries exceeded")
+    
+    def _choose_endpoint(self, candidates: List[Tuple[ApiEndpoint, Dict[str, Any]]],
+                         avoid: Optional[ApiEndpoint] = None) -> Tuple[Optional[ApiEndpoint], Optional[Dict[str, Any]]]:
+        """
+        Choose the first endpoint whose circuit lets a request through.
+        
+        Args:
+            candidates: (endpoint, payload) tuples in preference order
+            avoid: Endpoint to use only if no other one is available
+            
+        Returns:
+            (endpoint, payload) tuple, or (None, None) if every circuit is open
+        """
+        for endpoint, payload in candidates:
+            if endpoint is not avoid and endpoint.breaker.allow_request():
+                return endpoint, payload
+        for endpoint, payload in candidates:
+            if endpoint is avoid and endpoint.breaker.allow_request():
+                return endpoint, payload
+        return None, None
+    
+    def _build_headers(self, endpoint: ApiEndpoint) -> Dict[str, str]:
+        """Build the request headers for an endpoint."""
+        if self._detect_api_type(endpoint.url) == "openai":
+            return {
+                "Authorization": f"Bearer {endpoint.api_key}",
+                "Content-Type": "application/json"
+            }
+        return {
+            "x-api-key": endpoint.api_key,
+            "Content-Type": "application/json"
+        }
+    
+    def _submit_hedge_request(self, *args: Any) -> Optional[Future]:
+        """
+        Run _post_to_endpoint on the hedging thread pool if one of its threads is free.
+        
+        Requests that lost a race keep their thread until they finish, so
+        nothing is ever queued behind them: when every thread is busy the
+        caller sends its request directly instead.
+        
+        Returns:
+            Future of the request, or None if no thread is free
+        """
+        with self._hedge_lock:
+            if self._hedge_running >= self._hedge_workers:
+                return None
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self._hedge_workers,
+                    thread_name_prefix="api-hedge"
+                )
+            self._hedge_running += 1
+            executor = self._hedge_executor
+        
+        try:
+            future = executor.submit(self._post_to_endpoint, *args)
+        except RuntimeError:
+            # The client was closed meanwhile
+            future = None
+        if future is None:
+            self._hedge_finished(None)
+        else:
+            future.add_done_callback(self._hedge_finished)
+        return future
+    
+    def _hedge_finished(self, future: Optional[Future]) -> None:
+        """Free the hedging thread reserved by _submit_hedge_request."""
+        with self._hedge_lock:
+            self._hedge_running -= 1
+    
+    def _attempt_with_hedge(
+        self,
+        endpoint: ApiEndpoint,
+        payload: Dict[str, Any],
+        candidates: List[Tuple[ApiEndpoint, Dict[str, Any]]],
+        prompt: str,
+        image_files: List[str],
+        on_delta: Optional[Callable[[str, str], None]]
+    ) -> Tuple[str, bool]:
+        """
+        Send one attempt, hedging it with a second request if it runs slow.
+        
+        When the response takes longer than the endpoint's configured latency
+        percentile, the same request goes to the next healthy fallback endpoint
+        and the first successful response wins. The wait is timed from when the
+        request is sent, so rate limiting doesn't trigger a hedge. Streamed
+        requests are never hedged, since their text is already being shown.
+        
+        Args:
+            endpoint: Endpoint for the first request
+            payload: Request payload for the endpoint
+            candidates: (endpoint, payload) tuples of the pool
+            prompt: Text prompt (for logging)
+            image_files: Paths of the images (for logging)
+            on_delta: Optional function called with (delta, text so far) as the response streams in
+            
+        Returns:
+            (response text, whether it may be cached) tuple
+        """
+        hedge_after = None
+        if not on_delta and self.config.hedge_percentile > 0 and len(candidates) > 1:
+            hedge_after = endpoint.latency_percentile(self.config.hedge_percentile)
+        if hedge_after is None:
+            return self._post_to_endpoint(endpoint, payload, prompt, image_files, on_delta)
+        
+        sent = threading.Event()
+        first = self._submit_hedge_request(endpoint, payload, prompt, image_files, None, sent)
+        if first is None:
+            return self._post_to_endpoint(endpoint, payload, prompt, image_files, on_delta)
+        first.add_done_callback(lambda future: sent.set())
+        futures = [first]
+        
+        # Start the clock once the request is sent, not while it waits for the rate limiter
+        sent.wait()
+        done, _ = wait(futures, timeout=hedge_after)
+        
+        if not done:
+            hedge_endpoint, hedge_payload = None, None
+            for other, other_payload in candidates:
+                if other is not endpoint and other.breaker.allow_request():
+                    hedge_endpoint, hedge_payload = other, other_payload
+                    break
+            
+            if hedge_endpoint is not None:
+                hedge = self._submit_hedge_request(hedge_endpoint, hedge_payload, prompt, image_files, None)
+                if hedge is not None:
+                    self.hedged_requests += 1
+                    logger.info(f"No response from {endpoint.url} after {hedge_after:.1f} seconds, "
+                                f"sending hedged request to {hedge_endpoint.url}")
+                    futures.append(hedge)
+        
+        # First success wins; the slower request finishes in the background
+        error = None
+        pending = futures
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = error or e
+        raise error
+    
+    def _post_to_endpoint(
+        self,
+        endpoint: ApiEndpoint,
+        payload: Dict[str, Any],
+        prompt: str,
+        image_files: List[str],
+        on_delta: Optional[Callable[[str, str], None]],
+        sent: Optional[threading.Event] = None
+    ) -> Tuple[str, bool]:
+        """
+        Send a single request to an endpoint and record the endpoint's health.
+        
+        Server errors and network failures count against the endpoint's
+        circuit; throttling and client errors do not.
+        
+        Args:
+            endpoint: Endpoint to send the request to
+            payload: Request payload for the endpoint
+            prompt: Text prompt (for logging)
+            image_files: Paths of the images (for logging)
+            on_delta: Optional function called with (delta, text so far) as the response streams in
+            sent: Event set once the rate limiter lets the request through (optional)
+            
+        Returns:
+            (response text, whether it may be cached) tuple
+            
+        Raises:
+            ApiError: For error responses, with the status code and retry_after
+            requests.RequestException: For network errors
+        """
+        stream = bool(payload.get("stream"))
+        headers = self._build_headers(endpoint)
+        
+        # Enforce rate limiting
+        self._enforce_rate_limit(endpoint.rate_limiter)
+        if sent is not None:
+            sent.set()
+        
+        # Log the request
+        logger.info(f"Sending request to {endpoint.url}")
+        if image_files:
+            logger.info(f"With images: {', '.join(os.path.basename(path) for path in image_files)}")
+        logger.info(f"Prompt: {prompt[:100]}...")
+        logger.debug(f"Request headers: {headers}")
+        logger.debug(f"Request payload (without image data): {json.dumps({k: v for k, v in payload.items() if k not in ['images', 'image_data']}, indent=2)[:500]}...")
+        
+        # Make the request
+        start = time.monotonic()
+        streamed_text = None
+        try:
+            try:
+                response = self.transport.post(endpoint.url, headers, payload, self.config.timeout, stream=stream)
                 
-                if attempt < self.config.max_retries - 1:
-                    wait_time = (2 ** attempt) * 1.5
-                    logger.info(f"Retrying in {wait_time:.1f} seconds... (Attempt {attempt+1}/{self.config.max_retries})")
-                    time.sleep(wait_time)
-                else:
-                    raise ApiError(f"Max retries exceeded: {str(e)}")
+                # Read the event stream while holding the request slot
+                if stream and response.status_code == 200 and is_event_stream(response):
+                    streamed_text = self._read_event_stream(response, on_delta, endpoint.url)
+            finally:
+                endpoint.rate_limiter.release()
+        except (requests.RequestException, ApiError):
+            endpoint.record_failure()
+            raise
+        latency = time.monotonic() - start
+        
+        # Adapt pacing to throttling and rate limit headers
+        retry_after = endpoint.rate_limiter.update(response.status_code, response.headers)
+        
+        # Handle response
+        if response.status_code != 200:
+            error_msg = f"API Error: {response.status_code} - {response.text}"
+            logger.error(error_msg)
+            if response.status_code >= 500:
+                endpoint.record_failure()
+            raise ApiError(error_msg, response.status_code, response.text, retry_after=retry_after)
+        
+        # Log raw response for debugging
+        logger.debug(f"Response status: {response.status_code}")
+        logger.debug(f"Response headers: {dict(response.headers)}")
+        
+        result = None
+        if streamed_text is not None:
+            response_text = streamed_text
+        else:
+            # Parse response
+            try:
+                result = response.json()
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse JSON response: {str(e)}")
+                logger.error(f"Raw response text: {response.text[:500]}...")
+                # Try to return raw text if it's not JSON
+                if response.text.strip():
+                    endpoint.record_success(latency)
+                    return response.text.strip(), False
+                endpoint.record_failure()
+                raise ApiError(f"Invalid JSON response: {str(e)}", response.status_code, response.text)
+            
+            # Extract text
+            response_text = self.extract_response_text(result, endpoint.url)
+            if isinstance(result, dict) and isinstance(result.get("usage"), dict):
+                self._record_usage(result["usage"])
         
-        # This should never be reached due to the exception in the loop
-        raise ApiError("Max retries exceeded")
+        # The endpoint answered, even if the answer turns out to be unusable
+        endpoint.record_success(None if stream else latency)
+        
+        if not response_text or response_text == "{}" or response_text == "[]":
+            logger.error(f"Empty or invalid response extracted")
+            logger.error(f"Full response: {json.dumps(result, indent=2)[:1000]}...")
+            raise ApiError("Empty response from API", response.status_code, json.dumps(result))
+        
+        # The whole response arrived at once
+        if on_delta and streamed_text is None:
+            self._report_delta(on_delta, response_text, response_text)
+        
+        # Log successful response
+        logger.info(f"Successfully received response: {response_text[:100]}...")
+        
+        return response_text, True
     
     def process_photo(
         self, 
         photo_path: str, 
         prompt: str,
-        callback: Optional[Callable[[str], None]] = None
+        callback: Optional[Callable[[str], None]] = None,
+        on_delta: Optional[Callable[[str, str], None]] = None,
+        system: Optional[str] = None,
+        prepared: Optional[PreparedRequest] = None
     ) -> str:
         """
         Process a photo with the LLM.
@@ -521,13 +2256,17 @@ class LLMApiClient:
             photo_path: Path to the photo
             prompt: Text prompt for the LLM
             callback: Optional callback to receive the response
+            on_delta: Optional function called with (delta, text so far) as the response streams in
+            system: Static instructions sent ahead of the prompt (optional)
+            prepared: Request prepared by prepare_request, used instead of the photo,
+                      prompt and system (optional)
             
         Returns:
             Text response from the API
         """
         try:
             logger.info(f"Processing photo: {os.path.basename(photo_path)}")
-            response = self.make_request(prompt, photo_path)
+            response = self.make_request(prompt, photo_path, on_delta=on_delta, system=system, prepared=prepared)
             
             if callback:
                 callback(response)
@@ -538,10 +2277,59 @@ class LLMApiClient:
             logger.error(f"Error processing photo: {str(e)}")
             raise
     
+    def process_item(
+        self,
+        photo_paths: List[str],
+        prompt: str,
+        callback: Optional[Callable[[str], None]] = None,
+        on_delta: Optional[Callable[[str, str], None]] = None,
+        system: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        prepared: Optional[PreparedRequest] = None
+    ) -> str:
+        """
+        Process all photos of an item with the LLM in a single request.
+        
+        Args:
+            photo_paths: Paths to the item's photos, in display order
+            prompt: Text prompt for the LLM
+            callback: Optional callback to receive the response
+            on_delta: Optional function called with (delta, text so far) as the response streams in
+            system: Static instructions sent ahead of the prompt (optional)
+            response_schema: JSON schema the response must follow (optional)
+            prepared: Request prepared by prepare_request, used instead of the photos,
+                      prompt, system and response_schema (optional)
+            
+        Returns:
+            Text response from the API
+            
+        Raises:
+            ApiError: If the API type doesn't support several images per request
+        """
+        if len(photo_paths) > 1 and not self.supports_multi_image():
+            raise ApiError(f"API type '{self._detect_api_type()}' does not support multiple images per request")
+        
+        try:
+            logger.info(f"Processing item with {len(photo_paths)} photos in one request")
+            response = self.make_request(prompt, image_paths=photo_paths, on_delta=on_delta, system=system,
+                                         response_schema=response_schema, prepared=prepared)
+            
+            if callback:
+                callback(response)
+            
+            return response
+            
+        except Exception as e:
+            logger.error(f"Error processing item: {str(e)}")
+            raise
+    
     def generate_text(
         self, 
         prompt: str,
-        callback: Optional[Callable[[str], None]] = None
+        callback: Optional[Callable[[str], None]] = None,
+        on_delta: Optional[Callable[[str, str], None]] = None,
+        system: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         Generate text with the LLM (no image).
@@ -549,13 +2337,15 @@ class LLMApiClient:
         Args:
             prompt: Text prompt for the LLM
             callback: Optional callback to receive the response
+            on_delta: Optional function called with (delta, text so far) as the response streams in
+            system: Static instructions sent ahead of the prompt (optional)
             
         Returns:
             Text response from the API
         """
         try:
             logger.info(f"Generating text response for prompt: {prompt[:50]}...")
-            response = self.make_request(prompt)
+            response = self.make_request(prompt, on_delta=on_delta, system=system, response_schema=response_schema)
             
             if callback:
                 callback(response)
@@ -566,11 +2356,139 @@ class LLMApiClient:
             logger.error(f"Error generating text: {str(e)}")
             raise
     
+    def _process_batch_photo(
+        self,
+        index: int,
+        total: int,
+        photo: Dict[str, str],
+        prompt_template: str
+    ) -> Dict[str, Any]:
+        """
+        Process a single photo of a batch.
+        
+        Args:
+            index: Index of the photo in the batch
+            total: Number of photos in the batch
+            photo: Photo dictionary with at least a 'path' key
+            prompt_template: Template string for the prompt
+            
+        Returns:
+            Copy of the photo dictionary with 'response' and, on failure, 'error' keys
+        """
+        result = photo.copy()
+        photo_path = photo.get("path", "")
+        
+        if not photo_path or not os.path.exists(photo_path):
+            logger.warning(f"Photo {index+1}/{total}: Invalid path - {photo_path}")
+            result["error"] = "Invalid or missing photo path"
+            result["response"] = None
+            return result
+        
+        # Format the prompt with photo data
+        try:
+            prompt = prompt_template.format(**dict(photo, photo_path=photo_path))
+        except KeyError as e:
+            logger.warning(f"Photo {index+1}/{total}: Missing key in prompt template - {e}")
+            prompt = prompt_template.replace("{" + str(e).strip("'") + "}", "")
+        
+        try:
+            logger.info(f"Processing photo {index+1}/{total}: {os.path.basename(photo_path)}")
+            result["response"] = self.make_request(prompt, photo_path)
+        except Exception as e:
+            logger.error(f"Error processing photo {index+1}/{total}: {str(e)}")
+            result["error"] = str(e)
+            result["response"] = None
+        
+        return result
+    
+    def iter_concurrent(
+        self,
+        work: Callable[[Any], Any],
+        tasks: Iterable[Any],
+        max_workers: Optional[int] = None,
+        check_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Iterator[Tuple[Any, Future]]:
+        """
+        Run work on tasks concurrently, yielding each task once it has finished.
+        
+        At most ``max_workers`` tasks run at once and their requests share the
+        client's rate limiter. A task is only taken from ``tasks`` when a
+        worker is free, so a lazy iterable (such as a prefetcher) is not drained
+        ahead of the pool. When ``check_cancelled`` returns True no new tasks
+        are started; tasks already running are allowed to finish and are still
+        yielded before the generator returns.
+        
+        Args:
+            work: Function called with each task in a worker thread
+            tasks: Tasks to run, taken in order
+            max_workers: Number of concurrent tasks (defaults to config.max_concurrent)
+            check_cancelled: Optional function returning True when no more tasks should start
+            
+        Yields:
+            Tuples of (task, finished future) in completion order; the future's
+            result() returns what work returned or raises what it raised
+        """
+        workers = max(1, int(max_workers or self.config.max_concurrent or 1))
+        pending = iter(tasks)
+        in_flight = {}
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="LLMApiClient") as executor:
+            try:
+                while True:
+                    # Keep the pool full unless cancellation was requested
+                    while len(in_flight) < workers and not (check_cancelled and check_cancelled()):
+                        try:
+                            task = next(pending)
+                        except StopIteration:
+                            break
+                        in_flight[executor.submit(work, task)] = task
+                    
+                    if not in_flight:
+                        break
+                    
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield in_flight.pop(future), future
+            finally:
+                if in_flight:
+                    logger.info(f"Draining {len(in_flight)} in-flight requests")
+    
+    def iter_photo_batch(
+        self,
+        photos: List[Dict[str, str]],
+        prompt_template: str,
+        max_workers: Optional[int] = None,
+        check_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Process a batch of photos concurrently, yielding results as they complete.
+        
+        Photos go through iter_concurrent: at most ``max_workers`` requests are
+        in flight at once, and requests in flight when processing is cancelled
+        are still yielded.
+        
+        Args:
+            photos: List of photo dictionaries with at least a 'path' key
+            prompt_template: Template string for prompts, can include {photo_path} and other keys from photo dict
+            max_workers: Number of concurrent requests (defaults to config.max_concurrent)
+            check_cancelled: Optional function returning True when the batch should stop
+            
+        Yields:
+            Tuples of (original index, result dictionary) in completion order
+        """
+        total = len(photos)
+        for (index, _), future in self.iter_concurrent(
+                lambda task: self._process_batch_photo(task[0], total, task[1], prompt_template),
+                enumerate(photos), max_workers, check_cancelled):
+            yield index, future.result()
+    
     def process_photo_batch(
         self,
         photos: List[Dict[str, str]],
         prompt_template: str,
-        callback: Optional[Callable[[int, int, str, str], None]] = None
+        callback: Optional[Callable[[int, int, str, str], None]] = None,
+        max_workers: Optional[int] = None,
+        check_cancelled: Optional[Callable[[], bool]] = None
     ) -> List[Dict[str, Any]]:
         """
         Process a batch of photos, with progress reporting.
@@ -578,69 +2496,125 @@ class LLMApiClient:
         Args:
             photos: List of photo dictionaries with at least a 'path' key
             prompt_template: Template string for prompts, can include {photo_path} and other keys from photo dict
-            callback: Optional callback function that receives (index, total, photo_path, response)
+            callback: Optional callback function that receives (index, total, photo_path, response),
+                      called in completion order
+            max_workers: Number of concurrent requests (defaults to config.max_concurrent)
+            check_cancelled: Optional function returning True when the batch should stop
             
         Returns:
-            List of dictionaries with original photo data plus 'response' and 'error' keys
+            List of dictionaries with original photo data plus 'response' and 'error' keys,
+            in the original photo order. Photos skipped due to cancellation are omitted.
         """
-        results = []
+        results = {}
         total = len(photos)
         
-        for i, photo in enumerate(photos):
-            photo_path = photo.get("path", "")
-            if not photo_path or not os.path.exists(photo_path):
-                logger.warning(f"Photo {i+1}/{total}: Invalid path - {photo_path}")
-                result = photo.copy()
-                result["error"] = "Invalid or missing photo path"
-                result["response"] = None
-                results.append(result)
-                
-                if callback:
-                    callback(i, total, photo_path, None)
-                
-                continue
-                
-            # Format the prompt with photo data
-            try:
-                prompt = prompt_template.format(photo_path=photo_path, **photo)
-            except KeyError as e:
-                logger.warning(f"Photo {i+1}/{total}: Missing key in prompt template - {e}")
-                prompt = prompt_template.replace("{" + str(e).strip("'") + "}", "")
-            
-            # Process the photo
-            try:
-                logger.info(f"Processing photo {i+1}/{total}: {os.path.basename(photo_path)}")
-                response = self.make_request(prompt, photo_path)
-                
-                result = photo.copy()
-                result["response"] = response
-                results.append(result)
-                
-                if callback:
-                    callback(i, total, photo_path, response)
-                
-            except Exception as e:
-                logger.error(f"Error processing photo {i+1}/{total}: {str(e)}")
-                
-                result = photo.copy()
-                result["error"] = str(e)
-                result["response"] = None
-                results.append(result)
-                
-                if callback:
-                    callback(i, total, photo_path, None)
+        for index, result in self.iter_photo_batch(photos, prompt_template, max_workers, check_cancelled):
+            results[index] = result
             
-            # Add a small delay between requests even with rate limiting
-            # to avoid overwhelming the API service
-            if i < total - 1:
-                time.sleep(0.5)
+            if callback:
+                callback(index, total, result.get("path", ""), result.get("response"))
         
-        return results
+        return [results[index] for index in sorted(results)]
     
     def clear_cache(self):
         """Clear the response cache."""
-        self.cache = {}
+        self.cache.clear()
         logger.info("Cache cleared")
+    
+    def last_response_source(self) -> Optional[str]:
+        """
+        Get where the calling thread's last make_request response came from.
+        
+        Returns:
+            RESPONSE_FROM_NETWORK, RESPONSE_FROM_CACHE or RESPONSE_COALESCED,
+            or None if this thread has made no request
+        """
+        return getattr(self._response_source, "value", None)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache statistics.
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries, size_bytes, path and
+            coalesced (requests that shared an identical request in flight)
+        """
+        stats = self.cache.stats()
+        stats["coalesced"] = self.coalesced_requests
+        return stats
+    
+    def get_token_usage(self) -> Dict[str, Any]:
+        """
+        Get the token usage reported by the API.
+        
+        Returns:
+            Dictionary with responses, input_tokens (not read from the prompt cache),
+            cached_input_tokens, cache_write_tokens, output_tokens and
+            cache_hit_rate (share of input tokens read from the prompt cache)
+        """
+        with self._usage_lock:
+            usage = dict(self.token_usage)
+        total_input = usage["input_tokens"] + usage["cached_input_tokens"] + usage["cache_write_tokens"]
+        usage["cache_hit_rate"] = usage["cached_input_tokens"] / total_input if total_input else 0.0
+        return usage
+    
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """
+        Get connection reuse statistics of the HTTP transport.
+        
+        Returns:
+            Dictionary with requests, connections_opened, connections_reused, reuse_rate,
+            bytes_sent, bytes_saved, endpoints and protocol
+        """
+        return self.transport.stats()
+    
+    def get_circuit_state(self) -> Dict[str, Any]:
+        """
+        Get the combined circuit state of the endpoint pool.
+        
+        The client is only unavailable when every endpoint's circuit is open.
+        
+        Returns:
+            Dictionary with state ("closed" if any endpoint is closed, "half_open"
+            if one is up for a trial request, otherwise "open") and retry_in
+            (seconds until the next trial request while open)
+        """
+        states = [endpoint.breaker.state for endpoint in self.endpoints]
+        if CircuitBreaker.CLOSED in states:
+            return {"state": CircuitBreaker.CLOSED, "retry_in": 0.0}
+        if CircuitBreaker.HALF_OPEN in states:
+            return {"state": CircuitBreaker.HALF_OPEN, "retry_in": 0.0}
+        return {
+            "state": CircuitBreaker.OPEN,
+            "retry_in": min(endpoint.breaker.retry_in() for endpoint in self.endpoints)
+        }
+    
+    def get_endpoint_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get health statistics of the endpoint pool.
+        
+        Returns:
+            List of endpoint statistics (url, successes, failures, p50_latency,
+            p95_latency and circuit) in preference order
+        """
+        return [endpoint.stats() for endpoint in self.endpoints]
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """
+        Get the adaptive rate limiter state.
+        
+        Returns:
+            Dictionary with rate, concurrency, in_flight, throttled, paused_for and budgets
+        """
+        return self.rate_limiter.stats()
+    
+    def close(self) -> None:
+        """Close pooled connections and stop the hedging threads."""
+        with self._hedge_lock:
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False)
+                self._hedge_executor = None
+        self.transport.close()
 
 
 # Example usage
@@ -0,0 +1,621 @@
+"""
+Provider batch API processing for whole work queues.
+
+Overnight runs don't need answers within seconds, and the providers'
+asynchronous batch endpoints cost less and accept far more requests than
+the interactive API. This module provides:
+- Batch jobs built from all unprocessed photos of a queue
+- Submission to the Anthropic Message Batches and OpenAI Batch APIs
+- Status polling with progress reporting and cancellation
+- Reconciliation of batch results into the photos' api_result
+- A state file next to the queue, so a restarted run resumes its batches
+"""
+
+import os
+import json
+import time
+import base64
+import logging
+import requests
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Iterator, Tuple
+
+from ebay_tools.core.api import LLMApiClient, ApiError
+from ebay_tools.core.exceptions import ValidationError
+from ebay_tools.core.processing import (
+    QueueProcessor, PHOTO_SYSTEM_PROMPT, build_photo_prompt, all_selected_photos_processed,
+    find_items_awaiting_description
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# State file suffix, appended to the queue file path
+BATCH_STATE_SUFFIX = ".batch.json"
+
+# Limits per batch job, below what either provider accepts
+MAX_BATCH_REQUESTS = 10000
+MAX_BATCH_BYTES = 100 * 1024 * 1024
+
+# Models used when the request payload doesn't name one
+DEFAULT_BATCH_MODELS = {
+    "anthropic": "claude-3-5-sonnet-latest",
+    "openai": "gpt-4o"
+}
+
+ANTHROPIC_VERSION = "2023-06-01"
+
+# Endpoint the OpenAI batch requests are run against
+OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch statuses that will not change any more
+FINISHED_STATUSES = ("ended", "completed", "failed", "expired", "cancelled")
+
+
+def get_batch_state_path(file_path: str) -> str:
+    """
+    Get the batch state path for a queue file.
+
+    Args:
+        file_path: Path to the queue file
+
+    Returns:
+        Path to the batch state file
+    """
+    return f"{file_path}{BATCH_STATE_SUFFIX}"
+
+
+def detect_batch_provider(api_client: LLMApiClient) -> Optional[str]:
+    """
+    Detect which batch API the client's endpoint belongs to.
+
+    Args:
+        api_client: API client
+
+    Returns:
+        "anthropic" for a Messages API URL, "openai" for a Chat Completions URL,
+        or None if the endpoint has no batch API
+    """
+    url = api_client.config.api_url.lower().rstrip("/")
+    api_type = api_client._detect_api_type(url)
+    if api_type == "claude" and url.endswith("/messages"):
+        return "anthropic"
+    if api_type == "openai" and url.endswith("/chat/completions"):
+        return "openai"
+    return None
+
+
+class BatchProcessor:
+    """
+    Processes the photos of a work queue through a provider's batch API.
+
+    Photos with a cached response are applied right away; the rest are sent
+    as batch jobs. Each job is recorded in the state file as soon as it is
+    submitted, so an interrupted run polls the same jobs again instead of
+    submitting (and paying for) them twice. Final descriptions of completed
+    items are generated with regular requests.
+    """
+
+    def __init__(self,
+                 api_client: LLMApiClient,
+                 state_path: str,
+                 generate_final: bool = True,
+                 log: Optional[Callable[[str], None]] = None,
+                 save_callback: Optional[Callable[[int], None]] = None,
+                 poll_interval: float = 60.0,
+                 model: Optional[str] = None,
+                 structured_output: bool = False):
+        """
+        Initialize the batch processor.
+
+        Args:
+            api_client: API client whose endpoint, key and payload format are used
+            state_path: Path of the batch state file (see get_batch_state_path)
+            generate_final: Whether to generate a final description once all photos of an item are done
+            log: Optional function receiving log messages (defaults to the module logger)
+            save_callback: Optional function called with the index of each changed item that should be persisted
+            poll_interval: Seconds between batch status checks
+            model: Model for the batch requests (defaults to the payload's model or the provider default)
+            structured_output: Whether to request final descriptions as validated JSON listings
+
+        Raises:
+            ApiError: If the configured endpoint has no batch API
+        """
+        self.api_client = api_client
+        self.api_url = api_client.config.api_url.rstrip("/")
+        self.provider = detect_batch_provider(api_client)
+        if not self.provider:
+            raise ApiError("Batch processing needs an Anthropic Messages (.../v1/messages) or "
+                           f"OpenAI Chat Completions (.../v1/chat/completions) API URL, not {self.api_url}")
+
+        self.state_path = state_path
+        self.poll_interval = poll_interval
+        self.model = model
+        self.log = log or logger.info
+        self.save_callback = save_callback
+        self.processor = QueueProcessor(api_client, generate_final=generate_final,
+                                        structured_output=structured_output, log=self.log,
+                                        save_callback=save_callback)
+        self.session = requests.Session()
+
+    # State file
+
+    def load_state(self) -> Dict[str, Any]:
+        """
+        Load the batch state, or create an empty one.
+
+        Returns:
+            State dictionary with api_url, provider and batches
+
+        Raises:
+            ApiError: If the state file belongs to a different API endpoint
+        """
+        if not os.path.exists(self.state_path):
+            return {"api_url": self.api_url, "provider": self.provider, "batches": []}
+
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        if state.get("api_url") != self.api_url:
+            raise ApiError(f"{self.state_path} holds batches submitted to {state.get('api_url')}. "
+                           "Finish them with that API URL or delete the file to start over.")
+        return state
+
+    def save_state(self, state: Dict[str, Any]) -> None:
+        """
+        Write the batch state through a temporary file and an atomic rename.
+
+        Args:
+            state: State dictionary
+        """
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.state_path)
+
+    def discard_state(self) -> None:
+        """Remove the state file once every batch has been reconciled."""
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    # Provider protocol
+
+    def _headers(self, content_type: Optional[str] = "application/json") -> Dict[str, str]:
+        """Build the request headers for the provider."""
+        api_key = self.api_client.config.api_key
+        if self.provider == "anthropic":
+            headers = {"x-api-key": api_key, "anthropic-version": ANTHROPIC_VERSION}
+        else:
+            headers = {"Authorization": f"Bearer {api_key}"}
+        if content_type:
+            headers["Content-Type"] = content_type
+        return headers
+
+    def _openai_base_url(self) -> str:
+        """Get the OpenAI API base URL (the URL without /chat/completions)."""
+        return self.api_url[:-len("/chat/completions")]
+
+    def _request(self, method: str, url: str, content_type: Optional[str] = "application/json",
+                 **kwargs) -> requests.Response:
+        """
+        Send a batch API request.
+
+        Raises:
+            ApiError: For error responses
+        """
+        response = self.session.request(method, url, headers=self._headers(content_type),
+                                        timeout=self.api_client.config.timeout, **kwargs)
+        if response.status_code >= 400:
+            raise ApiError(f"Batch API error: {response.status_code} - {response.text[:500]}",
+                           response.status_code, response.text)
+        return response
+
+    def _submit(self, lines: List[str]) -> str:
+        """
+        Submit a batch job.
+
+        Args:
+            lines: JSON-encoded batch request lines in the provider's format
+
+        Returns:
+            Batch id
+        """
+        if self.provider == "anthropic":
+            body = '{"requests": [' + ",".join(lines) + ']}'
+            response = self._request("POST", f"{self.api_url}/batches", data=body.encode("utf-8"))
+            return response.json()["id"]
+
+        base_url = self._openai_base_url()
+        upload = self._request(
+            "POST", f"{base_url}/files", content_type=None,
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", "\n".join(lines).encode("utf-8"), "application/jsonl")}
+        )
+        response = self._request("POST", f"{base_url}/batches", json={
+            "input_file_id": upload.json()["id"],
+            "endpoint": OPENAI_BATCH_ENDPOINT,
+            "completion_window": "24h"
+        })
+        return response.json()["id"]
+
+    def get_status(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Get the status of a batch job.
+
+        Args:
+            batch_id: Batch id
+
+        Returns:
+            Dictionary with status, finished, done, total and the provider's batch data
+        """
+        if self.provider == "anthropic":
+            data = self._request("GET", f"{self.api_url}/batches/{batch_id}").json()
+            counts = data.get("request_counts", {})
+            done = sum(counts.get(key, 0) for key in ("succeeded", "errored", "canceled", "expired"))
+            status = data.get("processing_status", "")
+            total = done + counts.get("processing", 0)
+        else:
+            data = self._request("GET", f"{self._openai_base_url()}/batches/{batch_id}").json()
+            counts = data.get("request_counts") or {}
+            done = counts.get("completed", 0) + counts.get("failed", 0)
+            status = data.get("status", "")
+            total = counts.get("total", 0)
+
+        return {
+            "status": status,
+            "finished": status in FINISHED_STATUSES,
+            "done": done,
+            "total": total,
+            "data": data
+        }
+
+    def _iter_lines(self, url: str) -> Iterator[Dict[str, Any]]:
+        """Download a JSONL results file line by line."""
+        response = self._request("GET", url, content_type=None, stream=True)
+        try:
+            for line in response.iter_lines():
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            response.close()
+
+    def iter_results(self, status: Dict[str, Any]) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Download the results of a finished batch job.
+
+        Args:
+            status: Status returned by get_status()
+
+        Yields:
+            (custom id, response text or None, error message or None) tuples
+        """
+        data = status["data"]
+
+        if self.provider == "anthropic":
+            if not data.get("results_url"):
+                return
+            for line in self._iter_lines(data["results_url"]):
+                result = line.get("result", {})
+                if result.get("type") == "succeeded":
+                    yield line["custom_id"], self.api_client.extract_response_text(result["message"]), None
+                else:
+                    error = (result.get("error") or {}).get("error") or {}
+                    yield line["custom_id"], None, error.get("message") or f"Batch request {result.get('type', 'failed')}"
+            return
+
+        for file_id in (data.get("output_file_id"), data.get("error_file_id")):
+            if not file_id:
+                continue
+            for line in self._iter_lines(f"{self._openai_base_url()}/files/{file_id}/content"):
+                response = line.get("response") or {}
+                body = response.get("body") or {}
+                if response.get("status_code") == 200:
+                    yield line["custom_id"], self.api_client.extract_response_text(body), None
+                else:
+                    error = line.get("error") or body.get("error") or {}
+                    message = error.get("message") if isinstance(error, dict) else str(error)
+                    yield line["custom_id"], None, message or f"HTTP {response.get('status_code')}"
+
+    # Queue handling
+
+    def _build_request(self, queue: List[Dict[str, Any]], item_idx: int, photo_idx: int) -> Tuple[str, Dict[str, Any], str]:
+        """
+        Build the batch request for a photo.
+
+        Returns:
+            (custom id, state record, JSON-encoded request line) tuple
+        """
+        item = queue[item_idx]
+        photo_data = item.get("photos", [])[photo_idx]
+        photo_path = photo_data.get("path", "")
+
+        if not os.path.exists(photo_path):
+            raise FileNotFoundError(f"Image file not found: {photo_path}")
+        with open(photo_path, "rb") as f:
+            image_bytes = f.read()
+
+        prompt = build_photo_prompt(item, photo_data)
+        upload_bytes, media_type = self.api_client._prepare_image(photo_path, image_bytes)
+        payload = self.api_client.create_request_payload(
+            prompt, base64.b64encode(upload_bytes).decode("utf-8"), media_type, system=PHOTO_SYSTEM_PROMPT
+        )
+        if self.model or "model" not in payload:
+            payload["model"] = self.model or DEFAULT_BATCH_MODELS[self.provider]
+
+        custom_id = f"item{item_idx}-photo{photo_idx}"
+        if self.provider == "anthropic":
+            line = {"custom_id": custom_id, "params": payload}
+        else:
+            line = {"custom_id": custom_id, "method": "POST", "url": OPENAI_BATCH_ENDPOINT, "body": payload}
+
+        record = {
+            "item_index": item_idx,
+            "item_id": item.get("id"),
+            "photo_index": photo_idx,
+            "cache_key": self.api_client._get_cache_key(prompt, [image_bytes], PHOTO_SYSTEM_PROMPT)
+        }
+        return custom_id, record, json.dumps(line)
+
+    @staticmethod
+    def _photo_key(record: Dict[str, Any]) -> Tuple[str, int]:
+        """Identify a photo across runs by its item id (or position) and index."""
+        return (record.get("item_id") or f"#{record['item_index']}", record["photo_index"])
+
+    @staticmethod
+    def _find_item(queue: List[Dict[str, Any]], record: Dict[str, Any]) -> Optional[int]:
+        """Find the queue position of a record's item, preferring its id over its recorded position."""
+        item_idx, item_id = record["item_index"], record.get("item_id")
+        if 0 <= item_idx < len(queue) and queue[item_idx].get("id") == item_id:
+            return item_idx
+        if item_id:
+            for idx, item in enumerate(queue):
+                if item.get("id") == item_id:
+                    return idx
+        return None
+
+    def _apply_result(self,
+                      queue: List[Dict[str, Any]],
+                      record: Dict[str, Any],
+                      response: Optional[str],
+                      error: Optional[str],
+                      batch_id: Optional[str] = None) -> Optional[int]:
+        """
+        Apply a response (or error) to its photo.
+
+        Returns:
+            Queue position of the photo's item, or None if the item is no longer in the queue
+        """
+        item_idx = self._find_item(queue, record)
+        photos = queue[item_idx].get("photos", []) if item_idx is not None else []
+        if record["photo_index"] >= len(photos):
+            logger.warning(f"Batch result for a photo no longer in the queue: {self._photo_key(record)}")
+            return None
+
+        photo_data = photos[record["photo_index"]]
+        if error or not response:
+            photo_data["last_error"] = error or "Empty response from API"
+            photo_data["last_attempt"] = datetime.now().isoformat()
+            return item_idx
+
+        photo_data["processed"] = True
+        photo_data["processed_at"] = datetime.now().isoformat()
+        photo_data["api_result"] = {"response": response}
+        if batch_id:
+            photo_data["api_result"]["batch_id"] = batch_id
+
+        # Later interactive runs reuse batch responses like any other
+        if record.get("cache_key"):
+            self.api_client.cache.set(record["cache_key"], response)
+        return item_idx
+
+    def _complete_items(self, queue: List[Dict[str, Any]], item_indices: List[int]) -> int:
+        """
+        Persist the changed items and complete those whose photos are all processed.
+
+        Returns:
+            Number of items left unprocessed because their listing was unusable
+        """
+        failed = 0
+        for item_idx in sorted(set(item_indices)):
+            item = queue[item_idx]
+            # Photo results are saved first, so a failed completion doesn't lose them
+            if self.save_callback:
+                self.save_callback(item_idx)
+            if item.get("processed", False) or not all_selected_photos_processed(item):
+                continue
+            try:
+                self.processor.complete_item_if_ready(item)
+            except ValidationError as e:
+                self.log(f"No final description for item {item.get('sku', item_idx + 1)}: {str(e)}")
+                failed += 1
+                continue
+            if self.save_callback:
+                self.save_callback(item_idx)
+        return failed
+
+    def _submit_batch(self, state: Dict[str, Any], lines: List[str], batch_requests: Dict[str, Dict[str, Any]]) -> None:
+        """Submit a batch job and record it in the state file."""
+        batch_id = self._submit(lines)
+        state["batches"].append({
+            "id": batch_id,
+            "submitted_at": datetime.now().isoformat(),
+            "status": "submitted",
+            "reconciled": False,
+            "requests": batch_requests
+        })
+        self.save_state(state)
+        self.log(f"Submitted batch {batch_id} with {len(lines)} requests")
+
+    def _wait_for_batch(self,
+                        state: Dict[str, Any],
+                        batch: Dict[str, Any],
+                        report_progress: Optional[Callable[[int, int, str], None]],
+                        check_cancelled: Optional[Callable[[], bool]]) -> Optional[Dict[str, Any]]:
+        """
+        Poll a batch job until it has finished.
+
+        Returns:
+            Final status, or None if processing was cancelled
+        """
+        while True:
+            try:
+                status = self.get_status(batch["id"])
+            except (requests.RequestException, ApiError) as e:
+                # The job keeps running on the provider's side; try again next poll
+                self.log(f"Could not get the status of batch {batch['id']}: {str(e)}")
+                status = None
+
+            if status:
+                if status["status"] != batch["status"]:
+                    batch["status"] = status["status"]
+                    self.save_state(state)
+                    self.log(f"Batch {batch['id']}: {status['status']}")
+                if report_progress:
+                    report_progress(status["done"], status["total"] or len(batch["requests"]),
+                                    f"Batch {batch['id']}: {status['status']} ({status['done']} done)")
+                if status["finished"]:
+                    return status
+
+            deadline = time.time() + self.poll_interval
+            while time.time() < deadline:
+                if check_cancelled and check_cancelled():
+                    return None
+                time.sleep(max(0.0, min(1.0, deadline - time.time())))
+
+    def run(self,
+            queue: List[Dict[str, Any]],
+            unprocessed_photos: List[Tuple[int, int]],
+            report_progress: Optional[Callable[[int, int, str], None]] = None,
+            check_cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """
+        Process a list of photos from a queue through the batch API.
+
+        Photos that belong to a batch recorded in the state file are not
+        submitted again; that batch is polled and reconciled instead.
+        When processing is cancelled, the submitted batches keep running
+        and the next run collects their results.
+
+        Args:
+            queue: List of item dictionaries
+            unprocessed_photos: List of (item index, photo index) tuples to process
+            report_progress: Optional callback receiving (current, total, message)
+            check_cancelled: Optional function returning True when processing should stop
+
+        Returns:
+            Dictionary with 'total', 'processed' and 'failed' photo counts, 'description_failed'
+            (items whose listing was unusable), 'elapsed_time', 'batches' (number of batch jobs)
+            and 'pending' (True if batches are still running)
+        """
+        start_time = time.time()
+        state = self.load_state()
+        processed_count = 0
+        failed_count = 0
+        description_failed = 0
+
+        # Items an earlier run left without a final description
+        if self.processor.generate_final:
+            description_failed += self._complete_items(queue, find_items_awaiting_description(queue))
+
+        submitted = {
+            self._photo_key(record)
+            for batch in state["batches"] for record in batch["requests"].values()
+        }
+        if submitted:
+            self.log(f"Resuming {len(state['batches'])} batches from {self.state_path}")
+
+        # Send everything that isn't already cached or in a batch
+        lines = []
+        batch_requests = {}
+        batch_bytes = 0
+        cached_items = []
+        for item_idx, photo_idx in unprocessed_photos:
+            if check_cancelled and check_cancelled():
+                break
+
+            item = queue[item_idx]
+            if self._photo_key({"item_id": item.get("id"), "item_index": item_idx, "photo_index": photo_idx}) in submitted:
+                continue
+
+            try:
+                custom_id, record, line = self._build_request(queue, item_idx, photo_idx)
+            except Exception as e:
+                self.log(f"Error preparing photo {photo_idx + 1} of item {item.get('sku', item_idx + 1)}: {str(e)}")
+                self._apply_result(queue, {"item_index": item_idx, "item_id": item.get("id"), "photo_index": photo_idx},
+                                   None, str(e))
+                failed_count += 1
+                continue
+
+            cached = self.api_client.cache.get(record["cache_key"])
+            if cached is not None:
+                self._apply_result(queue, record, cached, None)
+                cached_items.append(item_idx)
+                processed_count += 1
+                continue
+
+            if lines and (len(lines) >= MAX_BATCH_REQUESTS or batch_bytes + len(line) > MAX_BATCH_BYTES):
+                self._submit_batch(state, lines, batch_requests)
+                lines, batch_requests, batch_bytes = [], {}, 0
+
+            lines.append(line)
+            batch_requests[custom_id] = record
+            batch_bytes += len(line)
+
+        if lines:
+            self._submit_batch(state, lines, batch_requests)
+        description_failed += self._complete_items(queue, cached_items)
+
+        # Collect the results of every open batch, including resumed ones
+        for batch in state["batches"]:
+            if batch["reconciled"]:
+                continue
+
+            status = self._wait_for_batch(state, batch, report_progress, check_cancelled)
+            if status is None:
+                break
+
+            changed_items = []
+            missing = dict(batch["requests"])
+            for custom_id, response, error in self.iter_results(status):
+                record = missing.pop(custom_id, None)
+                if record is None:
+                    continue
+                item_idx = self._apply_result(queue, record, response, error, batch["id"])
+                if item_idx is not None:
+                    changed_items.append(item_idx)
+                if error or not response:
+                    failed_count += 1
+                    self.log(f"Batch request {custom_id} failed: {error}")
+                else:
+                    processed_count += 1
+
+            # Requests the provider dropped (failed or expired batches) are retried next run
+            for custom_id, record in missing.items():
+                item_idx = self._apply_result(queue, record, None, f"No result in batch {batch['id']} ({status['status']})")
+                if item_idx is not None:
+                    changed_items.append(item_idx)
+                failed_count += 1
+
+            description_failed += self._complete_items(queue, changed_items)
+            batch["reconciled"] = True
+            self.save_state(state)
+            self.log(f"Reconciled batch {batch['id']}: {len(batch['requests']) - len(missing)} results")
+
+        pending = any(not batch["reconciled"] for batch in state["batches"])
+        if not pending:
+            self.discard_state()
+
+        return {
+            "total": len(unprocessed_photos),
+            "processed": processed_count,
+            "failed": failed_count,
+            "description_failed": description_failed,
+            "elapsed_time": time.time() - start_time,
+            "batches": len(state["batches"]),
+            "pending": pending
+        }
+
+    def close(self) -> None:
+        """Close the batch API session."""
+        self.session.close()
@@ -0,0 +1,238 @@
+"""
+Persistent response cache for eBay listing tools.
+
+This module provides an SQLite-backed key/value cache including:
+- Content-addressed keys (SHA-256 of image bytes, prompt and model URL)
+- Age-based expiry and size-based least-recently-used eviction
+- Hit/miss counters for monitoring
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from ebay_tools.core.config import DEFAULT_CONFIG_DIR
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Default cache location
+DEFAULT_CACHE_DIR = os.path.join(DEFAULT_CONFIG_DIR, "cache")
+DEFAULT_RESPONSE_CACHE_FILE = "llm_responses.sqlite"
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache for LLM responses.
+
+    The cache survives process restarts, so re-running a queue over photos that
+    were already described costs no API calls. A single connection is shared
+    between threads and guarded by a lock.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 max_age_days: float = 30.0,
+                 max_size_mb: float = 100.0):
+        """
+        Initialize the response cache.
+
+        Args:
+            path: Path to the SQLite database (defaults to ~/.ebay_tools/cache/llm_responses.sqlite),
+                  or ":memory:" for a cache that is not persisted
+            max_age_days: Entries older than this are discarded (0 disables age expiry)
+            max_size_mb: Maximum total size of cached responses (0 disables size eviction)
+        """
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, DEFAULT_RESPONSE_CACHE_FILE)
+        self.max_age = max_age_days * 86400
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, falling back to memory if the file can't be used."""
+        if self.path != ":memory:":
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._init_schema(conn)
+                return conn
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Could not open response cache at {self.path}: {str(e)}. Using memory cache.")
+                self.path = ":memory:"
+
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._init_schema(conn)
+        return conn
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection) -> None:
+        """Create the cache table if needed."""
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        conn.commit()
+
+    @staticmethod
+    def make_key(prompt: str, api_url: str, image_bytes: Optional[bytes] = None, *extra: str) -> str:
+        """
+        Build a cache key from the request content.
+
+        Args:
+            prompt: Text prompt for the LLM
+            api_url: Model endpoint URL
+            image_bytes: Raw image file content (optional)
+            *extra: Additional strings that change the response (e.g. settings)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for part in (api_url, prompt) + extra:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        if image_bytes:
+            digest.update(hashlib.sha256(image_bytes).digest())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached response.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached response, or None if missing or expired
+        """
+        entry = self.get_with_age(key)
+        return entry[0] if entry else None
+
+    def get_with_age(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Get a cached response together with its age.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (response, age in seconds) tuple, or None if missing or expired
+        """
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (self.max_age and now - row[1] > self.max_age):
+                if row is not None:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.conn.commit()
+                self.misses += 1
+                return None
+
+            self.conn.execute(
+                "UPDATE responses SET accessed_at = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (now, key)
+            )
+            self.conn.commit()
+            self.hits += 1
+            return row[0], now - row[1]
+
+    def __contains__(self, key: str) -> bool:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)
+            ).fetchone() is not None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response and evict old entries if the cache is over its limits.
+
+        Args:
+            key: Cache key
+            value: Response text
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now)
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Remove expired entries, then least recently used ones over the size limit."""
+        if self.max_age:
+            self.conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.max_age,))
+
+        if self.max_size:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_size:
+                excess = total - self.max_size
+                evicted = 0
+                for key, size in self.conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+                ).fetchall():
+                    if excess <= 0:
+                        break
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    excess -= size
+                    evicted += 1
+                logger.debug(f"Evicted {evicted} cached responses to stay under size limit")
+
+    def clear(self) -> None:
+        """Remove all cached responses and reset the counters."""
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries, size_bytes and path
+        """
+        with self.lock:
+            entries, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "path": self.path
+        }
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,228 @@
+"""
+Persistent cache of sold-item comparables for price analysis.
+
+Items in a lot often share the same search terms, and every price analysis
+used to fetch the same sold listings again. This module provides:
+- Cache keys from the item format, normalized search terms, condition filter and date range
+- A configurable time-to-live before cached comps are refreshed
+- Stale-while-revalidate: expired comps are served while a background refresh runs
+- One fetch per key at a time, so parallel pricing workers share a single request
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from ebay_tools.core.cache import ResponseCache, DEFAULT_CACHE_DIR
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Default cache file, next to the LLM response cache
+DEFAULT_COMPS_CACHE_FILE = "sold_comps.sqlite"
+
+
+def normalize_search_terms(search_terms: str) -> str:
+    """
+    Normalize search terms so near-duplicate searches share a cache entry.
+
+    Terms are lowercased, stripped of punctuation, reduced to unique words
+    with a simple plural "s" removed, and sorted. "LEGO Star Wars Minifigures"
+    and "star wars lego minifigure" normalize to the same string.
+
+    Args:
+        search_terms: Search query
+
+    Returns:
+        Normalized search terms
+    """
+    words = set()
+    for word in re.findall(r"[^\W_]+", search_terms.lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return " ".join(sorted(words))
+
+
+class CompsCache:
+    """
+    On-disk cache of sold comparables shared by the price analyzers.
+
+    Each analyzer stores its own item shape, so entries are keyed by the
+    item format as well as the search and are never served across formats.
+    Entries younger than the TTL are served directly. Entries past the TTL
+    but within the stale window are served immediately and refreshed in a
+    background thread. Older entries are expired by the underlying cache.
+    Empty results are never cached, so a failed search is retried next time.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 ttl_hours: float = 24.0,
+                 stale_hours: float = 72.0,
+                 max_size_mb: float = 50.0):
+        """
+        Initialize the comps cache.
+
+        Args:
+            path: Path to the SQLite database (defaults to ~/.ebay_tools/cache/sold_comps.sqlite),
+                  or ":memory:" for a cache that is not persisted
+            ttl_hours: Age after which cached comps are refreshed (0 never refreshes)
+            stale_hours: How long past the TTL stale comps may still be served
+            max_size_mb: Maximum total size of cached comps (0 disables size eviction)
+        """
+        self.ttl = ttl_hours * 3600
+        self.stale = stale_hours * 3600
+        self.cache = ResponseCache(
+            path or os.path.join(DEFAULT_CACHE_DIR, DEFAULT_COMPS_CACHE_FILE),
+            max_age_days=(ttl_hours + stale_hours) / 24 if ttl_hours else 0,
+            max_size_mb=max_size_mb
+        )
+        self.path = self.cache.path
+        self.fetches = 0
+        self.stale_hits = 0
+        self.lock = threading.Lock()
+        self._key_locks = {}
+        self._refreshing = set()
+
+    @staticmethod
+    def make_key(search_terms: str, condition: Optional[str] = None, days_back: int = 90,
+                 item_format: str = "sold-items") -> str:
+        """
+        Build the cache key for a sold items search.
+
+        Args:
+            search_terms: Search query
+            condition: Condition filter (None for any condition)
+            days_back: How many days back the search covers
+            item_format: Name of the shape the cached items are stored in
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        return ResponseCache.make_key(
+            normalize_search_terms(search_terms), "sold-comps", None,
+            (condition or "any").lower(), str(int(days_back)), item_format
+        )
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        """Get the lock that serializes fetches for a key."""
+        with self.lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def _lookup(self, key: str, limit: int) -> Optional[Tuple[List[Any], float]]:
+        """Get cached comps with their age if the entry covers the requested limit."""
+        entry = self.cache.get_with_age(key)
+        if entry is None:
+            return None
+
+        value, age = entry
+        try:
+            data = json.loads(value)
+        except json.JSONDecodeError:
+            return None
+
+        items = data.get("items", [])
+        # A smaller earlier search may not have fetched everything available
+        if len(items) < limit and data.get("limit", 0) < limit:
+            return None
+
+        return items[:limit], age
+
+    def _fetch_and_store(self, key: str, search_terms: str, fetch: Callable[[], List[Any]], limit: int) -> List[Any]:
+        """Fetch comps and cache them if anything was found (key lock must be held)."""
+        items = fetch()
+        with self.lock:
+            self.fetches += 1
+
+        if items:
+            self.cache.set(key, json.dumps({"search_terms": search_terms, "limit": limit, "items": items}))
+        return items
+
+    def _refresh_in_background(self, key: str, search_terms: str, fetch: Callable[[], List[Any]], limit: int) -> None:
+        """Start refreshing a stale entry unless a refresh is already running."""
+        with self.lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._key_lock(key):
+                    self._fetch_and_store(key, search_terms, fetch, limit)
+                logger.debug(f"Refreshed cached comps for '{search_terms}'")
+            except Exception as e:
+                logger.warning(f"Could not refresh cached comps for '{search_terms}': {str(e)}")
+            finally:
+                with self.lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def get_or_fetch(self,
+                     search_terms: str,
+                     fetch: Callable[[], List[Any]],
+                     limit: int,
+                     condition: Optional[str] = None,
+                     days_back: int = 90,
+                     item_format: str = "sold-items") -> List[Any]:
+        """
+        Get sold comps from the cache, fetching them on a miss.
+
+        Args:
+            search_terms: Search query
+            fetch: Function returning a JSON-serializable list of sold items for the query
+            limit: Maximum number of items the caller wants
+            condition: Condition filter (None for any condition)
+            days_back: How many days back the search covers
+            item_format: Name of the shape fetch returns items in, so callers
+                         storing different shapes never read each other's entries
+
+        Returns:
+            List of sold items (whatever fetch returned on a miss)
+        """
+        key = self.make_key(search_terms, condition, days_back, item_format)
+
+        entry = self._lookup(key, limit)
+        if entry is not None:
+            items, age = entry
+            if self.ttl and age > self.ttl:
+                with self.lock:
+                    self.stale_hits += 1
+                self._refresh_in_background(key, search_terms, fetch, limit)
+            return items
+
+        with self._key_lock(key):
+            # Another worker may have fetched the same comps while we waited
+            entry = self._lookup(key, limit)
+            if entry is not None:
+                return entry[0]
+            return self._fetch_and_store(key, search_terms, fetch, limit)
+
+    def clear(self) -> None:
+        """Remove all cached comps and reset the counters."""
+        self.cache.clear()
+        with self.lock:
+            self.fetches = 0
+            self.stale_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with the response cache statistics plus fetches and stale_hits
+        """
+        stats = self.cache.stats()
+        stats["fetches"] = self.fetches
+        stats["stale_hits"] = self.stale_hits
+        return stats
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.cache.close()
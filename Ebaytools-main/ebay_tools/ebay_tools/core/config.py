@@ -77,7 +77,8 @@ class ConfigManager:
                 "key": "",
                 "delay": 2.0,
                 "max_retries": 3,
-                "timeout": 60
+                "timeout": 60,
+                "max_concurrent": 1
             },
             "app": {
                 "theme": "default",
@@ -95,6 +96,17 @@ class ConfigManager:
                 "window_height": 800,
                 "font_size": 10,
                 "show_tooltips": True
+            },
+            # Work order for processing and pricing (see ebay_tools.core.scheduler.SchedulerConfig)
+            "scheduler": {
+                "enabled": True,
+                "priority_weight": 10.0,
+                "tag_weights": {},
+                "category_weights": {},
+                "value_weight": 5.0,
+                "age_weight": 1.0,
+                "tag_deadlines": {},
+                "deadline_horizon_hours": 24.0
             }
         }
     
@@ -209,7 +221,8 @@ class ConfigManager:
         return self.config.get("api", {})
     
     def set_api_config(self, api_type: str, api_url: str, api_key: str, 
-                     delay: float = 2.0, max_retries: int = 3, timeout: int = 60) -> None:
+                     delay: float = 2.0, max_retries: int = 3, timeout: int = 60,
+                     max_concurrent: int = 1) -> None:
         """
         Set the API configuration.
         
@@ -220,6 +233,7 @@ class ConfigManager:
             delay: Delay between requests in seconds
             max_retries: Maximum number of retries
             timeout: Request timeout in seconds
+            max_concurrent: Maximum number of requests in flight at once
         """
         self.config["api"] = {
             "type": api_type,
@@ -227,9 +241,19 @@ class ConfigManager:
             "key": api_key,
             "delay": delay,
             "max_retries": max_retries,
-            "timeout": timeout
+            "timeout": timeout,
+            "max_concurrent": max_concurrent
         }
     
+    def get_scheduler_config(self) -> Dict[str, Any]:
+        """
+        Get the scheduler configuration.
+        
+        Returns:
+            Scheduler configuration dictionary
+        """
+        return self.config.get("scheduler", {})
+    
     def update_recent_path(self, path_type: str, path: str) -> None:
         """
         Update a recent path in the configuration.
@@ -0,0 +1,298 @@
+"""
+Write-ahead journal for work queue files.
+
+Rewriting a whole queue file after every processed photo makes long runs
+spend most of their time serializing JSON. This module provides:
+- Append-only per-item change records (JSON lines) next to the queue file
+- Periodic compaction of the journal into the main queue file
+- Atomic replacement of the queue file so a crash never leaves it truncated
+- Replay of outstanding records when a queue is loaded
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Union
+
+from ebay_tools.core.queue_store import QueueStore, is_queue_store_path
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Journal file suffix, appended to the queue file path
+JOURNAL_SUFFIX = ".wal"
+
+
+def get_journal_path(file_path: str) -> str:
+    """
+    Get the journal path for a queue file.
+
+    Args:
+        file_path: Path to the queue JSON file
+
+    Returns:
+        Path to the journal file
+    """
+    return f"{file_path}{JOURNAL_SUFFIX}"
+
+
+def write_queue_atomic(queue: List[Dict[str, Any]], file_path: str, indent: Optional[int] = 2) -> None:
+    """
+    Write a queue file through a temporary file and an atomic rename.
+
+    Args:
+        queue: List of item dictionaries
+        file_path: Path to the JSON file
+        indent: JSON indentation (None for compact output)
+    """
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(queue, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, file_path)
+
+
+def read_journal(file_path: str) -> List[Dict[str, Any]]:
+    """
+    Read the change records of a queue file's journal.
+
+    A partially written last line (from a crash mid-append) is ignored.
+
+    Args:
+        file_path: Path to the queue JSON file
+
+    Returns:
+        List of journal records in write order
+    """
+    journal_path = get_journal_path(file_path)
+    if not os.path.exists(journal_path):
+        return []
+
+    records = []
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring incomplete journal record at {journal_path}:{line_number}")
+
+    return records
+
+
+def apply_journal_records(queue: List[Dict[str, Any]], records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Apply journal records to a queue in place.
+
+    Records are matched to items by id, using the recorded index as a hint
+    (and as the match for items saved before they were given an id).
+    Records for items that are not in the queue are appended.
+
+    Args:
+        queue: List of item dictionaries
+        records: Journal records
+
+    Returns:
+        Number of records applied
+    """
+    positions = {item.get("id"): idx for idx, item in enumerate(queue) if item.get("id")}
+    applied = 0
+
+    for record in records:
+        item = record.get("item")
+        if not isinstance(item, dict):
+            continue
+
+        item_id = item.get("id")
+        index = record.get("index")
+
+        if isinstance(index, int) and 0 <= index < len(queue) and queue[index].get("id") in (item_id, None):
+            queue[index] = item
+        elif item_id in positions:
+            queue[positions[item_id]] = item
+        else:
+            positions[item_id] = len(queue)
+            queue.append(item)
+
+        applied += 1
+
+    return applied
+
+
+def replay_journal(queue: List[Dict[str, Any]], file_path: str) -> int:
+    """
+    Apply any outstanding journal records of a queue file to a loaded queue.
+
+    Args:
+        queue: Queue loaded from the main file
+        file_path: Path to the queue JSON file
+
+    Returns:
+        Number of records applied
+    """
+    records = read_journal(file_path)
+    if not records:
+        return 0
+
+    applied = apply_journal_records(queue, records)
+    logger.info(f"Recovered {applied} journaled changes for {file_path}")
+    return applied
+
+
+def iter_journaled_items(items: Iterable[Dict[str, Any]], file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Apply the journal of a queue file to a stream of items from the main file.
+
+    This is the streaming counterpart of replay_journal: only the journaled
+    items are held in memory, not the queue.
+
+    Args:
+        items: Items of the main queue file, in order
+        file_path: Path to the queue JSON file
+
+    Yields:
+        Items with their latest journaled state
+    """
+    records = read_journal(file_path)
+    if not records:
+        yield from items
+        return
+
+    # Last record wins for each item
+    latest = {}
+    for record in records:
+        item = record.get("item")
+        if isinstance(item, dict):
+            latest[item.get("id")] = (record.get("index"), item)
+    ids_by_index = {index: item_id for item_id, (index, _) in latest.items()}
+
+    for position, item in enumerate(items):
+        item_id = item.get("id")
+        if item_id in latest:
+            yield latest.pop(item_id)[1]
+        elif item_id is None and ids_by_index.get(position) in latest:
+            yield latest.pop(ids_by_index[position])[1]
+        else:
+            yield item
+
+    # Items that were added after the main file was written
+    if latest:
+        logger.info(f"Recovered {len(latest)} journaled items not in {file_path}")
+    for _, item in latest.values():
+        yield item
+
+
+def discard_journal(file_path: str) -> None:
+    """
+    Remove the journal of a queue file once its changes are in the main file.
+
+    Args:
+        file_path: Path to the queue JSON file
+    """
+    journal_path = get_journal_path(file_path)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+
+
+def open_queue_journal(file_path: str, compact_every: int = 200) -> Union["QueueJournal", QueueStore]:
+    """
+    Open incremental persistence for a queue file.
+
+    SQLite queue stores are updated in place; JSON queues get a journal.
+
+    Args:
+        file_path: Path to the queue file
+        compact_every: Number of records after which a JSON journal is compacted
+
+    Returns:
+        Object with record(queue, item_indices) and compact(queue) methods
+    """
+    if is_queue_store_path(file_path):
+        return QueueStore(file_path)
+    return QueueJournal(file_path, compact_every=compact_every)
+
+
+class QueueJournal:
+    """
+    Journaled persistence for a queue file.
+
+    Each save appends the changed items to the journal and fsyncs it, so the
+    cost is proportional to the change rather than the queue size. Every
+    compact_every records the journal is folded into the main file.
+    """
+
+    def __init__(self, file_path: str, compact_every: int = 200, sync: bool = True):
+        """
+        Initialize the journal.
+
+        Args:
+            file_path: Path to the queue JSON file
+            compact_every: Number of records after which the journal is compacted (0 disables)
+            sync: Whether to fsync after each append
+        """
+        self.file_path = file_path
+        self.journal_path = get_journal_path(file_path)
+        self.compact_every = compact_every
+        self.sync = sync
+        self.lock = threading.Lock()
+        self._truncate_torn_record()
+        self.pending = len(read_journal(file_path))
+
+    def _truncate_torn_record(self) -> None:
+        """Drop a partially written last record so new appends start on a fresh line."""
+        if not os.path.exists(self.journal_path):
+            return
+
+        with open(self.journal_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                logger.warning(f"Discarded incomplete last record of {self.journal_path}")
+
+    def record(self, queue: List[Dict[str, Any]], item_indices: Iterable[int]) -> None:
+        """
+        Journal the current state of changed items.
+
+        Args:
+            queue: Full queue the items belong to (used for compaction)
+            item_indices: Indices of the changed items
+        """
+        lines = []
+        for index in item_indices:
+            if 0 <= index < len(queue):
+                lines.append(json.dumps({"index": index, "item": queue[index]}) + "\n")
+
+        if not lines:
+            return
+
+        with self.lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write("".join(lines))
+                f.flush()
+                if self.sync:
+                    os.fsync(f.fileno())
+
+            self.pending += len(lines)
+            if self.compact_every and self.pending >= self.compact_every:
+                self._compact(queue)
+
+    def compact(self, queue: List[Dict[str, Any]]) -> None:
+        """
+        Write the full queue to the main file and clear the journal.
+
+        Args:
+            queue: Full queue to write
+        """
+        with self.lock:
+            self._compact(queue)
+
+    def _compact(self, queue: List[Dict[str, Any]]) -> None:
+        """Compact the journal (lock must be held)."""
+        write_queue_atomic(queue, self.file_path)
+        discard_journal(self.file_path)
+        logger.debug(f"Compacted {self.pending} journal records into {self.file_path}")
+        self.pending = 0
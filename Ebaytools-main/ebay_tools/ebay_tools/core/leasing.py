@@ -0,0 +1,410 @@
+"""
+Work leasing for several workers sharing one queue store.
+
+Two processors working on the same queue file overwrite each other's saves.
+This module lets any number of worker processes, on one machine or several,
+process one SQLite queue store together:
+- Workers claim batches of items with time-limited leases, renewed while they make progress
+- Results are only written back while the worker still holds the item's lease
+- Leases of workers that crashed or hung expire and return their items to the pool
+- Items that keep failing are given up after a number of attempts
+- Optionally, the most urgent and valuable items are claimed first
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator
+
+from ebay_tools.core.queue_store import QueueStore
+from ebay_tools.core.processing import QueueProcessor, find_unprocessed_photos
+from ebay_tools.core.scheduler import WorkScheduler
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Default lease duration; workers renew their leases every third of it
+DEFAULT_LEASE_SECONDS = 300.0
+
+# Default number of items claimed at once
+DEFAULT_LEASE_BATCH = 5
+
+# Default number of failed or expired leases after which an item is given up
+DEFAULT_MAX_FAILURES = 3
+
+# Seconds between claims while other workers hold all the remaining items
+DEFAULT_POLL_INTERVAL = 5.0
+
+# How long a worker waits for another worker's write lock
+BUSY_TIMEOUT_MS = 30000
+
+
+def make_worker_id() -> str:
+    """
+    Build a worker ID that is unique across machines and processes.
+
+    Returns:
+        Worker ID made of the host name, process ID and a random suffix
+    """
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class LeasedQueueStore(QueueStore):
+    """
+    Queue store whose items are leased to workers.
+
+    A lease is a row naming the worker holding an item and when the lease
+    expires. Claiming, renewing, releasing and saving each run in a single
+    immediate transaction, so workers in other processes always see a
+    consistent pool.
+
+    WAL needs shared memory and only works for processes on one machine; a
+    store shared over a network filesystem is switched to a rollback journal,
+    which still needs working POSIX locks (NFSv4, or NFSv3 with lockd).
+    Lease expiry compares wall clock times, so worker clocks must be in sync
+    to well within the lease duration.
+    """
+
+    def __init__(self,
+                 path: str,
+                 worker_id: Optional[str] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 max_failures: int = DEFAULT_MAX_FAILURES,
+                 shared_filesystem: bool = False,
+                 scheduler: Optional[WorkScheduler] = None):
+        """
+        Open a queue store for leasing.
+
+        Args:
+            path: Path to the SQLite queue store
+            worker_id: ID of this worker (defaults to a new unique ID)
+            lease_seconds: How long a lease lasts without being renewed
+            max_failures: Number of failed or expired leases after which an item is no longer claimed
+            shared_filesystem: Whether workers on other machines open the store over a network filesystem
+            scheduler: Optional scheduler choosing which claimable items are leased first
+                       (defaults to queue order)
+        """
+        self.worker_id = worker_id or make_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_failures = max_failures
+        self.shared_filesystem = shared_filesystem
+        self.scheduler = scheduler
+        super().__init__(path)
+
+    def _init_schema(self) -> None:
+        """Create the queue and lease tables if needed."""
+        self.conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        super()._init_schema()
+        if self.shared_filesystem:
+            self.conn.execute("PRAGMA journal_mode=DELETE")
+
+        self.conn.executescript("""
+            -- No foreign key: saving an item replaces its row, which would cascade to its lease
+            CREATE TABLE IF NOT EXISTS leases (
+                item_id TEXT PRIMARY KEY,
+                worker_id TEXT,
+                claimed_at REAL,
+                expires_at REAL NOT NULL DEFAULT 0,
+                failures INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_leases_worker ON leases(worker_id, expires_at);
+        """)
+        self.conn.commit()
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[None]:
+        """Hold the store lock and the database write lock for a transaction."""
+        with self.lock:
+            # Taking the write lock up front keeps two workers from claiming the same items
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def claim(self, batch_size: int = DEFAULT_LEASE_BATCH) -> List[int]:
+        """
+        Lease unprocessed items that no other worker holds.
+
+        Expired leases are returned to the pool first, counting as a failure
+        of their item.
+
+        Args:
+            batch_size: Maximum number of items to lease
+
+        Returns:
+            Queue positions of the leased items, in schedule order (queue order without a scheduler)
+        """
+        now = time.time()
+        with self._write_transaction():
+            expired = self.conn.execute(
+                "UPDATE leases SET worker_id = NULL, failures = failures + 1 "
+                "WHERE worker_id IS NOT NULL AND expires_at <= ?",
+                (now,)
+            ).rowcount
+
+            # With a scheduler every claimable item is ranked; a negative limit means no limit
+            rows = self.conn.execute("""
+                SELECT items.id, items.position, items.data FROM items
+                LEFT JOIN leases ON leases.item_id = items.id
+                WHERE items.processed = 0
+                AND leases.worker_id IS NULL
+                AND COALESCE(leases.failures, 0) < ?
+                AND EXISTS (SELECT 1 FROM photos WHERE photos.item_id = items.id AND photos.selected = 1)
+                ORDER BY items.position
+                LIMIT ?
+            """, (self.max_failures, -1 if self.scheduler else batch_size)).fetchall()
+            if self.scheduler:
+                rows = sorted(rows, key=lambda row: self.scheduler.sort_key(json.loads(row[2]), row[1], now))
+                rows = rows[:batch_size]
+
+            self.conn.executemany("""
+                INSERT INTO leases (item_id, worker_id, claimed_at, expires_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (item_id) DO UPDATE SET
+                    worker_id = excluded.worker_id,
+                    claimed_at = excluded.claimed_at,
+                    expires_at = excluded.expires_at
+            """, [(item_id, self.worker_id, now, now + self.lease_seconds) for item_id, _, _ in rows])
+
+        if expired:
+            logger.info(f"{expired} expired leases returned to the pool")
+        return [position for _, position, _ in rows]
+
+    def renew(self) -> int:
+        """
+        Extend the leases this worker still holds.
+
+        Returns:
+            Number of leases renewed; a lease that expired before renewal may
+            already belong to another worker and is not renewed
+        """
+        now = time.time()
+        with self._write_transaction():
+            return self.conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE worker_id = ? AND expires_at > ?",
+                (now + self.lease_seconds, self.worker_id, now)
+            ).rowcount
+
+    def release(self, positions: Iterable[int], failed: Iterable[int] = ()) -> None:
+        """
+        Return leased items to the pool.
+
+        Args:
+            positions: Queue positions of the items to release
+            failed: Positions among them whose processing failed
+        """
+        failed = set(failed)
+        with self._write_transaction():
+            self.conn.executemany(
+                "UPDATE leases SET worker_id = NULL, expires_at = 0, failures = failures + ? "
+                "WHERE worker_id = ? AND item_id = (SELECT id FROM items WHERE position = ?)",
+                [(1 if position in failed else 0, self.worker_id, position) for position in positions]
+            )
+
+    def save_leased_item(self, position: int, item: Dict[str, Any]) -> bool:
+        """
+        Save an item if this worker still holds its lease.
+
+        Args:
+            position: Position of the item in the queue
+            item: Item dictionary
+
+        Returns:
+            True if the item was saved, False if the lease was lost to another worker
+        """
+        with self._write_transaction():
+            held = self.conn.execute(
+                "SELECT 1 FROM leases WHERE item_id = ? AND worker_id = ? AND expires_at > ?",
+                (item.get("id"), self.worker_id, time.time())
+            ).fetchone()
+            if held:
+                self._write_item(position, item)
+
+        if not held:
+            logger.warning(f"Lease on item {item.get('sku', position)} was lost, its result was not saved")
+        return bool(held)
+
+    def count_active_leases(self) -> int:
+        """
+        Count the leases held by any worker that have not expired.
+
+        Returns:
+            Number of active leases
+        """
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM leases WHERE worker_id IS NOT NULL AND expires_at > ?",
+                (time.time(),)
+            ).fetchone()[0]
+
+
+class LeaseWorker:
+    """
+    Processes a leased queue store batch by batch until no claimable items are left.
+
+    The worker's save_item method is the queue processor's save callback:
+    it writes a changed item of the current batch back to the store.
+
+    Leases are only renewed if the processor reported progress or saved an
+    item since the last renewal, or is paused while the API's circuit is
+    open, so the leases of a hung worker expire and its items go to the
+    other workers. A single request may take up to two renewal intervals
+    (two thirds of the lease) without losing the lease. Once a renewal shows
+    that leases of the batch were lost, the worker stops the batch and
+    claims a new one.
+    """
+
+    def __init__(self,
+                 store: LeasedQueueStore,
+                 batch_size: int = DEFAULT_LEASE_BATCH,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 log: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the worker.
+
+        Args:
+            store: Leased queue store shared with the other workers
+            batch_size: Number of items claimed at once
+            poll_interval: Seconds between claims while other workers hold all the remaining items
+            log: Optional function receiving log messages (defaults to the module logger)
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.log = log or logger.info
+        self.positions = []
+        self.items = []
+        # Time the current batch was claimed, or last progressed
+        self.last_progress = 0.0
+        # Set when a renewal finds that leases of the current batch were lost
+        self.leases_lost = False
+        # Held while the batch changes, so a renewal sees its leases and positions together
+        self.batch_lock = threading.Lock()
+
+    def _note_progress(self) -> None:
+        """Record that the current batch made progress, keeping its leases alive."""
+        self.last_progress = time.time()
+
+    def save_item(self, item_idx: int) -> None:
+        """
+        Save an item of the current batch to the store (processor save callback).
+
+        A save refused because the item's lease was lost stops the batch.
+
+        Args:
+            item_idx: Index of the item in the current batch
+        """
+        if not self.store.save_leased_item(self.positions[item_idx], self.items[item_idx]):
+            self.leases_lost = True
+        self._note_progress()
+
+    def _renew_leases(self, stop: threading.Event, processor: QueueProcessor) -> None:
+        """Renew the worker's leases until stopped, as long as it makes progress."""
+        last_renewal = time.time()
+        stalled = False
+        while not stop.wait(self.store.lease_seconds / 3):
+            # Waiting out an open circuit is a pause, not a hang
+            paused = processor.api_client.get_circuit_state()["retry_in"] > 0
+            if self.last_progress <= last_renewal and not paused:
+                if not stalled:
+                    logger.warning("No progress since the last lease renewal, letting the leases run out")
+                    stalled = True
+                continue
+            last_renewal = time.time()
+            stalled = False
+            try:
+                with self.batch_lock:
+                    renewed = self.store.renew()
+                    if renewed < len(self.positions) and not self.leases_lost:
+                        logger.warning("Leases of the current batch were lost to other workers, stopping the batch")
+                        self.leases_lost = True
+            except sqlite3.Error as e:
+                # The next renewal may succeed before the leases expire
+                logger.warning(f"Could not renew leases: {str(e)}")
+
+    def run(self,
+            processor: QueueProcessor,
+            report_progress: Optional[Callable[[int, int, str], None]] = None,
+            check_cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """
+        Claim and process batches of items until the pool is empty.
+
+        Args:
+            processor: Queue processor whose save callback is this worker's save_item
+            report_progress: Optional callback receiving (current, total, message) for each batch
+            check_cancelled: Optional function returning True when processing should stop
+
+        Returns:
+            Dictionary with 'batches', 'items', 'total', 'processed' and 'failed' counts and 'elapsed_time'
+        """
+        totals = {"batches": 0, "items": 0, "total": 0, "processed": 0, "failed": 0}
+        start_time = time.time()
+
+        def on_progress(current: int, total: int, message: str) -> None:
+            self._note_progress()
+            if report_progress:
+                report_progress(current, total, message)
+
+        def batch_cancelled() -> bool:
+            return self.leases_lost or bool(check_cancelled and check_cancelled())
+
+        stop = threading.Event()
+        renewer = threading.Thread(target=self._renew_leases, args=(stop, processor),
+                                   name="lease-renewer", daemon=True)
+        renewer.start()
+
+        try:
+            while not (check_cancelled and check_cancelled()):
+                with self.batch_lock:
+                    positions = self.store.claim(self.batch_size)
+                    self.positions = positions
+                    self.leases_lost = False
+                if not positions:
+                    if not self.store.count_active_leases():
+                        break
+                    # Other workers hold the remaining items, which return to the pool if they die
+                    time.sleep(self.poll_interval)
+                    continue
+
+                self.items = [self.store.get_item(position) for position in positions]
+                self._note_progress()
+                self.log(f"Leased items at positions {', '.join(str(p + 1) for p in positions)}")
+
+                try:
+                    result = processor.run(self.items, find_unprocessed_photos(self.items),
+                                           report_progress=on_progress, check_cancelled=batch_cancelled)
+                except BaseException:
+                    with self.batch_lock:
+                        self.store.release(positions)
+                        self.positions = []
+                    raise
+
+                if self.leases_lost:
+                    self.log("Leases of the batch were lost to other workers, claiming a new batch")
+                cancelled = batch_cancelled()
+                failed = [] if cancelled else [
+                    position for position, item in zip(positions, self.items) if not item.get("processed", False)
+                ]
+                with self.batch_lock:
+                    self.store.release(positions, failed)
+                    self.positions = []
+
+                totals["batches"] += 1
+                totals["items"] += len(positions)
+                for key in ("total", "processed", "failed"):
+                    totals[key] += result[key]
+        finally:
+            stop.set()
+            self.positions = []
+            self.items = []
+
+        totals["elapsed_time"] = time.time() - start_time
+        return totals
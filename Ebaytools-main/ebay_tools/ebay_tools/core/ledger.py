@@ -0,0 +1,435 @@
+"""
+Durable job ledger for queue processing runs.
+
+The processed flags in a queue file only say which photos are finished. A
+request that was answered just before a crash, or while the queue file was
+not being saved, was sent again (and billed again) on the next run. This
+module records every run in an SQLite database next to the queue, including:
+- A run ID per processing run, resumed after a crash or stop
+- One task per (item, photo) with a pending/in_flight/done/failed state machine
+- Attempt counts, time in flight and the last error of each task
+- One row per request sent, so batched photos and cache hits aren't counted as sends
+- An idempotency key per task, so a recorded response is reused instead of resent
+"""
+
+import os
+import time
+import uuid
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Ledger file suffix, appended to the queue file path
+LEDGER_SUFFIX = ".ledger.sqlite"
+
+# Task states; failed tasks go back in flight when retried, done is final
+TASK_PENDING = "pending"
+TASK_IN_FLIGHT = "in_flight"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+# Where a request's response came from; only network requests reach the API
+REQUEST_NETWORK = "network"
+REQUEST_CACHED = ("cache", "coalesced")
+
+# Run states; running and cancelled runs are resumed by the next run
+RUN_RUNNING = "running"
+RUN_CANCELLED = "cancelled"
+RUN_COMPLETED = "completed"
+
+
+def get_ledger_path(file_path: str) -> str:
+    """
+    Get the job ledger path for a queue file.
+
+    Args:
+        file_path: Path to the queue file
+
+    Returns:
+        Path to the ledger database
+    """
+    return f"{file_path}{LEDGER_SUFFIX}"
+
+
+def make_task_key(item: Dict[str, Any], photo_indices: List[int], stage: str = "photo") -> str:
+    """
+    Build the idempotency key of a request for some photos of an item.
+
+    The key changes when a photo file is replaced, so a recorded response
+    is only reused for the exact photos it describes.
+
+    Args:
+        item: Item dictionary
+        photo_indices: Indices of the photos sent in the request
+        stage: Kind of request ("photo" or "item")
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    photos = item.get("photos", [])
+    hasher = hashlib.sha256()
+    hasher.update(f"{stage}\0{item.get('id') or item.get('sku', '')}".encode("utf-8"))
+
+    for idx in photo_indices:
+        path = photos[idx].get("path", "") if idx < len(photos) else ""
+        try:
+            stat = os.stat(path)
+            identity = f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}"
+        except OSError:
+            identity = path
+        hasher.update(f"\0{idx}\0{identity}".encode("utf-8"))
+
+    return hasher.hexdigest()
+
+
+class JobLedger:
+    """
+    SQLite ledger of processing runs and their tasks.
+
+    A single connection is shared between threads and guarded by a lock.
+    Every state change is committed right away, so the ledger reflects the
+    last request that was sent or answered when the process dies.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) a job ledger.
+
+        Args:
+            path: Path to the SQLite database, or ":memory:" for a ledger that is not persisted
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        """Create the ledger tables and indexes if needed."""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS tasks (
+                run_id TEXT NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+                item_index INTEGER NOT NULL,
+                photo_index INTEGER NOT NULL,
+                item_id TEXT,
+                task_key TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                replayed INTEGER NOT NULL DEFAULT 0,
+                response TEXT,
+                error TEXT,
+                started_at REAL,
+                finished_at REAL,
+                elapsed REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (run_id, item_index, photo_index)
+            );
+            CREATE TABLE IF NOT EXISTS requests (
+                run_id TEXT NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+                task_key TEXT NOT NULL,
+                source TEXT NOT NULL,
+                sent_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_status ON runs(status, started_at);
+            CREATE INDEX IF NOT EXISTS idx_requests_run ON requests(run_id, source);
+            CREATE INDEX IF NOT EXISTS idx_tasks_key ON tasks(task_key, state);
+            CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks(run_id, state);
+        """)
+        self.conn.commit()
+
+    def _touch_run(self, run_id: str, now: float) -> None:
+        """Update a run's last activity time (lock must be held)."""
+        self.conn.execute("UPDATE runs SET updated_at = ? WHERE id = ?", (now, run_id))
+
+    # Runs
+
+    def start_run(self) -> str:
+        """
+        Start a new run.
+
+        Returns:
+            ID of the run
+        """
+        run_id = uuid.uuid4().hex
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO runs (id, status, started_at, updated_at) VALUES (?, ?, ?, ?)",
+                (run_id, RUN_RUNNING, now, now)
+            )
+            self.conn.commit()
+        return run_id
+
+    def find_unfinished_run(self) -> Optional[str]:
+        """
+        Find the latest run that crashed or was stopped.
+
+        Returns:
+            ID of the run, or None if every run completed
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id FROM runs WHERE status IN (?, ?) ORDER BY started_at DESC LIMIT 1",
+                (RUN_RUNNING, RUN_CANCELLED)
+            ).fetchone()
+        return row["id"] if row else None
+
+    def resume_run(self, run_id: str) -> int:
+        """
+        Mark a run running again, returning the tasks it left in flight to pending.
+
+        Whether a request in flight at a crash was billed can't be known; its
+        task is sent again and the extra attempt shows in its attempt count.
+
+        Args:
+            run_id: ID of the run
+
+        Returns:
+            Number of tasks that were in flight
+        """
+        now = time.time()
+        with self.lock:
+            recovered = self.conn.execute(
+                "UPDATE tasks SET state = ? WHERE run_id = ? AND state = ?",
+                (TASK_PENDING, run_id, TASK_IN_FLIGHT)
+            ).rowcount
+            self.conn.execute(
+                "UPDATE runs SET status = ?, updated_at = ?, finished_at = NULL WHERE id = ?",
+                (RUN_RUNNING, now, run_id)
+            )
+            self.conn.commit()
+        return recovered
+
+    def resume_or_start_run(self) -> Tuple[str, bool]:
+        """
+        Resume the latest unfinished run, or start a new one.
+
+        Returns:
+            Tuple of (run ID, True if an unfinished run was resumed)
+        """
+        run_id = self.find_unfinished_run()
+        if run_id:
+            recovered = self.resume_run(run_id)
+            logger.info(f"Resuming run {run_id} ({recovered} requests were in flight)")
+            return run_id, True
+        return self.start_run(), False
+
+    def finish_run(self, run_id: str, status: str = RUN_COMPLETED) -> None:
+        """
+        Record the end of a run.
+
+        Args:
+            run_id: ID of the run
+            status: RUN_COMPLETED, or RUN_CANCELLED for a run the next one should resume
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE runs SET status = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+                (status, now, now, run_id)
+            )
+            self.conn.commit()
+
+    # Tasks
+
+    def add_tasks(self, run_id: str, tasks: Iterable[Tuple[int, int, str, str]]) -> None:
+        """
+        Add tasks to a run, keeping the state of tasks it already has.
+
+        A task whose key changed (its item or photo changed since it was added)
+        starts over as pending.
+
+        Args:
+            run_id: ID of the run
+            tasks: (item index, photo index, item ID, task key) tuples
+        """
+        with self.lock:
+            self.conn.executemany("""
+                INSERT INTO tasks (run_id, item_index, photo_index, item_id, task_key, state)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (run_id, item_index, photo_index) DO UPDATE SET
+                    item_id = excluded.item_id,
+                    task_key = excluded.task_key,
+                    state = CASE WHEN task_key = excluded.task_key THEN state ELSE excluded.state END,
+                    response = CASE WHEN task_key = excluded.task_key THEN response END
+            """, [(run_id, item_idx, photo_idx, item_id, key, TASK_PENDING)
+                  for item_idx, photo_idx, item_id, key in tasks])
+            self._touch_run(run_id, time.time())
+            self.conn.commit()
+
+    def find_response(self, task_key: str) -> Optional[str]:
+        """
+        Get the response recorded for a task key by any run.
+
+        Args:
+            task_key: Idempotency key (see make_task_key)
+
+        Returns:
+            Latest recorded response, or None if no task with the key is done
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response FROM tasks WHERE task_key = ? AND state = ? AND response IS NOT NULL "
+                "ORDER BY finished_at DESC LIMIT 1",
+                (task_key, TASK_DONE)
+            ).fetchone()
+        return row["response"] if row else None
+
+    def mark_in_flight(self, run_id: str, tasks: List[Tuple[int, int]]) -> None:
+        """
+        Record that a request for tasks is being sent.
+
+        Args:
+            run_id: ID of the run
+            tasks: (item index, photo index) tuples covered by the request
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE tasks SET state = ?, attempts = attempts + 1, started_at = ? "
+                "WHERE run_id = ? AND item_index = ? AND photo_index = ? AND state IN (?, ?)",
+                [(TASK_IN_FLIGHT, now, run_id, item_idx, photo_idx, TASK_PENDING, TASK_FAILED)
+                 for item_idx, photo_idx in tasks]
+            )
+            self._touch_run(run_id, now)
+            self.conn.commit()
+
+    def mark_done(self, run_id: str, tasks: List[Tuple[int, int]], response: str, replayed: bool = False) -> None:
+        """
+        Record the response to tasks.
+
+        Args:
+            run_id: ID of the run
+            tasks: (item index, photo index) tuples covered by the response
+            response: Response text, reused for any later task with the same key
+            replayed: Whether the response was recorded earlier instead of requested now
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE tasks SET state = ?, response = ?, error = NULL, replayed = ?, finished_at = ?, "
+                "elapsed = elapsed + CASE WHEN state = ? THEN ? - started_at ELSE 0 END "
+                "WHERE run_id = ? AND item_index = ? AND photo_index = ? AND state != ?",
+                [(TASK_DONE, response, 1 if replayed else 0, now, TASK_IN_FLIGHT, now,
+                  run_id, item_idx, photo_idx, TASK_DONE)
+                 for item_idx, photo_idx in tasks]
+            )
+            self._touch_run(run_id, now)
+            self.conn.commit()
+
+    def mark_failed(self, run_id: str, tasks: List[Tuple[int, int]], error: str) -> None:
+        """
+        Record that a request for tasks failed.
+
+        Args:
+            run_id: ID of the run
+            tasks: (item index, photo index) tuples covered by the request
+            error: Error message
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE tasks SET state = ?, error = ?, finished_at = ?, "
+                "elapsed = elapsed + CASE WHEN state = ? THEN ? - started_at ELSE 0 END "
+                "WHERE run_id = ? AND item_index = ? AND photo_index = ? AND state != ?",
+                [(TASK_FAILED, error, now, TASK_IN_FLIGHT, now, run_id, item_idx, photo_idx, TASK_DONE)
+                 for item_idx, photo_idx in tasks]
+            )
+            self._touch_run(run_id, now)
+            self.conn.commit()
+
+    def get_tasks(self, run_id: str, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the tasks of a run in queue order.
+
+        Args:
+            run_id: ID of the run
+            state: Only return tasks in this state (all tasks if None)
+
+        Returns:
+            List of task dictionaries
+        """
+        query = "SELECT * FROM tasks WHERE run_id = ?"
+        params = [run_id]
+        if state:
+            query += " AND state = ?"
+            params.append(state)
+        query += " ORDER BY item_index, photo_index"
+
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(query, params)]
+
+    def record_request(self, run_id: str, task_key: str, source: str) -> None:
+        """
+        Record a request made for a run's tasks.
+
+        A request covering several photos (an item request) is recorded once,
+        unlike the attempt counts of its tasks.
+
+        Args:
+            run_id: ID of the run
+            task_key: Idempotency key of the request
+            source: Where the response came from (REQUEST_NETWORK or one of REQUEST_CACHED)
+        """
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO requests (run_id, task_key, source, sent_at) VALUES (?, ?, ?, ?)",
+                (run_id, task_key, source, time.time())
+            )
+            self.conn.commit()
+
+    def run_summary(self, run_id: str) -> Dict[str, Any]:
+        """
+        Get the task counts and timings of a run.
+
+        Args:
+            run_id: ID of the run
+
+        Returns:
+            Dictionary with the run's status, task counts per state, task
+            attempts, requests sent to the API, requests answered from the
+            response cache, replayed responses and total time in flight
+        """
+        with self.lock:
+            run = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+            states = dict(self.conn.execute(
+                "SELECT state, COUNT(*) FROM tasks WHERE run_id = ? GROUP BY state", (run_id,)
+            ).fetchall())
+            attempts, replayed, elapsed = self.conn.execute(
+                "SELECT COALESCE(SUM(attempts), 0), COALESCE(SUM(replayed), 0), COALESCE(SUM(elapsed), 0) "
+                "FROM tasks WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            sources = dict(self.conn.execute(
+                "SELECT source, COUNT(*) FROM requests WHERE run_id = ? GROUP BY source", (run_id,)
+            ).fetchall())
+
+        summary = {state: states.get(state, 0) for state in (TASK_PENDING, TASK_IN_FLIGHT, TASK_DONE, TASK_FAILED)}
+        summary.update({
+            "run_id": run_id,
+            "status": run["status"] if run else None,
+            "tasks": sum(states.values()),
+            "attempts": attempts,
+            "requests": sources.get(REQUEST_NETWORK, 0),
+            "cached": sum(sources.get(source, 0) for source in REQUEST_CACHED),
+            "replayed": replayed,
+            "elapsed": elapsed
+        })
+        return summary
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
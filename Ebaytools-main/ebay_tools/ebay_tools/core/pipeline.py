@@ -0,0 +1,154 @@
+"""
+Pipeline stages running work handed off by another stage.
+
+Generating an item's final description used to run inside the photo loop,
+so the next item's photos waited behind a long text generation. This
+module provides:
+- A stage with its own task queue and worker threads, fed by the stage before it
+- Counts of pending, completed and failed tasks for progress reporting
+- Optionally starting tasks by priority instead of in submission order
+- Waiting for the stage to drain, or cancelling the tasks not started yet
+"""
+
+import queue
+import logging
+import itertools
+import threading
+from typing import Any, Callable, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Default number of threads working on a stage's tasks
+DEFAULT_STAGE_WORKERS = 1
+
+# Marker telling a worker thread to exit
+_STOP = object()
+
+
+class PipelineStage:
+    """
+    Runs a work function over tasks submitted from other threads.
+
+    Tasks are started in submission order by the stage's own worker threads,
+    or by priority if the stage has a priority function; an exception raised
+    by the work function counts the task as failed and does not stop the stage.
+    """
+
+    def __init__(self,
+                 work: Callable[[Any], Any],
+                 workers: int = DEFAULT_STAGE_WORKERS,
+                 name: str = "stage",
+                 priority: Optional[Callable[[Any], Any]] = None):
+        """
+        Initialize the stage and start its worker threads.
+
+        Args:
+            work: Function run for each task
+            workers: Number of threads working on tasks
+            name: Name of the stage, used for its threads and in logs
+            priority: Optional function returning a task's sort key; queued
+                      tasks with lower keys are started first
+        """
+        self.work = work
+        self.name = name
+        self.priority = priority
+        self.tasks = queue.PriorityQueue() if priority else queue.Queue()
+        self._sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.cancelled = threading.Event()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.closed = False
+        self.threads = [
+            threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, task: Any) -> None:
+        """
+        Queue a task for the stage's workers.
+
+        Args:
+            task: Argument for the work function
+        """
+        with self.condition:
+            self.pending += 1
+        if self.priority:
+            # The sequence number keeps tasks of equal priority in submission order
+            self.tasks.put((0, self.priority(task), next(self._sequence), task))
+        else:
+            self.tasks.put(task)
+
+    def _put_stop(self) -> None:
+        """Queue a stop marker behind all tasks."""
+        if self.priority:
+            self.tasks.put((1, 0, next(self._sequence), _STOP))
+        else:
+            self.tasks.put(_STOP)
+
+    def _worker(self) -> None:
+        """Run queued tasks until told to stop."""
+        while True:
+            task = self.tasks.get()
+            if self.priority:
+                task = task[-1]
+            if task is _STOP:
+                return
+
+            succeeded = None
+            try:
+                # Tasks still queued when the stage is cancelled are dropped
+                if not self.cancelled.is_set():
+                    self.work(task)
+                    succeeded = True
+            except Exception as e:
+                logger.debug(f"Task failed in {self.name} stage: {str(e)}")
+                succeeded = False
+            finally:
+                with self.condition:
+                    self.pending -= 1
+                    if succeeded:
+                        self.completed += 1
+                    elif succeeded is False:
+                        self.failed += 1
+                    self.condition.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every submitted task has finished.
+
+        Args:
+            timeout: Maximum number of seconds to wait (waits indefinitely if None)
+
+        Returns:
+            True if the stage is drained, False if the timeout expired first
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending == 0, timeout)
+
+    def close(self, cancel: bool = False) -> None:
+        """
+        Stop the worker threads once they have finished their queued tasks.
+
+        Args:
+            cancel: Drop the tasks not started yet instead of running them
+        """
+        if cancel:
+            self.cancelled.set()
+        if self.closed:
+            return
+        self.closed = True
+        for _ in self.threads:
+            self._put_stop()
+        for thread in self.threads:
+            thread.join()
+
+    def __enter__(self) -> "PipelineStage":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close(cancel=exc_type is not None)
@@ -0,0 +1,99 @@
+"""
+Prefetching of request content ahead of the requests that send it.
+
+Reading, resizing and encoding a photo used to happen between two API
+requests, so file I/O and encoding never overlapped with network waits.
+This module provides:
+- A prepare stage running a few items ahead of its consumer on a small thread pool
+- A bounded lookahead, so only a few prepared payloads are held in memory
+- Results in input order, with each item's prepare error passed to the consumer
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Default number of items prepared ahead of the one being consumed
+DEFAULT_LOOKAHEAD = 4
+
+# Default number of threads preparing items
+DEFAULT_PREFETCH_WORKERS = 2
+
+
+class Prefetcher:
+    """
+    Runs a prepare function over a sequence of items ahead of its consumer.
+
+    Iterating yields (item, prepared, error) tuples in input order: prepared
+    is the prepare function's result, or None with the exception it raised in
+    error. At most lookahead items are prepared or waiting to be consumed at
+    any time. A lookahead of 0 prepares each item in the consumer's thread.
+    """
+
+    def __init__(self,
+                 prepare: Callable[[Any], Any],
+                 items: Iterable[Any],
+                 lookahead: int = DEFAULT_LOOKAHEAD,
+                 workers: int = DEFAULT_PREFETCH_WORKERS):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            prepare: Function preparing an item
+            items: Items to prepare, in consumption order
+            lookahead: Maximum number of items prepared ahead of the consumer
+            workers: Number of threads preparing items
+        """
+        self.prepare = prepare
+        self.items = iter(items)
+        self.lookahead = max(0, lookahead)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch") \
+            if self.lookahead else None
+        self.pending = deque()
+
+    def _fill(self) -> None:
+        """Submit items until the lookahead buffer is full or the items run out."""
+        while len(self.pending) < self.lookahead:
+            try:
+                item = next(self.items)
+            except StopIteration:
+                return
+            self.pending.append((item, self.executor.submit(self.prepare, item)))
+
+    def __iter__(self) -> Iterator[Tuple[Any, Optional[Any], Optional[Exception]]]:
+        if not self.executor:
+            for item in self.items:
+                try:
+                    yield item, self.prepare(item), None
+                except Exception as e:
+                    yield item, None, e
+            return
+
+        self._fill()
+        while self.pending:
+            item, future = self.pending.popleft()
+            # Keep the buffer full while the consumer works on this item
+            self._fill()
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                logger.debug(f"Prefetching failed: {str(e)}")
+                yield item, None, e
+
+    def close(self) -> None:
+        """Cancel the items not prepared yet and stop the worker threads."""
+        for _, future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        if self.executor:
+            self.executor.shutdown(wait=False)
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,1222 @@
+"""
+Queue processing engine for eBay listing tools.
+
+This module contains the photo processing logic shared by the GUI processor
+and the headless command line processor, without any UI dependencies:
+- Prompt building for photos, whole items and final descriptions, with the
+  static instructions kept in system prompts the provider can cache
+- Applying LLM results to queue items
+- Structured JSON listings, validated on receipt with only failing fields requested again
+- Walking a work queue with progress reporting and cancellation
+- Sending up to the API client's max_concurrent requests at once through its bounded pool
+- Working on items by priority and deadline instead of queue order, with a scheduler
+- Preparing the next photos' requests while the current one is in flight
+- Generating final descriptions in their own stage while the next photos are processed
+- Recording runs in a job ledger, so a restarted run resumes without resending answered requests
+- Publishing typed progress events for UIs to follow at their own pace
+- Pausing while the API's circuit breaker is open and resuming with a trial request
+"""
+
+import os
+import copy
+import json
+import time
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple
+
+from ebay_tools.core.schema import EbayItemSchema
+from ebay_tools.core.exceptions import ValidationError
+from ebay_tools.core.api import LLMApiClient, CircuitOpenError, PreparedRequest
+from ebay_tools.core.prefetch import Prefetcher, DEFAULT_LOOKAHEAD
+from ebay_tools.core.pipeline import PipelineStage, DEFAULT_STAGE_WORKERS
+from ebay_tools.core.ledger import JobLedger, make_task_key, RUN_CANCELLED, RUN_COMPLETED
+from ebay_tools.core.scheduler import WorkScheduler
+from ebay_tools.utils.events import Event, PhotoStarted, PhotoFinished, PhotoFailed, ItemCompleted
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Listing instructions shared by the final description and item mode prompts
+FINAL_DESCRIPTION_INSTRUCTIONS = """1. A concise, SEO-friendly title that would be good for an eBay listing (80 characters max)
+2. A comprehensive description that combines all the information
+3. Suggested primary category for the item
+4. Item condition (New, New Other, New with defects, Certified Refurbished, Seller Refurbished, Used, Very Good, Good, Acceptable, For parts)
+5. Item specifics in a structured format with the following fields (where applicable):
+   - Brand
+   - Model
+   - Type
+   - Size
+   - Color
+   - Material
+   - Style
+   - Features
+   - UPC/EAN/ISBN/MPN (if visible)
+   - Dimensions
+   - Weight
+   - Country/Region of Manufacture
+   - Condition details
+
+Format the response with clear sections like "Title:", "Description:", "Category:", "Condition:", and "Item specifics:".
+For item specifics, use a format like "Brand: Apple" with each item specific on a new line.
+"""
+
+# System prompts hold the instructions that are the same for every request, so the
+# provider can cache them and the user turn only carries item-specific text
+PHOTO_SYSTEM_PROMPT = """You describe photos of items for eBay listings. For each photo, provide:
+1. A detailed description of what you see in this specific photo
+2. Item condition details visible in this photo
+3. Any important measurements, features, or specifications visible
+4. Any defects, wear, or issues visible in this photo
+5. Brand information if visible
+6. Model information if visible
+
+Format your response as a cohesive paragraph that would be useful for a buyer.
+Focus on facts visible in this image, not speculation.
+"""
+
+LISTING_SYSTEM_PROMPT = "You write eBay listings from item details and photos. For each item, provide:\n\n" \
+    + FINAL_DESCRIPTION_INSTRUCTIONS
+
+# Listing instructions for structured output mode (see EbayItemSchema.LISTING_JSON_SCHEMA)
+STRUCTURED_LISTING_SYSTEM_PROMPT = """You write eBay listings from item details and photos. For each item, respond with a JSON object with these fields:
+- title: a concise, SEO-friendly title that would be good for an eBay listing (80 characters max)
+- description: a comprehensive description that combines all the information
+- category: suggested primary category for the item
+- condition: one of """ + ", ".join(EbayItemSchema.CONDITION_MAP.values()) + """
+- condition_notes: condition details, including any visible wear or defects
+- item_specifics: an object of item specifics where applicable, such as Brand, Model, Type, Size, Color,
+  Material, Style, Features, UPC/EAN/ISBN/MPN (if visible), Dimensions, Weight,
+  Country/Region of Manufacture, for example {"Brand": "Apple", "Color": "Silver"}
+
+Respond with only the JSON object.
+"""
+
+# How many times the fields of a structured listing that failed validation are requested again
+STRUCTURED_FIELD_RETRIES = 2
+
+# Structured listing fields without which a listing is not saved
+REQUIRED_LISTING_FIELDS = ("title", "description", "condition")
+
+
+def build_photo_prompt(item: Dict[str, Any], photo_data: Dict[str, Any]) -> str:
+    """
+    Build an enhanced prompt for processing a single photo.
+
+    Args:
+        item: Item the photo belongs to
+        photo_data: Photo dictionary
+
+    Returns:
+        Prompt text (send with PHOTO_SYSTEM_PROMPT)
+    """
+    # Extract item details
+    item_title = item.get('temp_title', '')
+    item_sku = item.get('sku', '')
+    item_notes = item.get('notes', '')
+    item_category = item.get('category', '')
+
+    # Start with comprehensive base prompt
+    base_prompt = f"Describe this eBay item in detail: {item_title} (SKU: {item_sku})."
+
+    # Add item category if available
+    if item_category:
+        base_prompt += f" Category: {item_category}."
+
+    # Add condition if available
+    if item.get('condition'):
+        condition_code = item.get('condition')
+        condition_desc = EbayItemSchema.CONDITION_MAP.get(condition_code, condition_code)
+        base_prompt += f" Condition: {condition_desc}."
+
+    # Add condition description if available
+    if item.get('conditionDescription'):
+        base_prompt += f" Condition details: {item.get('conditionDescription')}."
+
+    # Add item notes if available
+    if item_notes and item_notes != "Optional notes about this item":
+        base_prompt += f" Additional notes: {item_notes}."
+
+    # Add photo context if available
+    if photo_data.get("context"):
+        base_prompt += f" This specific photo shows: {photo_data.get('context')}"
+
+    return base_prompt
+
+
+def build_final_description_prompt(item: Dict[str, Any], descriptions: List[Tuple[str, str]]) -> str:
+    """
+    Build a prompt for generating the final item description.
+
+    Args:
+        item: Item dictionary
+        descriptions: List of (photo context, photo description) tuples
+
+    Returns:
+        Prompt text (send with LISTING_SYSTEM_PROMPT)
+    """
+    item_sku = item.get("sku", "")
+    item_notes = item.get("notes", "")
+    item_category = item.get("category", "")
+
+    # Create a prompt that includes all descriptions
+    prompt = f"I need to create an eBay listing for this item (SKU: {item_sku}).\n\n"
+
+    if item_notes:
+        prompt += f"Seller notes: {item_notes}\n\n"
+
+    if item_category:
+        prompt += f"Category: {item_category}\n\n"
+
+    prompt += "I have descriptions of the item from different angles:\n\n"
+
+    for idx, (context, desc) in enumerate(descriptions):
+        prompt += f"View {idx+1} ({context}):\n{desc}\n\n"
+
+    prompt += "Based on all these descriptions, please provide the listing."
+
+    return prompt
+
+
+def build_item_prompt(item: Dict[str, Any], photo_indices: List[int]) -> str:
+    """
+    Build a prompt that describes all selected photos of an item in one request.
+
+    Args:
+        item: Item dictionary
+        photo_indices: Indices of the photos sent with the prompt, in order
+
+    Returns:
+        Prompt text (send with LISTING_SYSTEM_PROMPT)
+    """
+    item_title = item.get('temp_title', '')
+    item_sku = item.get('sku', '')
+    item_notes = item.get('notes', '')
+    item_category = item.get('category', '')
+    photos = item.get('photos', [])
+
+    prompt = f"I need to create an eBay listing for this item: {item_title} (SKU: {item_sku}).\n\n"
+
+    if item_category:
+        prompt += f"Category: {item_category}\n\n"
+
+    if item.get('condition'):
+        condition_code = item.get('condition')
+        condition_desc = EbayItemSchema.CONDITION_MAP.get(condition_code, condition_code)
+        prompt += f"Condition: {condition_desc}\n\n"
+
+    if item.get('conditionDescription'):
+        prompt += f"Condition details: {item.get('conditionDescription')}\n\n"
+
+    if item_notes and item_notes != "Optional notes about this item":
+        prompt += f"Seller notes: {item_notes}\n\n"
+
+    prompt += f"The {len(photo_indices)} attached photos show the item from different angles:\n"
+    for position, idx in enumerate(photo_indices):
+        context = photos[idx].get("context", "") or "No context"
+        prompt += f"Photo {position+1}: {context}\n"
+
+    prompt += "\nBased on what is visible in these photos, including any defects or wear, please provide the listing."
+
+    return prompt
+
+
+def collect_photo_descriptions(item: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Collect the descriptions of an item's processed photos.
+
+    Args:
+        item: Item dictionary
+
+    Returns:
+        List of (photo context, photo description) tuples
+    """
+    photos = item.get("photos", [])
+    descriptions = []
+
+    for idx in item.get("process_photos", []):
+        if idx < len(photos) and photos[idx].get("processed", False):
+            photo = photos[idx]
+            if photo.get("api_result") and "response" in photo["api_result"]:
+                context = photo.get("context", f"Photo {idx+1}")
+                descriptions.append((context, photo["api_result"]["response"]))
+
+    return descriptions
+
+
+def build_field_retry_prompt(prompt: str, values: Dict[str, Any], errors: Dict[str, str]) -> str:
+    """
+    Build a prompt requesting the listing fields that failed validation again.
+
+    Args:
+        prompt: Prompt of the original listing request
+        values: Valid fields of the previous answer
+        errors: Error message for each field to request again
+
+    Returns:
+        Prompt text (send with STRUCTURED_LISTING_SYSTEM_PROMPT)
+    """
+    retry_prompt = f"{prompt}\n\n"
+    if values:
+        retry_prompt += f"A previous answer had these valid fields:\n{json.dumps(values, indent=2)}\n\n"
+    retry_prompt += "These fields were missing or invalid:\n"
+    for name, error in errors.items():
+        retry_prompt += f"- {name}: {error}\n"
+    retry_prompt += f"\nRespond with a JSON object with only these fields: {', '.join(errors)}."
+
+    return retry_prompt
+
+
+def _store_listing(item: Dict[str, Any], parsed: Dict[str, Any], description: str,
+                   result: Dict[str, Any]) -> None:
+    """Update an item with parsed listing fields and record the API result."""
+    # Fall back to the draft title if none could be extracted
+    parsed["title"] = parsed["title"] or item.get("temp_title", "")
+
+    # Update the item with the final results
+    item["processed"] = True
+    item["processed_at"] = datetime.now().isoformat()
+    item["title"] = parsed["title"]
+
+    if parsed["category"]:
+        item["category"] = parsed["category"]
+
+    item["condition"] = parsed["condition"]
+    item["conditionDescription"] = parsed["conditionDescription"]
+
+    # Save item specifics and the full description
+    item["item_specifics"] = parsed["item_specifics"]
+    item["description"] = description
+
+    if "api_results" not in item:
+        item["api_results"] = []
+
+    item["api_results"].append(dict({
+        "processed_at": datetime.now().isoformat(),
+        "final_description": description,
+        "item_specifics": parsed["item_specifics"]
+    }, **result))
+
+
+def apply_final_description(item: Dict[str, Any], final_description: str) -> Dict[str, Any]:
+    """
+    Update an item with the title, condition and item specifics parsed from a final description.
+
+    Args:
+        item: Item dictionary to update
+        final_description: Final description text returned by the LLM
+
+    Returns:
+        Parsed fields (see EbayItemSchema.parse_final_description)
+    """
+    parsed = EbayItemSchema.parse_final_description(final_description)
+    _store_listing(item, parsed, final_description, {})
+    return parsed
+
+
+def apply_listing_fields(item: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Update an item with the fields of a structured listing.
+
+    The fields are stored in the item's listing_fields, so exports never
+    have to parse the description text.
+
+    Args:
+        item: Item dictionary to update
+        fields: Valid listing fields (see EbayItemSchema.LISTING_JSON_SCHEMA)
+
+    Returns:
+        Parsed fields (see EbayItemSchema.listing_fields_to_parsed)
+    """
+    parsed = EbayItemSchema.listing_fields_to_parsed(fields)
+    item["listing_fields"] = fields
+    _store_listing(item, parsed, parsed["description"], {"listing_fields": fields, "structured": True})
+    return parsed
+
+
+def find_unprocessed_photos(queue: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+    """
+    Find all photos selected for processing that have not been processed yet.
+
+    Args:
+        queue: List of item dictionaries
+
+    Returns:
+        List of (item index, photo index) tuples in queue order
+    """
+    unprocessed_photos = []
+    for i, item in enumerate(queue):
+        photos = item.get("photos", [])
+
+        for photo_idx in item.get("process_photos", []):
+            if photo_idx < len(photos) and not photos[photo_idx].get("processed", False):
+                unprocessed_photos.append((i, photo_idx))
+
+    return unprocessed_photos
+
+
+def all_selected_photos_processed(item: Dict[str, Any]) -> bool:
+    """Check whether every photo selected for processing in an item has been processed."""
+    photos = item.get("photos", [])
+    return all(
+        photos[idx].get("processed", False)
+        for idx in item.get("process_photos", [])
+        if idx < len(photos)
+    )
+
+
+def selected_photo_files(item: Dict[str, Any]) -> List[int]:
+    """Get the indices of an item's selected photos whose files exist."""
+    photos = item.get("photos", [])
+    return [
+        idx for idx in item.get("process_photos", [])
+        if idx < len(photos) and os.path.exists(photos[idx].get("path", ""))
+    ]
+
+
+def find_items_awaiting_description(queue: List[Dict[str, Any]]) -> List[int]:
+    """
+    Find items whose selected photos are all processed but that have no final description yet.
+
+    These are left behind when a run is stopped before its description stage has drained.
+
+    Args:
+        queue: List of item dictionaries
+
+    Returns:
+        List of item indices in queue order
+    """
+    return [
+        i for i, item in enumerate(queue)
+        if item.get("process_photos") and not item.get("processed", False) and all_selected_photos_processed(item)
+    ]
+
+
+class QueueProcessor:
+    """
+    Processes the photos of a work queue with an LLM API client.
+
+    The processor has no UI dependencies; callers observe it through the
+    progress, log and save callbacks.
+
+    When the API client's circuit breaker opens, the run pauses instead of
+    failing every remaining photo, and resumes once the circuit lets a trial
+    request through.
+
+    Final descriptions are generated by a separate pipeline stage: an item
+    whose last photo is processed is handed off, and the photo loop moves on
+    to the next item. Each stage saves the items it changes.
+
+    With a job ledger, every photo request of a run is recorded as a task.
+    A response the ledger already holds for the same photos is reused, so a
+    run restarted after a crash never pays for an answered request twice.
+
+    With a scheduler, photos and final descriptions are worked on in the
+    scheduler's item order instead of queue order.
+    """
+
+    def __init__(self,
+                 api_client: LLMApiClient,
+                 generate_final: bool = True,
+                 item_mode: bool = False,
+                 structured_output: bool = False,
+                 log: Optional[Callable[[str], None]] = None,
+                 save_callback: Optional[Callable[[int], None]] = None,
+                 stream_callback: Optional[Callable[[str, str], None]] = None,
+                 prefetch: int = DEFAULT_LOOKAHEAD,
+                 publish_event: Optional[Callable[[Event], None]] = None,
+                 final_workers: int = DEFAULT_STAGE_WORKERS,
+                 ledger: Optional[JobLedger] = None,
+                 scheduler: Optional[WorkScheduler] = None,
+                 state_lock: Optional[threading.RLock] = None):
+        """
+        Initialize the queue processor.
+
+        Args:
+            api_client: API client used for all requests
+            generate_final: Whether to generate a final description once all photos of an item are done
+            item_mode: Whether to send all photos of an item in a single request (if the API supports it)
+            structured_output: Whether to request listings as validated JSON instead of free text
+            log: Optional function receiving log messages (defaults to the module logger)
+            save_callback: Optional function called with the index of each changed item that should be persisted
+            stream_callback: Optional function called with (stage, text so far) while a response
+                             streams in; stage is "photo", "item" or "final"
+            prefetch: Number of requests read and encoded ahead of the one being sent (0 disables prefetching)
+            publish_event: Optional function receiving progress events (see ebay_tools.utils.events)
+                           from the processing threads
+            final_workers: Number of threads generating final descriptions while photos are
+                           processed (0 generates each one inline, before the next photo)
+            ledger: Optional job ledger recording the runs and their photo requests
+            scheduler: Optional scheduler ordering the work by item priority and deadline
+            state_lock: Optional lock shared with other code changing or saving the queue's
+                        items while it is processed (defaults to a lock of its own)
+        """
+        self.api_client = api_client
+        self.generate_final = generate_final
+        self.item_mode = item_mode
+        self.structured_output = structured_output
+        self.log = log or logger.info
+        self.save_callback = save_callback
+        self.stream_callback = stream_callback
+        self.prefetch = prefetch
+        self.publish_event = publish_event
+        self.final_workers = final_workers
+        self.ledger = ledger
+        self.scheduler = scheduler
+        # Ledger run and idempotency keys of the run in progress
+        self.run_id = None
+        self.task_keys = {}
+        # Held while a stage changes or saves an item, so saving never reads an item mid-update
+        self.state_lock = state_lock or threading.RLock()
+
+    def _on_delta(self, stage: str) -> Optional[Callable[[str, str], None]]:
+        """Get the API delta callback for a processing stage, or None if nobody is watching."""
+        if not self.stream_callback:
+            return None
+        return lambda delta, text: self.stream_callback(stage, text)
+
+    def _publish(self, event: Event) -> None:
+        """Publish a progress event, if anyone is listening."""
+        if self.publish_event:
+            self.publish_event(event)
+
+    def _save(self, item_idx: int) -> None:
+        """Persist a changed item through the save callback, if any."""
+        if self.save_callback:
+            with self.state_lock:
+                self.save_callback(item_idx)
+
+    def _ledger_task(self, item_idx: int, photo_indices: List[int]) -> Optional[Tuple[List[Tuple[int, int]], str]]:
+        """Get the ledger tasks and idempotency key of a request, or None if the run has no ledger."""
+        tasks = [(item_idx, photo_idx) for photo_idx in photo_indices if (item_idx, photo_idx) in self.task_keys]
+        if not self.ledger or not tasks:
+            return None
+        return tasks, self.task_keys[tasks[0]]
+
+    def _send_request(self, task: Optional[Tuple[List[Tuple[int, int]], str]], request: Callable[[], str]) -> str:
+        """
+        Send a request, recording it in the job ledger.
+
+        Args:
+            task: Ledger tasks and idempotency key covered by the request (see _ledger_task), or None
+            request: Function sending the request and returning the response text
+
+        Returns:
+            Response text, taken from the ledger without a request if it recorded one for the key
+        """
+        if task is None:
+            return request()
+
+        tasks, key = task
+        recorded = self.ledger.find_response(key)
+        if recorded is not None:
+            self.log(f"Reusing the recorded response for {len(tasks)} photo(s), no request sent")
+            self.ledger.mark_done(self.run_id, tasks, recorded, replayed=True)
+            return recorded
+
+        self.ledger.mark_in_flight(self.run_id, tasks)
+        try:
+            response = request()
+        except CircuitOpenError as e:
+            # Nothing was sent
+            self.ledger.mark_failed(self.run_id, tasks, str(e))
+            raise
+        except Exception as e:
+            self._record_request(key)
+            self.ledger.mark_failed(self.run_id, tasks, str(e))
+            raise
+        self._record_request(key)
+        self.ledger.mark_done(self.run_id, tasks, response)
+        return response
+
+    def _record_request(self, key: str) -> None:
+        """Record a request in the job ledger, once however many photos it covered."""
+        source = self.api_client.last_response_source()
+        if source is not None:
+            self.ledger.record_request(self.run_id, key, source)
+
+    def prepare_photo_request(self, item: Dict[str, Any], photo_idx: int, encode: bool = True) -> PreparedRequest:
+        """
+        Read the photo and build the request for processing a single photo.
+
+        Args:
+            item: Item the photo belongs to
+            photo_idx: Index of the photo in the item's photos
+            encode: Whether to encode the photo now rather than when sending
+
+        Returns:
+            Prepared request
+        """
+        photo_data = item.get("photos", [])[photo_idx]
+        prompt = build_photo_prompt(item, photo_data)
+        return self.api_client.prepare_request(prompt, [photo_data.get("path", "")], PHOTO_SYSTEM_PROMPT,
+                                               encode=encode)
+
+    def prepare_item_request(self, item: Dict[str, Any], photo_indices: List[int],
+                             encode: bool = True) -> PreparedRequest:
+        """
+        Read the photos and build the request for processing several photos of an item at once.
+
+        Args:
+            item: Item dictionary
+            photo_indices: Indices of the photos to send
+            encode: Whether to encode the photos now rather than when sending
+
+        Returns:
+            Prepared request
+        """
+        photos = item.get("photos", [])
+        photo_paths = [photos[idx].get("path", "") for idx in photo_indices]
+        prompt = build_item_prompt(item, photo_indices)
+        if self.structured_output:
+            return self.api_client.prepare_request(prompt, photo_paths, STRUCTURED_LISTING_SYSTEM_PROMPT,
+                                                   EbayItemSchema.listing_json_schema(), encode=encode)
+        return self.api_client.prepare_request(prompt, photo_paths, LISTING_SYSTEM_PROMPT, encode=encode)
+
+    def process_photo(self, item: Dict[str, Any], photo_idx: int, prepared: Optional[PreparedRequest] = None,
+                      complete: bool = True, task: Optional[Tuple[List[Tuple[int, int]], str]] = None) -> str:
+        """
+        Process a single photo and complete the item if it was the last one.
+
+        Args:
+            item: Item the photo belongs to
+            photo_idx: Index of the photo in the item's photos
+            prepared: Request from prepare_photo_request (optional, prepared here if missing)
+            complete: Whether to complete the item here (False when the caller hands it off)
+            task: Ledger tasks and idempotency key of the request (see _ledger_task)
+
+        Returns:
+            Photo description returned by the API
+
+        Raises:
+            Exception: Any API error, after it has been recorded on the photo
+        """
+        photo_data = item.get("photos", [])[photo_idx]
+        photo_path = photo_data.get("path", "")
+
+        try:
+            if prepared is None:
+                prepared = self.prepare_photo_request(item, photo_idx, encode=False)
+            response = self._send_request(task, lambda: self.api_client.process_photo(
+                photo_path, prepared.prompt, on_delta=self._on_delta("photo"), prepared=prepared
+            ))
+        except CircuitOpenError:
+            # Nothing wrong with the photo, it is retried once the API is back
+            raise
+        except Exception as e:
+            with self.state_lock:
+                photo_data["last_error"] = str(e)
+                photo_data["last_attempt"] = datetime.now().isoformat()
+            raise
+
+        with self.state_lock:
+            photo_data["processed"] = True
+            photo_data["processed_at"] = datetime.now().isoformat()
+            photo_data["api_result"] = {"response": response}
+
+        if complete:
+            self.complete_item_if_ready(item)
+        return response
+
+    def complete_item_if_ready(self, item: Dict[str, Any]) -> bool:
+        """
+        Mark an item processed once all its selected photos are, generating the final description if enabled.
+
+        Args:
+            item: Item dictionary
+
+        Returns:
+            True if the item was completed
+        """
+        if not all_selected_photos_processed(item):
+            return False
+
+        self.log(f"All selected photos processed for item {item.get('sku', '')}")
+
+        if self.generate_final:
+            self.generate_final_description(item)
+        else:
+            item["processed"] = True
+            item["processed_at"] = datetime.now().isoformat()
+
+        return True
+
+    def generate_final_description(self, item: Dict[str, Any]) -> bool:
+        """
+        Generate a final comprehensive description and extract item specifics.
+
+        Args:
+            item: Item dictionary
+
+        Returns:
+            True on success, False on failure
+        """
+        descriptions = collect_photo_descriptions(item)
+        if not descriptions:
+            self.log("No descriptions available to generate final description")
+            return False
+
+        try:
+            prompt = build_final_description_prompt(item, descriptions)
+
+            self.log("Generating final description...")
+            if self.structured_output:
+                parsed = apply_listing_fields(item, self._request_listing_fields(
+                    prompt,
+                    lambda: self.api_client.generate_text(
+                        prompt, on_delta=self._on_delta("final"), system=STRUCTURED_LISTING_SYSTEM_PROMPT,
+                        response_schema=EbayItemSchema.listing_json_schema()
+                    )
+                ))
+            else:
+                final_description = self.api_client.generate_text(prompt, on_delta=self._on_delta("final"),
+                                                                  system=LISTING_SYSTEM_PROMPT)
+                parsed = apply_final_description(item, final_description)
+
+            self.log(f"Generated final description for item {item.get('sku', '')}")
+            self.log(f"Title: {parsed['title']}")
+            self.log(f"Extracted {len(parsed['item_specifics'])} item specifics")
+            return True
+
+        except ValidationError:
+            # No usable listing: the item stays unprocessed and counts as failed
+            raise
+        except Exception as e:
+            error_msg = f"Error generating final description: {str(e)}"
+            self.log(error_msg)
+
+            # Mark the item as processed even if final description fails
+            item["processed"] = True
+            item["processed_at"] = datetime.now().isoformat()
+
+            if "api_results" not in item:
+                item["api_results"] = []
+
+            item["api_results"].append({
+                "processed_at": datetime.now().isoformat(),
+                "error": error_msg
+            })
+
+            return False
+
+    def _complete_inline(self, queue: List[Dict[str, Any]], item_idx: int) -> bool:
+        """
+        Complete an item whose photos are all processed, without a description stage.
+
+        Args:
+            queue: List of item dictionaries
+            item_idx: Index of the item in the queue
+
+        Returns:
+            False if the listing was unusable; the item stays unprocessed for the next run
+        """
+        # Work on a copy, as _describe_item does, so a save by another worker never sees a half-updated item
+        item = queue[item_idx]
+        with self.state_lock:
+            draft = copy.deepcopy(item)
+        try:
+            self.complete_item_if_ready(draft)
+        except ValidationError as e:
+            self.log(f"No final description for item {item.get('sku', item_idx + 1)}: {str(e)}")
+            return False
+        with self.state_lock:
+            item.update(draft)
+            self._save(item_idx)
+        return True
+
+    def _describe_item(self, queue: List[Dict[str, Any]], item_idx: int,
+                       check_cancelled: Optional[Callable[[], bool]]) -> None:
+        """
+        Generate the final description of an item handed off to the description stage.
+
+        Args:
+            queue: List of item dictionaries
+            item_idx: Index of the item in the queue
+            check_cancelled: Optional function returning True when processing should stop
+
+        Raises:
+            RuntimeError: If no final description could be generated
+        """
+        # The photo stage pauses and resumes the run; this stage only waits
+        if not self._wait_while_circuit_open(check_cancelled, None):
+            return
+
+        # Work on a copy so a save by the photo stage never sees a half-updated item
+        item = queue[item_idx]
+        with self.state_lock:
+            draft = copy.deepcopy(item)
+        described = self.generate_final_description(draft)
+        with self.state_lock:
+            item.update(draft)
+            self._save(item_idx)
+
+        if item.get("processed", False):
+            self._publish(ItemCompleted(item_idx))
+        if not described:
+            raise RuntimeError(f"No final description for item {item.get('sku', item_idx + 1)}")
+
+    def process_item_photos(self, item: Dict[str, Any], photo_indices: List[int],
+                            prepared: Optional[PreparedRequest] = None,
+                            task: Optional[Tuple[List[Tuple[int, int]], str]] = None) -> str:
+        """
+        Process several photos of an item with a single multi-image request.
+
+        Args:
+            item: Item dictionary
+            photo_indices: Indices of the photos to send
+            prepared: Request from prepare_item_request (optional, prepared here if missing)
+            task: Ledger tasks and idempotency key of the request (see _ledger_task)
+
+        Returns:
+            Listing text returned by the API
+        """
+        photos = item.get("photos", [])
+        photo_paths = [photos[idx].get("path", "") for idx in photo_indices]
+
+        try:
+            if prepared is None:
+                prepared = self.prepare_item_request(item, photo_indices, encode=False)
+            response = self._send_request(task, lambda: self.api_client.process_item(
+                photo_paths, prepared.prompt, on_delta=self._on_delta("item"), prepared=prepared
+            ))
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            with self.state_lock:
+                for idx in photo_indices:
+                    photos[idx]["last_error"] = str(e)
+                    photos[idx]["last_attempt"] = datetime.now().isoformat()
+            raise
+
+        # Validate the listing first, so an unusable one leaves the photos unprocessed
+        if self.structured_output:
+            fields = self._request_listing_fields(prepared.prompt, lambda: response)
+
+        with self.state_lock:
+            # Every photo shares the combined response
+            processed_at = datetime.now().isoformat()
+            for idx in photo_indices:
+                photos[idx]["processed"] = True
+                photos[idx]["processed_at"] = processed_at
+                photos[idx]["api_result"] = {"response": response, "item_mode": True}
+
+            if self.structured_output:
+                parsed = apply_listing_fields(item, fields)
+            else:
+                parsed = apply_final_description(item, response)
+        self.log(f"Title: {parsed['title']}")
+        return response
+
+    def _request_listing_fields(self, prompt: str, request: Callable[[], str]) -> Dict[str, Any]:
+        """
+        Get a validated structured listing, requesting only the failing fields again.
+
+        Retries are text-only requests carrying the original prompt and the
+        valid fields of the previous answer.
+
+        Args:
+            prompt: Prompt of the listing request
+            request: Function making the listing request and returning the response text
+
+        Returns:
+            Valid listing fields; optional fields still invalid after the retries are left out
+
+        Raises:
+            ValidationError: If a required field (see REQUIRED_LISTING_FIELDS) is still invalid
+        """
+        values, errors = EbayItemSchema.validate_listing_json(request())
+
+        for _ in range(STRUCTURED_FIELD_RETRIES):
+            if not errors:
+                break
+            self.log("Requesting listing fields again: " +
+                     ", ".join(f"{name} ({error})" for name, error in errors.items()))
+            fields = list(errors)
+            try:
+                # A cached answer would fail validation the same way
+                response = self.api_client.make_request(
+                    build_field_retry_prompt(prompt, values, errors), use_cache=False,
+                    system=STRUCTURED_LISTING_SYSTEM_PROMPT,
+                    response_schema=EbayItemSchema.listing_json_schema(fields)
+                )
+            except Exception as e:
+                self.log(f"Could not request listing fields again: {str(e)}")
+                break
+            retried, errors = EbayItemSchema.validate_listing_json(response, fields)
+            values.update(retried)
+
+        missing = [name for name in REQUIRED_LISTING_FIELDS if name in errors]
+        if missing:
+            raise ValidationError(f"Listing fields still invalid after {STRUCTURED_FIELD_RETRIES} retries: "
+                                  + ", ".join(f"{name} ({errors[name]})" for name in missing), field=missing[0])
+        if errors:
+            self.log(f"Listing fields still invalid, left empty: {', '.join(errors)}")
+        return values
+
+    def _wait_while_circuit_open(self,
+                                 check_cancelled: Optional[Callable[[], bool]],
+                                 on_pause: Optional[Callable[[bool, str], None]]) -> bool:
+        """
+        Block while the API's circuit is open.
+
+        Args:
+            check_cancelled: Optional function returning True when processing should stop
+            on_pause: Optional callback receiving (paused, message) when pausing and resuming
+
+        Returns:
+            False if processing was cancelled while paused, True otherwise
+        """
+        circuit = self.api_client.get_circuit_state()
+        if circuit["retry_in"] <= 0:
+            return True
+
+        message = f"API unavailable, paused for {circuit['retry_in']:.0f}s until a trial request"
+        self.log(message)
+        if on_pause:
+            on_pause(True, message)
+
+        while circuit["retry_in"] > 0:
+            if check_cancelled and check_cancelled():
+                return False
+            time.sleep(min(circuit["retry_in"], 1.0))
+            circuit = self.api_client.get_circuit_state()
+
+        self.log("Resuming processing with a trial request")
+        if on_pause:
+            on_pause(False, "Resuming processing")
+        return True
+
+    def _call_when_available(self,
+                             work: Callable[[], Any],
+                             check_cancelled: Optional[Callable[[], bool]],
+                             on_pause: Optional[Callable[[bool, str], None]]) -> bool:
+        """
+        Run a unit of work, pausing and retrying it while the API's circuit is open.
+
+        Args:
+            work: Function making the API request
+            check_cancelled: Optional function returning True when processing should stop
+            on_pause: Optional callback receiving (paused, message) when pausing and resuming
+
+        Returns:
+            False if processing was cancelled while paused, True once the work has run
+
+        Raises:
+            Exception: Any error of the work other than an open circuit
+        """
+        while True:
+            if not self._wait_while_circuit_open(check_cancelled, on_pause):
+                return False
+            try:
+                work()
+                return True
+            except CircuitOpenError:
+                # Opened during this request; wait for the trial request and try again
+                continue
+
+    @staticmethod
+    def _format_time_remaining(elapsed: float, done: int, total: int) -> str:
+        """Format an estimate of the remaining time."""
+        if done <= 0:
+            return "Estimating time..."
+
+        estimated_time = (total - done) * elapsed / done
+        return f"EST: {int(estimated_time // 60)}m {int(estimated_time % 60)}s"
+
+    def run(self,
+            queue: List[Dict[str, Any]],
+            unprocessed_photos: List[Tuple[int, int]],
+            report_progress: Optional[Callable[[int, int, str], None]] = None,
+            check_cancelled: Optional[Callable[[], bool]] = None,
+            on_start: Optional[Callable[[int, int], None]] = None,
+            on_pause: Optional[Callable[[bool, str], None]] = None) -> Dict[str, Any]:
+        """
+        Process a list of photos from a queue.
+
+        Args:
+            queue: List of item dictionaries
+            unprocessed_photos: List of (item index, photo index) tuples to process
+            report_progress: Optional callback receiving (current, total, message)
+            check_cancelled: Optional function returning True when processing should stop
+            on_start: Optional callback receiving (item index, photo index) before each request
+            on_pause: Optional callback receiving (paused, message) when processing pauses
+                      for an unavailable API and when it resumes
+
+        Returns:
+            Dictionary with 'total', 'processed' and 'failed' photo counts, 'elapsed_time' and,
+            when final descriptions are generated photo by photo, 'described' and
+            'description_failed' item counts. With a job ledger, 'run_id' and 'ledger'
+            (see JobLedger.run_summary) are added.
+        """
+        item_mode = self.item_mode and self.api_client.supports_multi_image()
+        if self.item_mode and not item_mode:
+            self.log("Selected API does not accept several images per request, processing photo by photo")
+
+        if self.scheduler:
+            unprocessed_photos = self.scheduler.order_photos(queue, unprocessed_photos)
+
+        if self.ledger:
+            self._open_ledger_run(queue, unprocessed_photos, item_mode)
+
+        if item_mode:
+            result = self._run_items(queue, unprocessed_photos, report_progress, check_cancelled, on_start, on_pause)
+        elif not self.generate_final or self.final_workers <= 0:
+            result = self._run_photos(queue, unprocessed_photos, report_progress, check_cancelled, on_start, on_pause)
+        else:
+            result = self._run_pipelined(queue, unprocessed_photos, report_progress, check_cancelled, on_start,
+                                         on_pause)
+
+        if self.ledger:
+            # A stopped run is resumed by the next one; a crashed run is still marked running
+            cancelled = bool(check_cancelled and check_cancelled())
+            self.ledger.finish_run(self.run_id, RUN_CANCELLED if cancelled else RUN_COMPLETED)
+            result["run_id"] = self.run_id
+            result["ledger"] = self.ledger.run_summary(self.run_id)
+        return result
+
+    def _open_ledger_run(self, queue: List[Dict[str, Any]], unprocessed_photos: List[Tuple[int, int]],
+                         item_mode: bool) -> None:
+        """Resume the ledger's unfinished run or start one, and record the photos to process as its tasks."""
+        self.run_id, resumed = self.ledger.resume_or_start_run()
+        if resumed:
+            self.log(f"Resuming processing run {self.run_id}")
+
+        # In item mode one request covers all the selected photos of an item
+        item_keys = {}
+        self.task_keys = {}
+        for item_idx, photo_idx in unprocessed_photos:
+            item = queue[item_idx]
+            if not item_mode:
+                self.task_keys[(item_idx, photo_idx)] = make_task_key(item, [photo_idx])
+                continue
+            if item_idx not in item_keys:
+                stage = "item-structured" if self.structured_output else "item"
+                item_keys[item_idx] = make_task_key(item, selected_photo_files(item), stage)
+            self.task_keys[(item_idx, photo_idx)] = item_keys[item_idx]
+
+        self.ledger.add_tasks(self.run_id, [
+            (item_idx, photo_idx, queue[item_idx].get("id", ""), key)
+            for (item_idx, photo_idx), key in self.task_keys.items()
+        ])
+
+    def _run_pipelined(self,
+                       queue: List[Dict[str, Any]],
+                       unprocessed_photos: List[Tuple[int, int]],
+                       report_progress: Optional[Callable[[int, int, str], None]],
+                       check_cancelled: Optional[Callable[[], bool]],
+                       on_start: Optional[Callable[[int, int], None]],
+                       on_pause: Optional[Callable[[bool, str], None]]) -> Dict[str, Any]:
+        """Process unprocessed photos while a separate stage generates the final descriptions."""
+        start_time = time.time()
+        priority = self.scheduler.item_key(queue) if self.scheduler else None
+        with PipelineStage(lambda item_idx: self._describe_item(queue, item_idx, check_cancelled),
+                           self.final_workers, "describe", priority) as stage:
+            # Items a stopped run handed off but never described go first
+            for item_idx in find_items_awaiting_description(queue):
+                stage.submit(item_idx)
+
+            result = self._run_photos(queue, unprocessed_photos, report_progress, check_cancelled, on_start,
+                                      on_pause, stage)
+
+            while not stage.wait(timeout=0.5):
+                if check_cancelled and check_cancelled():
+                    break
+                if report_progress:
+                    report_progress(result["processed"], result["total"],
+                                    f"Generating final descriptions... {stage.pending} remaining")
+
+            # Descriptions not started yet are picked up by the next run
+            stage.close(cancel=bool(check_cancelled and check_cancelled()))
+
+        result["described"] = stage.completed
+        result["description_failed"] = stage.failed
+        result["elapsed_time"] = time.time() - start_time
+        return result
+
+    def _run_photos(self,
+                    queue: List[Dict[str, Any]],
+                    unprocessed_photos: List[Tuple[int, int]],
+                    report_progress: Optional[Callable[[int, int, str], None]],
+                    check_cancelled: Optional[Callable[[], bool]],
+                    on_start: Optional[Callable[[int, int], None]],
+                    on_pause: Optional[Callable[[bool, str], None]],
+                    stage: Optional[PipelineStage] = None) -> Dict[str, Any]:
+        """
+        Process unprocessed photos, up to the API client's max_concurrent at a time,
+        completing items or handing them to the description stage.
+        """
+        total_photos = len(unprocessed_photos)
+        processed_count = 0
+        failed_count = 0
+        start_time = time.time()
+        # Items whose last photo is done, so photos of an item finishing together complete it once
+        finished_items = set()
+        # Inline final descriptions, as (item index, generated) pairs
+        completions = []
+
+        if not stage and self.generate_final:
+            # Items a stopped or failed run left without a final description go first
+            for item_idx in find_items_awaiting_description(queue):
+                if check_cancelled and check_cancelled():
+                    break
+                completions.append((item_idx, self._complete_inline(queue, item_idx)))
+                if queue[item_idx].get("processed", False):
+                    self._publish(ItemCompleted(item_idx))
+
+        def start(prefetched: Iterable[Tuple[Tuple[int, int], Optional[PreparedRequest], Any]]
+                  ) -> Iterator[Tuple[int, int, Optional[PreparedRequest]]]:
+            # Runs in this thread as the pool takes each photo
+            for (item_idx, photo_idx), prepared, _ in prefetched:
+                if on_start:
+                    on_start(item_idx, photo_idx)
+                self._publish(PhotoStarted(item_idx, photo_idx))
+
+                if report_progress:
+                    done = processed_count + failed_count
+                    photo_path = queue[item_idx].get("photos", [])[photo_idx].get("path", "")
+                    time_str = self._format_time_remaining(time.time() - start_time, done, total_photos)
+                    if stage and stage.pending:
+                        time_str += f" ({stage.pending} descriptions pending)"
+                    report_progress(done, total_photos, f"Processing {os.path.basename(photo_path)}... {time_str}")
+                yield item_idx, photo_idx, prepared
+
+        def process(photo: Tuple[int, int, Optional[PreparedRequest]]) -> Optional[bool]:
+            # Returns whether the photo finished its item, or None if cancelled while paused
+            item_idx, photo_idx, prepared = photo
+            item = queue[item_idx]
+            task = self._ledger_task(item_idx, [photo_idx])
+            if not self._call_when_available(
+                    lambda: self.process_photo(item, photo_idx, prepared, complete=False, task=task),
+                    check_cancelled, on_pause):
+                return None
+            # The photo is saved before its item is completed, which may fail on its own
+            self._save(item_idx)
+            with self.state_lock:
+                finished = all_selected_photos_processed(item) and item_idx not in finished_items
+                if finished:
+                    finished_items.add(item_idx)
+            if finished and not stage:
+                completions.append((item_idx, self._complete_inline(queue, item_idx)))
+            return finished
+
+        # Read and encode the next photos while the current requests are in flight. A photo
+        # that failed to prepare is prepared again when sent, recording the error on it.
+        prefetcher = Prefetcher(lambda photo: self.prepare_photo_request(queue[photo[0]], photo[1]),
+                                unprocessed_photos, self.prefetch)
+        with prefetcher:
+            for (item_idx, photo_idx, _), future in self.api_client.iter_concurrent(
+                    process, start(prefetcher), check_cancelled=check_cancelled):
+                item = queue[item_idx]
+                photo_path = item.get("photos", [])[photo_idx].get("path", "")
+                try:
+                    finished = future.result()
+                    if finished is None:
+                        continue
+                    processed_count += 1
+                    self._publish(PhotoFinished(item_idx, photo_idx))
+                    if finished:
+                        if stage:
+                            self.log(f"All selected photos processed for item {item.get('sku', '')}, "
+                                     f"queued for final description")
+                            stage.submit(item_idx)
+                        elif item.get("processed", False):
+                            self._publish(ItemCompleted(item_idx))
+                except Exception as e:
+                    # Log error and continue with next photo
+                    self.log(f"Error processing photo {os.path.basename(photo_path)}: {str(e)}")
+                    failed_count += 1
+                    self._publish(PhotoFailed(item_idx, photo_idx, str(e)))
+
+        result = {
+            "total": total_photos,
+            "processed": processed_count,
+            "failed": failed_count,
+            "elapsed_time": time.time() - start_time
+        }
+        if not stage and self.generate_final:
+            result["described"] = sum(1 for _, generated in completions if generated)
+            result["description_failed"] = len(completions) - result["described"]
+        return result
+
+    def _run_items(self,
+                   queue: List[Dict[str, Any]],
+                   unprocessed_photos: List[Tuple[int, int]],
+                   report_progress: Optional[Callable[[int, int, str], None]],
+                   check_cancelled: Optional[Callable[[], bool]],
+                   on_start: Optional[Callable[[int, int], None]],
+                   on_pause: Optional[Callable[[bool, str], None]] = None) -> Dict[str, Any]:
+        """Process unprocessed photos with one request per item, up to the API client's max_concurrent at a time."""
+        total_photos = len(unprocessed_photos)
+        processed_count = 0
+        failed_count = 0
+        start_time = time.time()
+
+        # Group photos by item, keeping queue order
+        pending_by_item = {}
+        for item_idx, photo_idx in unprocessed_photos:
+            pending_by_item.setdefault(item_idx, []).append(photo_idx)
+
+        # Every selected photo of an item is sent, so the model sees the whole item
+        def prepare(item_idx: int) -> Tuple[List[int], Optional[PreparedRequest]]:
+            photo_indices = selected_photo_files(queue[item_idx])
+            if not photo_indices:
+                return photo_indices, None
+            return photo_indices, self.prepare_item_request(queue[item_idx], photo_indices)
+
+        def start(prefetched: Iterable[Tuple[int, Any, Any]]
+                  ) -> Iterator[Tuple[int, List[int], Optional[PreparedRequest]]]:
+            # Runs in this thread as the pool takes each item
+            for item_idx, prepared_item, _ in prefetched:
+                item = queue[item_idx]
+                photo_indices, prepared = prepared_item or (selected_photo_files(item), None)
+
+                if on_start:
+                    on_start(item_idx, photo_indices[0] if photo_indices else 0)
+                self._publish(PhotoStarted(item_idx, photo_indices[0] if photo_indices else 0))
+
+                if report_progress:
+                    done = processed_count + failed_count
+                    time_str = self._format_time_remaining(time.time() - start_time, done, total_photos)
+                    report_progress(done, total_photos,
+                                    f"Processing item {item.get('sku', item_idx + 1)} ({len(photo_indices)} photos)... {time_str}")
+                yield item_idx, photo_indices, prepared
+
+        def process(work: Tuple[int, List[int], Optional[PreparedRequest]]) -> bool:
+            # Returns False if cancelled while paused
+            item_idx, photo_indices, prepared = work
+            if not photo_indices:
+                raise FileNotFoundError("No photo files found for item")
+
+            task = self._ledger_task(item_idx, pending_by_item[item_idx])
+            if not self._call_when_available(
+                    lambda: self.process_item_photos(queue[item_idx], photo_indices, prepared, task=task),
+                    check_cancelled, on_pause):
+                return False
+            self._save(item_idx)
+            return True
+
+        with Prefetcher(prepare, list(pending_by_item), self.prefetch) as prefetcher:
+            for (item_idx, photo_indices, _), future in self.api_client.iter_concurrent(
+                    process, start(prefetcher), check_cancelled=check_cancelled):
+                pending = len(pending_by_item[item_idx])
+                item = queue[item_idx]
+                try:
+                    if not future.result():
+                        continue
+                    processed_count += pending
+                    for photo_idx in photo_indices:
+                        self._publish(PhotoFinished(item_idx, photo_idx))
+                    self._publish(ItemCompleted(item_idx))
+                except Exception as e:
+                    self.log(f"Error processing item {item.get('sku', item_idx + 1)}: {str(e)}")
+                    failed_count += pending
+                    for photo_idx in pending_by_item[item_idx]:
+                        self._publish(PhotoFailed(item_idx, photo_idx, str(e)))
+
+        return {
+            "total": total_photos,
+            "processed": processed_count,
+            "failed": failed_count,
+            "elapsed_time": time.time() - start_time
+        }
@@ -0,0 +1,310 @@
+"""
+SQLite storage backend for work queues.
+
+Large queues are slow to load and scan as a single JSON list. This module
+stores a queue in an SQLite database instead, including:
+- Items, photos and item specifics as separate tables
+- Indexes on processed/priced status for fast status queries
+- Per-item updates without rewriting the rest of the queue
+- Import from and export to the existing JSON queue format
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# File extensions that are opened as a queue store rather than JSON
+QUEUE_STORE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+
+
+def is_queue_store_path(file_path: str) -> bool:
+    """
+    Check whether a queue path refers to an SQLite queue store.
+
+    Args:
+        file_path: Path to the queue file
+
+    Returns:
+        True if the path has an SQLite extension
+    """
+    return os.path.splitext(file_path)[1].lower() in QUEUE_STORE_EXTENSIONS
+
+
+class QueueStore:
+    """
+    Work queue stored in an SQLite database.
+
+    Items keep their queue position, so exporting the store reproduces the
+    original JSON list. The store offers the same record/compact interface
+    as QueueJournal so processing code can persist single items to either.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) a queue store.
+
+        Args:
+            path: Path to the SQLite database
+        """
+        self.path = path
+        self.file_path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        """Create the queue tables and indexes if needed."""
+        # The journal mode persists in the file: new stores use WAL, and a store switched
+        # to a rollback journal for sharing over a network filesystem keeps it
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items'").fetchone():
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                id TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                sku TEXT,
+                title TEXT,
+                processed INTEGER NOT NULL DEFAULT 0,
+                priced INTEGER NOT NULL DEFAULT 0,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS photos (
+                item_id TEXT NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+                photo_index INTEGER NOT NULL,
+                path TEXT,
+                selected INTEGER NOT NULL DEFAULT 0,
+                processed INTEGER NOT NULL DEFAULT 0,
+                data TEXT NOT NULL,
+                PRIMARY KEY (item_id, photo_index)
+            );
+            CREATE TABLE IF NOT EXISTS item_specifics (
+                item_id TEXT NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+                name TEXT NOT NULL,
+                value TEXT,
+                PRIMARY KEY (item_id, name)
+            );
+            CREATE INDEX IF NOT EXISTS idx_items_position ON items(position);
+            CREATE INDEX IF NOT EXISTS idx_items_processed ON items(processed, position);
+            CREATE INDEX IF NOT EXISTS idx_items_priced ON items(priced, processed);
+            CREATE INDEX IF NOT EXISTS idx_photos_status ON photos(selected, processed);
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def _item_row(position: int, item: Dict[str, Any]) -> Tuple:
+        """Build the items table row for an item."""
+        data = {k: v for k, v in item.items() if k != "photos"}
+        if isinstance(item.get("item_specifics"), dict):
+            del data["item_specifics"]
+
+        return (
+            item["id"],
+            position,
+            item.get("sku", ""),
+            item.get("title") or "",
+            1 if item.get("processed", False) else 0,
+            1 if item.get("start_price") else 0,
+            json.dumps(data)
+        )
+
+    def _write_item(self, position: int, item: Dict[str, Any]) -> None:
+        """Insert or replace an item with its photos and item specifics (lock must be held)."""
+        if not item.get("id"):
+            raise ValueError(f"Item at position {position} has no id")
+
+        item_id = item["id"]
+        self.conn.execute("DELETE FROM photos WHERE item_id = ?", (item_id,))
+        self.conn.execute("DELETE FROM item_specifics WHERE item_id = ?", (item_id,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO items (id, position, sku, title, processed, priced, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._item_row(position, item)
+        )
+
+        selected = set(item.get("process_photos", []))
+        self.conn.executemany(
+            "INSERT INTO photos (item_id, photo_index, path, selected, processed, data) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (item_id, idx, photo.get("path", ""), 1 if idx in selected else 0,
+                 1 if photo.get("processed", False) else 0, json.dumps(photo))
+                for idx, photo in enumerate(item.get("photos", []))
+            ]
+        )
+
+        if isinstance(item.get("item_specifics"), dict):
+            self.conn.executemany(
+                "INSERT INTO item_specifics (item_id, name, value) VALUES (?, ?, ?)",
+                [(item_id, name, json.dumps(value)) for name, value in item["item_specifics"].items()]
+            )
+
+    def import_queue(self, queue: List[Dict[str, Any]]) -> None:
+        """
+        Replace the store contents with a queue.
+
+        Args:
+            queue: List of item dictionaries (items need an "id")
+        """
+        with self.lock:
+            try:
+                self.conn.execute("DELETE FROM items")
+                for position, item in enumerate(queue):
+                    self._write_item(position, item)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+        logger.info(f"Stored {len(queue)} items in {self.path}")
+
+    def save_item(self, position: int, item: Dict[str, Any]) -> None:
+        """
+        Insert or update a single item.
+
+        Args:
+            position: Position of the item in the queue
+            item: Item dictionary
+        """
+        with self.lock:
+            try:
+                self._write_item(position, item)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def record(self, queue: List[Dict[str, Any]], item_indices: Iterable[int]) -> None:
+        """
+        Persist changed items of a queue.
+
+        Args:
+            queue: Full queue the items belong to
+            item_indices: Indices of the changed items
+        """
+        with self.lock:
+            try:
+                for index in item_indices:
+                    if 0 <= index < len(queue):
+                        self._write_item(index, queue[index])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def compact(self, queue: List[Dict[str, Any]]) -> None:
+        """
+        Nothing to fold: item saves are written to the tables directly.
+
+        Args:
+            queue: Full queue (unused)
+        """
+
+    def _load_item(self, item_id: str, data: str) -> Dict[str, Any]:
+        """Rebuild an item dictionary from its rows (lock must be held)."""
+        item = json.loads(data)
+
+        item["photos"] = [
+            json.loads(row[0]) for row in self.conn.execute(
+                "SELECT data FROM photos WHERE item_id = ? ORDER BY photo_index", (item_id,)
+            )
+        ]
+
+        specifics = self.conn.execute(
+            "SELECT name, value FROM item_specifics WHERE item_id = ? ORDER BY rowid", (item_id,)
+        ).fetchall()
+        if specifics or "item_specifics" not in item:
+            item["item_specifics"] = {name: json.loads(value) for name, value in specifics}
+
+        return item
+
+    def iter_items(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the queue items in order without loading them all at once.
+
+        Yields:
+            Item dictionaries
+        """
+        position = -1
+        while True:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT id, position, data FROM items WHERE position > ? ORDER BY position LIMIT 1",
+                    (position,)
+                ).fetchone()
+                if row is None:
+                    return
+                item = self._load_item(row[0], row[2])
+
+            position = row[1]
+            yield item
+
+    def export_queue(self) -> List[Dict[str, Any]]:
+        """
+        Export the store as a queue list in the JSON queue format.
+
+        Returns:
+            List of item dictionaries
+        """
+        with self.lock:
+            return [
+                self._load_item(item_id, data)
+                for item_id, data in self.conn.execute("SELECT id, data FROM items ORDER BY position").fetchall()
+            ]
+
+    def get_item(self, position: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the item at a queue position.
+
+        Args:
+            position: Position of the item
+
+        Returns:
+            Item dictionary, or None if there is no item at that position
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT id, data FROM items WHERE position = ?", (position,)).fetchone()
+            return self._load_item(row[0], row[1]) if row else None
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """
+        Get queue status counts from the indexes.
+
+        Returns:
+            Dictionary with items, processed_items, priced_items, photos_to_process and processed_photos
+        """
+        with self.lock:
+            items, processed_items, priced_items = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(processed), 0), COALESCE(SUM(priced), 0) FROM items"
+            ).fetchone()
+            photos_to_process, processed_photos = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(processed), 0) FROM photos WHERE selected = 1"
+            ).fetchone()
+
+        return {
+            "items": items,
+            "processed_items": processed_items,
+            "priced_items": priced_items,
+            "photos_to_process": photos_to_process,
+            "processed_photos": processed_photos
+        }
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self) -> "QueueStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
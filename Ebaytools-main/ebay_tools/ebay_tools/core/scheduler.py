@@ -0,0 +1,342 @@
+"""
+Priority and deadline-aware scheduling of queue work.
+
+Photo processing and auto-pricing used to walk the queue in order, so a
+valuable item at the end of a long queue waited behind everything before it.
+This module provides:
+- Ranking items by explicit priority, tags, category, estimated value and age, with configurable weights
+- Deadlines: items due within the deadline horizon, or overdue, go first, earliest deadline first
+- Ordering photo work by rank while keeping each item's photos together
+- A work queue handing out items by rank while producers keep adding to it, so
+  pricing can follow photo work item by item instead of waiting for the whole batch
+"""
+
+import math
+import time
+import logging
+import threading
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Named levels accepted in an item's priority field; numbers are used as they are
+PRIORITY_LEVELS = {
+    "low": -1,
+    "normal": 0,
+    "high": 1,
+    "urgent": 2
+}
+
+
+@dataclass
+class SchedulerConfig:
+    """Weights and fields used to rank queue items."""
+    priority_field: str = "priority"  # Item field holding an explicit priority (a number or a PRIORITY_LEVELS name)
+    priority_weight: float = 10.0  # Rank per priority level
+    tag_weights: Dict[str, float] = field(default_factory=dict)  # Rank added by each of an item's "tags"
+    category_weights: Dict[str, float] = field(default_factory=dict)  # Rank by (part of) the item's category
+    value_fields: List[str] = field(default_factory=lambda: ["estimated_value", "start_price", "price"])
+    value_weight: float = 5.0  # Rank per tenfold increase of the item's value
+    age_weight: float = 1.0  # Rank per whole day since the item was created
+    deadline_field: str = "deadline"  # Item field holding an ISO date or time the item is due
+    tag_deadlines: Dict[str, str] = field(default_factory=dict)  # Deadlines of tagged items, e.g. a listing drop
+    deadline_horizon_hours: float = 24.0  # Items due sooner than this go before all others
+
+    @classmethod
+    def from_dict(cls, settings: Optional[Dict[str, Any]]) -> "SchedulerConfig":
+        """
+        Create a scheduler configuration from a settings dictionary.
+
+        Args:
+            settings: Dictionary of configuration fields; missing fields keep their defaults
+
+        Returns:
+            Scheduler configuration
+        """
+        defaults = cls()
+        settings = settings or {}
+        return cls(
+            priority_field=settings.get("priority_field", defaults.priority_field),
+            priority_weight=float(settings.get("priority_weight", defaults.priority_weight)),
+            tag_weights={str(k).lower(): float(v) for k, v in settings.get("tag_weights", {}).items()},
+            category_weights={str(k).lower(): float(v) for k, v in settings.get("category_weights", {}).items()},
+            value_fields=list(settings.get("value_fields", defaults.value_fields)),
+            value_weight=float(settings.get("value_weight", defaults.value_weight)),
+            age_weight=float(settings.get("age_weight", defaults.age_weight)),
+            deadline_field=settings.get("deadline_field", defaults.deadline_field),
+            tag_deadlines={str(k).lower(): v for k, v in settings.get("tag_deadlines", {}).items()},
+            deadline_horizon_hours=float(settings.get("deadline_horizon_hours", defaults.deadline_horizon_hours))
+        )
+
+
+def parse_deadline(value: Any) -> Optional[float]:
+    """
+    Parse a deadline into a Unix timestamp.
+
+    Args:
+        value: ISO date or date and time (local time unless it has an offset), or a Unix timestamp
+
+    Returns:
+        Timestamp, or None if the value is empty or not a deadline
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).strip()).timestamp()
+    except ValueError:
+        logger.warning(f"Ignoring deadline that is not an ISO date: {value}")
+        return None
+
+
+def _parse_number(value: Any) -> Optional[float]:
+    """Parse a number, allowing a leading currency sign and thousands separators."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip().lstrip("$").replace(",", ""))
+    except ValueError:
+        return None
+
+
+class WorkScheduler:
+    """
+    Ranks queue items and orders work on them.
+
+    An item's rank adds up its explicit priority, tags, category, value and
+    age, each multiplied by its configured weight. Items due within the
+    deadline horizon come first, earliest deadline first; the others follow
+    by rank. Items that tie keep their queue order.
+    """
+
+    def __init__(self, config: Optional[SchedulerConfig] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            config: Ranking configuration (defaults to SchedulerConfig())
+        """
+        self.config = config or SchedulerConfig()
+
+    def rank(self, item: Dict[str, Any], now: Optional[float] = None) -> float:
+        """
+        Compute an item's rank (higher goes first).
+
+        Args:
+            item: Item dictionary
+            now: Current Unix time (defaults to the current time)
+
+        Returns:
+            Rank of the item
+        """
+        config = self.config
+        now = time.time() if now is None else now
+        rank = 0.0
+
+        priority = item.get(config.priority_field)
+        if isinstance(priority, str):
+            priority = PRIORITY_LEVELS.get(priority.strip().lower(), _parse_number(priority))
+        if isinstance(priority, (int, float)):
+            rank += config.priority_weight * priority
+
+        for tag in self._tags(item):
+            rank += config.tag_weights.get(tag, 0.0)
+
+        category = str(item.get("category", "")).lower()
+        if category and config.category_weights:
+            matches = [weight for name, weight in config.category_weights.items() if name in category]
+            if matches:
+                rank += max(matches)
+
+        for value_field in config.value_fields:
+            value = _parse_number(item.get(value_field)) if item.get(value_field) else None
+            if value and value > 0:
+                rank += config.value_weight * math.log10(1 + value)
+                break
+
+        created = parse_deadline(item.get("created_at"))
+        if created is not None and created < now:
+            # Whole days, so items created the same day keep their queue order
+            rank += config.age_weight * int((now - created) // 86400)
+
+        return rank
+
+    def deadline(self, item: Dict[str, Any]) -> Optional[float]:
+        """
+        Get the earliest deadline of an item, from its deadline field or its tags.
+
+        Args:
+            item: Item dictionary
+
+        Returns:
+            Deadline as a Unix timestamp, or None if the item has none
+        """
+        deadlines = [parse_deadline(item.get(self.config.deadline_field))]
+        deadlines.extend(parse_deadline(self.config.tag_deadlines[tag])
+                         for tag in self._tags(item) if tag in self.config.tag_deadlines)
+        deadlines = [d for d in deadlines if d is not None]
+        return min(deadlines) if deadlines else None
+
+    @staticmethod
+    def _tags(item: Dict[str, Any]) -> List[str]:
+        """Get an item's tags, lower-cased; a single tag may be given as a string."""
+        tags = item.get("tags") or []
+        if isinstance(tags, str):
+            tags = [tags]
+        return [str(tag).strip().lower() for tag in tags]
+
+    def sort_key(self, item: Dict[str, Any], position: int, now: Optional[float] = None) -> Tuple:
+        """
+        Get the key ordering an item among the others (lower goes first).
+
+        Args:
+            item: Item dictionary
+            position: Position of the item in the queue, breaking ties
+            now: Current Unix time (defaults to the current time)
+
+        Returns:
+            Sort key of the item
+        """
+        now = time.time() if now is None else now
+        deadline = self.deadline(item)
+        if deadline is not None and deadline - now <= self.config.deadline_horizon_hours * 3600:
+            return (0, deadline, -self.rank(item, now), position)
+        return (1, 0.0, -self.rank(item, now), position)
+
+    def order_items(self, queue: List[Dict[str, Any]], indices: List[int]) -> List[int]:
+        """
+        Order items by schedule.
+
+        Args:
+            queue: List of item dictionaries
+            indices: Indices of the items to order
+
+        Returns:
+            Item indices, first to be worked on first
+        """
+        now = time.time()
+        keys = {idx: self.sort_key(queue[idx], idx, now) for idx in set(indices)}
+        return sorted(indices, key=keys.__getitem__)
+
+    def order_photos(self, queue: List[Dict[str, Any]],
+                     photos: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Order photo work by the schedule of its items.
+
+        Each item's photos stay together and in their original order, so a
+        high-priority item is completed before work on the next item starts.
+
+        Args:
+            queue: List of item dictionaries
+            photos: List of (item index, photo index) tuples
+
+        Returns:
+            The same tuples in schedule order
+        """
+        by_item = {}
+        for item_idx, photo_idx in photos:
+            by_item.setdefault(item_idx, []).append(photo_idx)
+
+        return [
+            (item_idx, photo_idx)
+            for item_idx in self.order_items(queue, list(by_item))
+            for photo_idx in by_item[item_idx]
+        ]
+
+    def item_key(self, queue: List[Dict[str, Any]]) -> Callable[[int], Tuple]:
+        """
+        Get a function returning the sort key of an item index, for priority queues.
+
+        Args:
+            queue: List of item dictionaries the indices refer to
+
+        Returns:
+            Function mapping an item index to its sort key
+        """
+        return lambda item_idx: self.sort_key(queue[item_idx], item_idx)
+
+
+class ScheduledWorkQueue:
+    """
+    Thread-safe queue handing out item indices in schedule order.
+
+    Producers add items while consumers take them, for work that follows
+    another stage as its items become ready. Each item is handed out once;
+    once the queue is closed, consumers get the remaining items and then an
+    empty batch.
+    """
+
+    def __init__(self, scheduler: Optional[WorkScheduler], queue: List[Dict[str, Any]]):
+        """
+        Initialize the work queue.
+
+        Args:
+            scheduler: Scheduler ordering the items (items are handed out in queue order if None)
+            queue: List of item dictionaries the indices refer to
+        """
+        self.scheduler = scheduler
+        self.queue = queue
+        self.condition = threading.Condition()
+        self.pending = {}
+        self.seen = set()
+        self.closed = False
+
+    def put(self, item_idx: int) -> bool:
+        """
+        Add an item to the queue.
+
+        Args:
+            item_idx: Index of the item
+
+        Returns:
+            True if the item was added, False if it was added before or the queue is closed
+        """
+        with self.condition:
+            if self.closed or item_idx in self.seen:
+                return False
+            self.seen.add(item_idx)
+            if self.scheduler:
+                self.pending[item_idx] = self.scheduler.sort_key(self.queue[item_idx], item_idx)
+            else:
+                self.pending[item_idx] = (item_idx,)
+            self.condition.notify_all()
+            return True
+
+    def take(self, limit: Optional[int] = None, timeout: Optional[float] = None) -> List[int]:
+        """
+        Take the first items in schedule order, waiting until there are any.
+
+        Args:
+            limit: Maximum number of items to take (takes all pending items if None)
+            timeout: Maximum number of seconds to wait (waits indefinitely if None)
+
+        Returns:
+            Item indices in schedule order; empty if the queue is closed and
+            drained, or the timeout expired first
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.pending or self.closed, timeout)
+            batch = sorted(self.pending, key=self.pending.__getitem__)[:limit]
+            for item_idx in batch:
+                del self.pending[item_idx]
+            return batch
+
+    @property
+    def total(self) -> int:
+        """Number of items added so far, including those already taken."""
+        with self.condition:
+            return len(self.seen)
+
+    def close(self) -> None:
+        """Stop accepting items; consumers drain the pending ones."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self) -> int:
+        with self.condition:
+            return len(self.pending)
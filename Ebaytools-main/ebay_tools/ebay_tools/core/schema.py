@@ -3,10 +3,14 @@ Schema definition for eBay listing data structure.
 This module provides consistent field names and data validation for the eBay listing tools.
 """
 
+import os
 import json
 from datetime import datetime
 import uuid
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Union, Any, Iterator, TextIO, Tuple
+
+from ebay_tools.core.journal import write_queue_atomic, iter_journaled_items, discard_journal
+from ebay_tools.core.queue_store import QueueStore, is_queue_store_path
 
 
 class EbayItemSchema:
@@ -71,6 +75,44 @@ class EbayItemSchema:
         "7000": "For parts"
     }
     
+    # JSON schema of a listing returned by the LLM in structured output mode
+    LISTING_JSON_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "title": {
+                "type": "string",
+                "description": "Concise, SEO-friendly eBay listing title, 80 characters max"
+            },
+            "description": {
+                "type": "string",
+                "description": "Comprehensive description combining all the information"
+            },
+            "category": {
+                "type": "string",
+                "description": "Suggested primary eBay category"
+            },
+            "condition": {
+                "type": "string",
+                "enum": list(CONDITION_MAP.values()),
+                "description": "eBay item condition"
+            },
+            "condition_notes": {
+                "type": "string",
+                "description": "Visible wear, defects or other condition details"
+            },
+            "item_specifics": {
+                "type": "object",
+                "additionalProperties": {"type": "string"},
+                "description": "Item specifics such as Brand, Model, Type, Size, Color, Material, "
+                               "MPN and Country/Region of Manufacture, where known"
+            }
+        },
+        "required": ["title", "description", "category", "condition", "condition_notes", "item_specifics"]
+    }
+    
+    # Longest title eBay accepts
+    MAX_TITLE_LENGTH = 80
+    
     @staticmethod
     def create_empty_item() -> Dict[str, Any]:
         """Create a new empty item with defaults for required fields."""
@@ -211,8 +253,9 @@ class EbayItemSchema:
                             if k not in item_specifics or not item_specifics[k]:
                                 item_specifics[k] = v
                 
-                # Try to extract from final_description if available
-                if "final_description" in result:
+                # Try to extract from final_description if available (structured
+                # results were parsed when they were received)
+                if "final_description" in result and not result.get("structured"):
                     description = result["final_description"]
                     # Extract key specifics that might not be in the structured data
                     for key in ["Brand", "Model", "MPN", "UPC", "EAN", "ISBN"]:
@@ -229,6 +272,181 @@ class EbayItemSchema:
         
         return item_specifics
     
+    @staticmethod
+    def parse_final_description(text: str) -> Dict[str, Any]:
+        """
+        Parse a final listing description returned by the LLM.
+        
+        The response is expected to have sections like "Title:", "Description:",
+        "Category:", "Condition:" and "Item specifics:".
+        
+        Args:
+            text: LLM response text
+            
+        Returns:
+            Dictionary with 'title', 'category', 'condition' (eBay condition code),
+            'conditionDescription' and 'item_specifics'. Missing values are empty.
+        """
+        parsed = {
+            "title": "",
+            "category": "",
+            "condition": "1000",  # Default to New
+            "conditionDescription": "",
+            "item_specifics": {}
+        }
+        
+        # Extract title
+        if "Title:" in text:
+            title_parts = text.split("Title:", 1)
+            if len(title_parts) > 1:
+                parsed["title"] = title_parts[1].strip().split("\n")[0].strip()
+        
+        # Extract item specifics
+        if "Item specifics:" in text or "Item Specifics:" in text:
+            # Find the item specifics section
+            spec_marker = "Item specifics:" if "Item specifics:" in text else "Item Specifics:"
+            spec_text = text.split(spec_marker, 1)[1]
+            
+            # Find the end of the section (next section heading or end of text)
+            end_markers = ["Description:", "Category:", "Condition:"]
+            end_pos = len(spec_text)
+            
+            for marker in end_markers:
+                marker_pos = spec_text.find(marker)
+                if marker_pos > 0 and marker_pos < end_pos:
+                    end_pos = marker_pos
+            
+            # Parse each line for "Key: Value" pairs
+            for line in spec_text[:end_pos].strip().split('\n'):
+                line = line.strip()
+                if not line or line.startswith('-') or ':' not in line:
+                    continue
+                
+                key, value = line.split(':', 1)
+                key = key.strip()
+                value = value.strip()
+                
+                # Skip bullet points or empty values
+                if key and value and not key.startswith('-'):
+                    parsed["item_specifics"][key] = value
+        
+        # Extract condition and map it to an eBay condition code
+        if "Condition:" in text:
+            condition_parts = text.split("Condition:", 1)
+            if len(condition_parts) > 1:
+                condition_text = condition_parts[1].strip().split('\n')[0].strip()
+                parsed["conditionDescription"] = condition_text
+                
+                for code, desc in EbayItemSchema.CONDITION_MAP.items():
+                    if desc.lower() in condition_text.lower():
+                        parsed["condition"] = code
+                        break
+        
+        # Extract category
+        if "Category:" in text:
+            category_parts = text.split("Category:", 1)
+            if len(category_parts) > 1:
+                parsed["category"] = category_parts[1].strip().split('\n')[0].strip()
+        
+        return parsed
+    
+    @staticmethod
+    def listing_json_schema(fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get the listing JSON schema, optionally restricted to some fields.
+        
+        Args:
+            fields: Names of the fields to include (defaults to all fields)
+            
+        Returns:
+            JSON schema dictionary
+        """
+        schema = EbayItemSchema.LISTING_JSON_SCHEMA
+        if fields is None:
+            return schema
+        return {
+            "type": "object",
+            "properties": {name: schema["properties"][name] for name in fields},
+            "required": list(fields)
+        }
+    
+    @staticmethod
+    def validate_listing_json(text: str, fields: Optional[List[str]] = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Parse and validate a listing returned by the LLM in structured output mode.
+        
+        Code fences and text around the JSON object are ignored. Each field is
+        validated separately, so a request for only the failing fields can be
+        made.
+        
+        Args:
+            text: LLM response text
+            fields: Names of the fields the response should contain (defaults to all fields)
+            
+        Returns:
+            Tuple of (valid field values, error message for each missing or invalid field)
+        """
+        fields = list(fields or EbayItemSchema.LISTING_JSON_SCHEMA["required"])
+        
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            data = json.loads(text[start:end + 1]) if start >= 0 and end > start else None
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            return {}, {name: "no JSON object in the response" for name in fields}
+        
+        values = {}
+        errors = {}
+        for name in fields:
+            value = data.get(name)
+            if value is None:
+                errors[name] = "missing"
+            elif name == "item_specifics":
+                if not isinstance(value, dict):
+                    errors[name] = "must be an object of name-value strings"
+                else:
+                    values[name] = {str(k).strip(): str(v).strip() for k, v in value.items()
+                                    if str(k).strip() and v not in (None, "") and str(v).strip()}
+            elif not isinstance(value, str):
+                errors[name] = "must be a string"
+            elif name in ("title", "description") and not value.strip():
+                errors[name] = "must not be empty"
+            elif name == "title" and len(value.strip()) > EbayItemSchema.MAX_TITLE_LENGTH:
+                errors[name] = f"longer than {EbayItemSchema.MAX_TITLE_LENGTH} characters"
+            elif name == "condition" and value.strip().lower() not in (
+                    desc.lower() for desc in EbayItemSchema.CONDITION_MAP.values()):
+                errors[name] = "must be one of: " + ", ".join(EbayItemSchema.CONDITION_MAP.values())
+            else:
+                values[name] = value.strip()
+        
+        return values, errors
+    
+    @staticmethod
+    def listing_fields_to_parsed(fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert structured listing fields to the format of parse_final_description.
+        
+        Args:
+            fields: Listing fields (see LISTING_JSON_SCHEMA), possibly incomplete
+            
+        Returns:
+            Dictionary with 'title', 'category', 'condition' (eBay condition code),
+            'conditionDescription', 'item_specifics' and 'description'
+        """
+        condition = fields.get("condition", "")
+        condition_code = next((code for code, desc in EbayItemSchema.CONDITION_MAP.items()
+                               if desc.lower() == condition.lower()), "1000")
+        
+        return {
+            "title": fields.get("title", ""),
+            "category": fields.get("category", ""),
+            "condition": condition_code,
+            "conditionDescription": fields.get("condition_notes") or condition,
+            "item_specifics": dict(fields.get("item_specifics", {})),
+            "description": fields.get("description", "")
+        }
+    
     @staticmethod
     def to_csv_row(item: Dict[str, Any], default_values: Dict[str, str] = None) -> Dict[str, str]:
         """
@@ -276,35 +494,160 @@ class EbayItemSchema:
         return row
 
 
+# Characters read at a time when streaming a queue file
+QUEUE_READ_CHUNK_SIZE = 64 * 1024
+
+
 def save_queue(queue: List[Dict[str, Any]], file_path: str) -> None:
     """
     Save a queue of items to a JSON file.
     
+    The file is replaced atomically and any journal of incremental changes
+    is discarded, since the full queue now contains them. Paths ending in
+    .sqlite, .sqlite3 or .db are written to an SQLite queue store.
+    
     Args:
         queue: List of item dictionaries
         file_path: Path to save the JSON file
     """
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(queue, f, indent=2)
+    if is_queue_store_path(file_path):
+        with QueueStore(file_path) as store:
+            store.import_queue(queue)
+        return
+    
+    write_queue_atomic(queue, file_path)
+    discard_journal(file_path)
+
+
+def iter_json_array(f: TextIO, chunk_size: int = QUEUE_READ_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Incrementally parse the elements of a top-level JSON array.
+    
+    Only the element being decoded and one read chunk are held in memory.
+    The array is checked as strictly as json.load would: elements must be
+    separated by exactly one comma and only whitespace may follow the
+    closing bracket.
+    
+    Args:
+        f: Text file positioned at the start of the JSON document
+        chunk_size: Number of characters to read at a time
+        
+    Yields:
+        Decoded array elements
+        
+    Raises:
+        ValueError: If the document is not a single JSON array
+        json.JSONDecodeError: If an element is not valid JSON
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    closed = False
+    expect_value = True
+    count = 0
+    
+    while True:
+        # Skip whitespace, reading more data as needed
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+        
+        if pos >= len(buffer):
+            if closed:
+                return
+            raise ValueError("Invalid queue format: unexpected end of file")
+        
+        char = buffer[pos]
+        if not started:
+            if char != "[":
+                raise ValueError("Invalid queue format: expected a JSON list")
+            started = True
+            pos += 1
+            continue
+        
+        if closed:
+            raise ValueError("Invalid queue format: unexpected data after the list")
+        if char == "]":
+            if expect_value and count:
+                raise ValueError("Invalid queue format: trailing comma in the list")
+            closed = True
+            pos += 1
+            continue
+        if not expect_value:
+            if char != ",":
+                raise ValueError("Invalid queue format: expected ',' or ']' after a list element")
+            expect_value = True
+            pos += 1
+            continue
+        if char == ",":
+            raise ValueError("Invalid queue format: missing list element before ','")
+        
+        # Decode the next element, growing the buffer until it is complete
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                # A number cut off by the chunk boundary decodes too early
+                if eof or (end < len(buffer) and buffer[end] in " \t\r\n,]"):
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            chunk = f.read(max(chunk_size, len(buffer) - pos))
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+        
+        yield value
+        pos = end
+        expect_value = False
+        count += 1
+
+
+def iter_queue(file_path: str, normalize: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the items of a queue file without loading the whole file.
+    
+    Changes journaled since the file was last written are applied. Paths
+    ending in .sqlite, .sqlite3 or .db are read from an SQLite queue store.
+    
+    Args:
+        file_path: Path to the JSON file
+        normalize: Whether to normalize each item with EbayItemSchema.normalize_item
+        
+    Yields:
+        Item dictionaries
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Queue file not found: {file_path}")
+    
+    if is_queue_store_path(file_path):
+        with QueueStore(file_path) as store:
+            for item in store.iter_items():
+                yield EbayItemSchema.normalize_item(item) if normalize else item
+        return
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        # Recover incremental saves that were not compacted yet
+        for item in iter_journaled_items(iter_json_array(f), file_path):
+            yield EbayItemSchema.normalize_item(item) if normalize else item
 
 
 def load_queue(file_path: str) -> List[Dict[str, Any]]:
     """
     Load a queue of items from a JSON file.
     
+    Items are parsed and normalized one at a time (see iter_queue), so peak
+    memory stays close to the size of the resulting list.
+    
     Args:
         file_path: Path to the JSON file
         
     Returns:
         List of item dictionaries
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        queue = json.load(f)
-    
-    # Validate and normalize all items
-    normalized_queue = []
-    for item in queue:
-        normalized_item = EbayItemSchema.normalize_item(item)
-        normalized_queue.append(normalized_item)
-    
-    return normalized_queue
\ No newline at end of file
+    return list(iter_queue(file_path))
\ No newline at end of file
@@ -3,7 +3,10 @@ background_utils.py - Background processing utilities for eBay listing tools
 
 This module provides tools for running operations in the background including:
 - Thread management for long-running tasks
-- Progress reporting
+- Progress reporting, coalesced to the latest update per poll
+- Pause reporting, for tasks that wait out an unavailable service
+- Typed progress events, dispatched to UI subscribers at a fixed frame rate
+- A shared work scheduler, so every task orders its work by the same item priorities
 - Cancellation support
 - Safe UI updates from background threads
 """
@@ -11,11 +14,15 @@ This module provides tools for running operations in the background including:
 import threading
 import queue
 import time
+import inspect
 import logging
 import traceback
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import tkinter as tk
 
+from ebay_tools.utils.events import EventBus
+from ebay_tools.core.scheduler import WorkScheduler
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -34,7 +41,10 @@ class BackgroundTask:
                 kwargs: Dict[str, Any] = None,
                 on_progress: Optional[Callable[[int, int, str], None]] = None,
                 on_complete: Optional[Callable[[Any], None]] = None,
-                on_error: Optional[Callable[[Exception], None]] = None):
+                on_error: Optional[Callable[[Exception], None]] = None,
+                on_paused: Optional[Callable[[bool, str], None]] = None,
+                events: Optional[EventBus] = None,
+                scheduler: Optional[WorkScheduler] = None):
         """
         Initialize a background task.
         
@@ -49,6 +59,11 @@ class BackgroundTask:
                          Receives the return value of the target function
             on_error: Optional callback for error handling
                       Receives the exception that was raised
+            on_paused: Optional callback for pausing and resuming
+                       Receives (paused, message)
+            events: Optional event bus the target function publishes to
+                    (a new bus is created if not given)
+            scheduler: Optional work scheduler passed to target functions that accept one
         """
         self.name = name
         self.target_function = target_function
@@ -57,10 +72,15 @@ class BackgroundTask:
         self.on_progress = on_progress
         self.on_complete = on_complete
         self.on_error = on_error
+        self.on_paused = on_paused
+        self.events = events or EventBus()
+        self.scheduler = scheduler
         
         # Status tracking
         self.is_running = False
         self.is_cancelled = False
+        self.is_paused = False
+        self.pause_message = ""
         self.progress_current = 0
         self.progress_total = 0
         self.progress_message = ""
@@ -80,6 +100,8 @@ class BackgroundTask:
         # Reset status
         self.is_running = True
         self.is_cancelled = False
+        self.is_paused = False
+        self.pause_message = ""
         self.progress_current = 0
         self.progress_total = 0
         self.progress_message = "Starting..."
@@ -105,6 +127,19 @@ class BackgroundTask:
             # Add a cancellation check function to the kwargs
             self.kwargs['check_cancelled'] = self.check_cancelled
             
+            # Add a pause reporting function for targets that accept one
+            parameters = inspect.signature(self.target_function).parameters
+            if 'report_paused' in parameters:
+                self.kwargs['report_paused'] = self.report_paused
+            
+            # Add an event publishing function for targets that accept one
+            if 'publish_event' in parameters:
+                self.kwargs['publish_event'] = self.events.publish
+            
+            # Add the work scheduler for targets that accept one
+            if 'scheduler' in parameters:
+                self.kwargs['scheduler'] = self.scheduler
+            
             # Run the function
             self.result = self.target_function(*self.args, **self.kwargs)
             
@@ -125,6 +160,7 @@ class BackgroundTask:
         finally:
             # Mark as not running
             self.is_running = False
+            self.is_paused = False
     
     def report_progress(self, current: int, total: int, message: str = ""):
         """
@@ -145,6 +181,21 @@ class BackgroundTask:
         # Put progress message in the queue
         self.queue.put(('progress', (current, total, message)))
     
+    def report_paused(self, paused: bool, message: str = ""):
+        """
+        Report that the task paused or resumed from the background thread.
+        
+        Args:
+            paused: True when the task pauses, False when it resumes
+            message: Optional reason or status message
+        """
+        # Update status
+        self.is_paused = paused
+        self.pause_message = message if paused else ""
+        
+        # Put pause message in the queue
+        self.queue.put(('paused', (paused, message)))
+    
     def check_cancelled(self) -> bool:
         """
         Check if the task has been cancelled.
@@ -175,22 +226,39 @@ class BackgroundTask:
         Process messages from the background thread.
         
         This function should be called periodically from the main thread,
-        typically using a Tkinter after() call.
+        typically using a Tkinter after() call. Only the latest of several
+        queued progress updates is reported, and published events are
+        dispatched when a frame of the event bus is due.
         
         Returns:
             True if the task is still running, False otherwise
         """
+        progress = None
+        
         # Process all available messages
         try:
             while True:
                 # Get a message without blocking
                 message_type, data = self.queue.get_nowait()
                 
-                # Handle the message
+                # Hold progress back until the next message of another type
                 if message_type == 'progress':
-                    current, total, message = data
-                    if self.on_progress:
-                        self.on_progress(current, total, message)
+                    progress = data
+                    self.queue.task_done()
+                    continue
+                if progress:
+                    self._report_progress_update(progress)
+                    progress = None
+                
+                # Deliver the task's last events before it completes
+                if message_type in ('complete', 'error'):
+                    self.events.dispatch(force=True)
+                
+                # Handle the message
+                if message_type == 'paused':
+                    paused, message = data
+                    if self.on_paused:
+                        self.on_paused(paused, message)
                 
                 elif message_type == 'complete':
                     if self.on_complete:
@@ -207,9 +275,19 @@ class BackgroundTask:
             # No more messages
             pass
         
+        if progress:
+            self._report_progress_update(progress)
+        self.events.dispatch()
+        
         # Return True if the task is still running
         return self.is_running
     
+    def _report_progress_update(self, progress: Tuple[int, int, str]):
+        """Pass a progress update to the progress callback."""
+        current, total, message = progress
+        if self.on_progress:
+            self.on_progress(current, total, message)
+    
     def wait(self, timeout: Optional[float] = None) -> bool:
         """
         Wait for the task to complete.
@@ -237,19 +315,23 @@ class BackgroundTaskManager:
     Manager for multiple background tasks.
     
     This utility makes it easy to manage multiple background tasks
-    from a Tkinter application, handling UI updates safely.
+    from a Tkinter application, handling UI updates safely. Tasks started
+    through the manager share its work scheduler, so photo processing and
+    pricing running side by side pick items in the same priority order.
     """
     
-    def __init__(self, root: tk.Tk, poll_interval: int = 100):
+    def __init__(self, root: tk.Tk, poll_interval: int = 100, scheduler: Optional[WorkScheduler] = None):
         """
         Initialize the task manager.
         
         Args:
             root: Tkinter root widget
             poll_interval: Polling interval in milliseconds
+            scheduler: Optional work scheduler passed to the tasks' target functions
         """
         self.root = root
         self.poll_interval = poll_interval
+        self.scheduler = scheduler
         self.tasks = {}
         self.polling_active = False
     
@@ -269,6 +351,10 @@ class BackgroundTaskManager:
         # Store the task
         self.tasks[task_id] = task
         
+        # Tasks without a scheduler of their own use the manager's
+        if task.scheduler is None:
+            task.scheduler = self.scheduler
+        
         # Start the task
         task.start()
         
@@ -284,7 +370,9 @@ class BackgroundTaskManager:
                             kwargs: Dict[str, Any] = None,
                             on_progress: Optional[Callable[[int, int, str], None]] = None,
                             on_complete: Optional[Callable[[Any], None]] = None,
-                            on_error: Optional[Callable[[Exception], None]] = None) -> str:
+                            on_error: Optional[Callable[[Exception], None]] = None,
+                            on_paused: Optional[Callable[[bool, str], None]] = None,
+                            events: Optional[EventBus] = None) -> str:
         """
         Create and start a background task.
         
@@ -296,6 +384,8 @@ class BackgroundTaskManager:
             on_progress: Optional callback for progress updates
             on_complete: Optional callback for task completion
             on_error: Optional callback for error handling
+            on_paused: Optional callback for pausing and resuming
+            events: Optional event bus the target function publishes to
             
         Returns:
             Task ID
@@ -308,7 +398,9 @@ class BackgroundTaskManager:
             kwargs=kwargs,
             on_progress=on_progress,
             on_complete=on_complete,
-            on_error=on_error
+            on_error=on_error,
+            on_paused=on_paused,
+            events=events
         )
         
         # Start and return the ID
@@ -0,0 +1,355 @@
+"""
+Local stand-in for the provider batch APIs.
+
+Implements enough of the Anthropic Message Batches and OpenAI Batch APIs
+to exercise batch processing without a provider account:
+- Anthropic: creating message batches, retrieving them and their results
+- OpenAI: file upload and download, creating and retrieving batches
+- Batches finish after a configurable delay with generated responses
+- Optional failure of every Nth request, to exercise error handling
+- Immediate answers on the regular endpoints, for final descriptions
+
+Usage:
+    python -m ebay_tools.utils.batch_server --port 8765 --delay 5
+
+Then use http://127.0.0.1:8765/anthropic/v1/messages or
+http://127.0.0.1:8765/openai/v1/chat/completions as the API URL.
+"""
+
+import re
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+import email.parser
+import email.policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def default_response(params: Dict[str, Any]) -> str:
+    """
+    Generate a response text for a batch request.
+
+    Args:
+        params: Request payload
+
+    Returns:
+        Response text quoting the start of the prompt
+    """
+    prompt = ""
+    for message in params.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, str):
+            prompt = content
+        else:
+            prompt = next((part.get("text", "") for part in content if part.get("type") == "text"), "")
+    return f"Stand-in response to: {prompt[:60]}"
+
+
+class BatchStandInServer:
+    """
+    In-memory batch API server running in a background thread.
+
+    Batches report "in progress" until delay seconds after submission, then
+    "ended"/"completed" with a response for each request.
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 delay: float = 5.0,
+                 error_every: int = 0,
+                 respond: Optional[Callable[[Dict[str, Any]], str]] = None):
+        """
+        Initialize the server.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on (0 picks a free port)
+            delay: Seconds until a submitted batch has finished
+            error_every: Fail every Nth request of a batch (0 never fails)
+            respond: Function returning the response text for a request payload
+        """
+        self.delay = delay
+        self.error_every = error_every
+        self.respond = respond or default_response
+        self.files = {}
+        self.batches = {}
+        self.lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "BatchStandInServer":
+        """Start serving in a background thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="BatchStandInServer")
+        self.thread.start()
+        logger.info(f"Batch stand-in server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # Batch bookkeeping
+
+    def _create_batch(self, provider: str, requests: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Store a new batch."""
+        prefix = "msgbatch" if provider == "anthropic" else "batch"
+        batch = {
+            "id": f"{prefix}_{uuid.uuid4().hex[:24]}",
+            "provider": provider,
+            "created": time.time(),
+            "requests": requests,
+            "results": None
+        }
+        with self.lock:
+            self.batches[batch["id"]] = batch
+        return batch
+
+    def _finished(self, batch: Dict[str, Any]) -> bool:
+        """Check whether a batch has finished, generating its results once it has."""
+        if time.time() - batch["created"] < self.delay:
+            return False
+        with self.lock:
+            if batch["results"] is None:
+                batch["results"] = [
+                    (custom_id, None if self.error_every and (index + 1) % self.error_every == 0
+                     else self.respond(params))
+                    for index, (custom_id, params) in enumerate(batch["requests"])
+                ]
+        return True
+
+    # Anthropic Message Batches
+
+    def anthropic_batch(self, batch: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+        """Describe a batch the way the Message Batches API does."""
+        finished = self._finished(batch)
+        errored = sum(1 for _, text in batch["results"] or [] if text is None)
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if finished else "in_progress",
+            "request_counts": {
+                "processing": 0 if finished else len(batch["requests"]),
+                "succeeded": len(batch["requests"]) - errored if finished else 0,
+                "errored": errored,
+                "canceled": 0,
+                "expired": 0
+            },
+            "results_url": f"{base_url}/{batch['id']}/results" if finished else None
+        }
+
+    def anthropic_results(self, batch: Dict[str, Any]) -> str:
+        """Build the JSONL results of a finished batch."""
+        lines = []
+        for custom_id, text in batch["results"]:
+            if text is None:
+                result = {"type": "errored", "error": {"type": "error", "error": {
+                    "type": "invalid_request_error", "message": "Stand-in failure"}}}
+            else:
+                result = {"type": "succeeded", "message": {
+                    "id": f"msg_{uuid.uuid4().hex[:24]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn"
+                }}
+            lines.append(json.dumps({"custom_id": custom_id, "result": result}))
+        return "\n".join(lines) + "\n"
+
+    # OpenAI Batch API
+
+    def openai_batch(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        """Describe a batch the way the OpenAI Batch API does, writing its output files once finished."""
+        data = {
+            "id": batch["id"],
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "status": "in_progress",
+            "request_counts": {"total": len(batch["requests"]), "completed": 0, "failed": 0},
+            "output_file_id": None,
+            "error_file_id": None
+        }
+        if not self._finished(batch):
+            return data
+
+        output, errors = [], []
+        for custom_id, text in batch["results"]:
+            line = {"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": custom_id, "error": None}
+            if text is None:
+                line["response"] = {"status_code": 400, "body": {"error": {"message": "Stand-in failure"}}}
+                errors.append(json.dumps(line))
+            else:
+                line["response"] = {"status_code": 200, "body": {
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}]
+                }}
+                output.append(json.dumps(line))
+
+        with self.lock:
+            if "output_file_id" not in batch:
+                batch["output_file_id"] = self._store_file("\n".join(output) + "\n") if output else None
+                batch["error_file_id"] = self._store_file("\n".join(errors) + "\n") if errors else None
+
+        data.update({
+            "status": "completed",
+            "request_counts": {"total": len(batch["requests"]), "completed": len(output), "failed": len(errors)},
+            "output_file_id": batch["output_file_id"],
+            "error_file_id": batch["error_file_id"]
+        })
+        return data
+
+    def _store_file(self, content: str) -> str:
+        """Store a file (lock must be held)."""
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        self.files[file_id] = content.encode("utf-8")
+        return file_id
+
+    def store_upload(self, content_type: str, body: bytes) -> str:
+        """Store the file of a multipart upload."""
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+        )
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                with self.lock:
+                    return self._store_file(part.get_payload(decode=True).decode("utf-8"))
+        raise ValueError("No file in upload")
+
+    # HTTP handling
+
+    def _make_handler(self):
+        """Create the request handler class bound to this server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send(self, status: int, body: Any, content_type: str = "application/json") -> None:
+                data = body if isinstance(body, bytes) else (
+                    body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _authorized(self) -> bool:
+                if self.headers.get("x-api-key") or self.headers.get("Authorization"):
+                    return True
+                self._send(401, {"error": {"type": "authentication_error", "message": "Missing API key"}})
+                return False
+
+            def _read_body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def _base_url(self, path: str) -> str:
+                return f"http://{self.headers.get('Host')}{path}"
+
+            def do_POST(self):
+                body = self._read_body()
+                if not self._authorized():
+                    return
+                path = self.path.split("?")[0]
+
+                if path.endswith("/messages/batches"):
+                    requests = [(r["custom_id"], r["params"]) for r in json.loads(body)["requests"]]
+                    batch = server._create_batch("anthropic", requests)
+                    self._send(200, server.anthropic_batch(batch, self._base_url(path)))
+                elif path.endswith("/files"):
+                    file_id = server.store_upload(self.headers.get("Content-Type", ""), body)
+                    self._send(200, {"id": file_id, "object": "file", "purpose": "batch"})
+                elif path.endswith("/batches"):
+                    data = json.loads(body)
+                    content = server.files.get(data.get("input_file_id"))
+                    if content is None:
+                        self._send(404, {"error": {"message": "Input file not found"}})
+                        return
+                    requests = [(line["custom_id"], line["body"])
+                                for line in map(json.loads, content.decode("utf-8").splitlines()) if line]
+                    self._send(200, server.openai_batch(server._create_batch("openai", requests)))
+                elif path.endswith("/messages"):
+                    self._send(200, {"type": "message", "role": "assistant", "content": [
+                        {"type": "text", "text": server.respond(json.loads(body))}]})
+                elif path.endswith("/chat/completions"):
+                    self._send(200, {"object": "chat.completion", "choices": [{"index": 0, "message": {
+                        "role": "assistant", "content": server.respond(json.loads(body))}, "finish_reason": "stop"}]})
+                else:
+                    self._send(404, {"error": {"message": f"Unknown endpoint {path}"}})
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                path = self.path.split("?")[0]
+
+                match = re.search(r"/messages/batches/([\w-]+)(/results)?$", path)
+                if match:
+                    batch = server.batches.get(match.group(1))
+                    if batch is None:
+                        self._send(404, {"error": {"message": "Batch not found"}})
+                    elif match.group(2):
+                        if server._finished(batch):
+                            self._send(200, server.anthropic_results(batch), "application/binary")
+                        else:
+                            self._send(400, {"error": {"message": "Batch has not ended"}})
+                    else:
+                        self._send(200, server.anthropic_batch(batch, self._base_url(path.rsplit("/", 1)[0])))
+                    return
+
+                match = re.search(r"/files/([\w-]+)/content$", path)
+                if match:
+                    content = server.files.get(match.group(1))
+                    if content is None:
+                        self._send(404, {"error": {"message": "File not found"}})
+                    else:
+                        self._send(200, content, "application/octet-stream")
+                    return
+
+                match = re.search(r"/batches/([\w-]+)$", path)
+                if match and match.group(1) in server.batches:
+                    self._send(200, server.openai_batch(server.batches[match.group(1)]))
+                else:
+                    self._send(404, {"error": {"message": f"Unknown endpoint {path}"}})
+
+        return Handler
+
+
+def main() -> None:
+    """Run the stand-in server until interrupted."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Anthropic and OpenAI batch APIs")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--delay", type=float, default=5.0, help="Seconds until a batch has finished (default: 5)")
+    parser.add_argument("--error-every", type=int, default=0, help="Fail every Nth request of a batch")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    server = BatchStandInServer(args.host, args.port, delay=args.delay, error_every=args.error_every).start()
+    print(f"Anthropic API URL: {server.url}/anthropic/v1/messages")
+    print(f"OpenAI API URL:    {server.url}/openai/v1/chat/completions")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+events.py - Progress event bus for eBay listing tools
+
+This module decouples background work from UI updates, without any UI dependencies:
+- Typed events for photos and items, published from worker threads
+- Subscribers called from the thread that dispatches (the UI thread), never from workers
+- Coalescing: between two dispatches only the latest event per key is delivered
+- Dispatching throttled to a fixed frame rate, however fast events are published
+"""
+
+import time
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Default number of dispatches per second
+DEFAULT_FRAME_RATE = 10.0
+
+
+@dataclass(frozen=True)
+class Event:
+    """Base class of all bus events."""
+
+    def coalesce_key(self) -> Hashable:
+        """Key of the event; a newer event with the same key replaces an undelivered one."""
+        return type(self)
+
+
+@dataclass(frozen=True)
+class PhotoStarted(Event):
+    """A request for a photo (or, in item mode, an item's first photo) was started."""
+    item_index: int
+    photo_index: int
+
+
+@dataclass(frozen=True)
+class PhotoFinished(Event):
+    """A photo was processed."""
+    item_index: int
+    photo_index: int
+
+    def coalesce_key(self) -> Hashable:
+        return type(self), self.item_index, self.photo_index
+
+
+@dataclass(frozen=True)
+class PhotoFailed(Event):
+    """Processing a photo failed."""
+    item_index: int
+    photo_index: int
+    error: str
+
+    def coalesce_key(self) -> Hashable:
+        return type(self), self.item_index, self.photo_index
+
+
+@dataclass(frozen=True)
+class ItemCompleted(Event):
+    """All selected photos of an item were processed and the item was completed."""
+    item_index: int
+
+    def coalesce_key(self) -> Hashable:
+        return type(self), self.item_index
+
+
+@dataclass(frozen=True)
+class ResponseStreamed(Event):
+    """Text of a response streaming in; only the latest text is delivered."""
+    stage: str
+    text: str
+
+
+class EventBus:
+    """
+    Thread-safe event bus with coalescing and a fixed dispatch rate.
+
+    Workers call publish() from any thread. The UI calls dispatch() from its
+    own thread, typically from a periodic timer; events published since the
+    last dispatch are delivered to the subscribers in publishing order, with
+    only the latest event per coalesce key.
+    """
+
+    def __init__(self, frame_rate: float = DEFAULT_FRAME_RATE):
+        """
+        Initialize the event bus.
+
+        Args:
+            frame_rate: Maximum number of dispatches per second (0 dispatches on every call)
+        """
+        self.min_interval = 1.0 / frame_rate if frame_rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()
+        self.subscribers = {}
+        self._next_token = 0
+        self.last_dispatch = 0.0
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, callback: Callable[[Event], None],
+                  event_types: Optional[Tuple[Type[Event], ...]] = None) -> int:
+        """
+        Subscribe to events.
+
+        Args:
+            callback: Function called with each delivered event
+            event_types: Event classes to receive (defaults to all events)
+
+        Returns:
+            Subscription token for unsubscribe()
+        """
+        with self.lock:
+            self._next_token += 1
+            self.subscribers[self._next_token] = (callback, event_types)
+            return self._next_token
+
+    def unsubscribe(self, token: int) -> None:
+        """Remove a subscription."""
+        with self.lock:
+            self.subscribers.pop(token, None)
+
+    def publish(self, event: Event) -> None:
+        """
+        Publish an event (safe to call from any thread).
+
+        Args:
+            event: Event to deliver on the next dispatch
+        """
+        key = event.coalesce_key()
+        with self.lock:
+            # A replaced event moves to the end, keeping delivery in publishing order
+            self.pending.pop(key, None)
+            self.pending[key] = event
+            self.published += 1
+
+    def dispatch(self, force: bool = False) -> int:
+        """
+        Deliver the pending events if a frame is due.
+
+        Args:
+            force: Deliver even if the last dispatch was less than a frame ago
+
+        Returns:
+            Number of events delivered
+        """
+        now = time.monotonic()
+        with self.lock:
+            if not self.pending or (not force and now - self.last_dispatch < self.min_interval):
+                return 0
+            events = list(self.pending.values())
+            self.pending.clear()
+            subscribers = list(self.subscribers.values())
+            self.last_dispatch = now
+            self.delivered += len(events)
+
+        for event in events:
+            for callback, event_types in subscribers:
+                if event_types and not isinstance(event, event_types):
+                    continue
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error(f"Error in event subscriber for {type(event).__name__}: {str(e)}")
+        return len(events)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get event statistics.
+
+        Returns:
+            Dictionary with published, delivered and coalesced event counts
+        """
+        with self.lock:
+            pending = len(self.pending)
+            return {
+                "published": self.published,
+                "delivered": self.delivered,
+                "coalesced": self.published - self.delivered - pending
+            }
@@ -13,6 +13,9 @@ import logging
 import traceback
 from typing import Dict, List, Any, Optional, Union, Callable
 
+from ebay_tools.core.journal import discard_journal
+from ebay_tools.core.schema import iter_queue
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -114,16 +117,13 @@ def load_queue(file_path: str, validation_func: Optional[Callable] = None) -> Li
         raise FileNotFoundError(f"Queue file not found: {file_path}")
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            queue = json.load(f)
-        
-        if not isinstance(queue, list):
-            raise ValueError(f"Invalid queue format: expected list, got {type(queue)}")
+        # Items are parsed one at a time and journaled changes are applied
+        items = iter_queue(file_path, normalize=False)
         
         # Apply validation/normalization if provided
         if validation_func:
             processed_queue = []
-            for i, item in enumerate(queue):
+            for i, item in enumerate(items):
                 try:
                     processed_item = validation_func(item)
                     processed_queue.append(processed_item)
@@ -132,7 +132,7 @@ def load_queue(file_path: str, validation_func: Optional[Callable] = None) -> Li
                     processed_queue.append(item)
             return processed_queue
         
-        return queue
+        return list(items)
         
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON format in queue file {file_path}: {str(e)}")
@@ -165,7 +165,12 @@ def save_queue(queue: List[Dict[str, Any]], file_path: str,
         except Exception as e:
             logger.warning(f"Failed to create backup: {str(e)}")
     
-    return safe_save_json(queue, file_path)
+    if not safe_save_json(queue, file_path):
+        return False
+    
+    # The full save supersedes any journaled changes
+    discard_journal(file_path)
+    return True
 
 def get_unique_filename(base_path: str, extension: str = "") -> str:
     """
@@ -13,18 +13,34 @@ This module provides standardized functions for image operations including:
 - Format conversion
 """
 
+from __future__ import annotations
+
 import os
 import logging
 import io
 import base64
-from typing import Tuple, Optional, Any, Dict, List, Callable, Union
-import tkinter as tk
-from tkinter import ttk
-from PIL import Image, ImageTk, ExifTags, ImageEnhance, ImageDraw, ImageFont, UnidentifiedImageError
+from typing import Tuple, Optional, Any, Dict, List, Callable, Union, BinaryIO
+from PIL import Image, ExifTags, ImageEnhance, ImageDraw, ImageFont, UnidentifiedImageError
+
+# Tkinter is only needed for display helpers, so headless tools can still import this module
+try:
+    import tkinter as tk
+    from tkinter import ttk
+    from PIL import ImageTk
+except ImportError:
+    tk = ttk = ImageTk = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Media types for the formats images can be re-encoded to before upload
+IMAGE_MEDIA_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+    'GIF': 'image/gif'
+}
+
 def open_image_with_orientation(path: str) -> Image.Image:
     """
     Open an image and rotate it according to EXIF orientation tag.
@@ -414,44 +430,94 @@ def convert_image_format(image: Image.Image, format: str) -> Image.Image:
     
     return converted
 
-def save_image_with_quality(image: Image.Image, path: str, quality: int = 90, 
-                           optimize: bool = True) -> bool:
+def save_image_with_quality(image: Image.Image, path: Union[str, BinaryIO], quality: int = 90, 
+                           optimize: bool = True, format: Optional[str] = None) -> bool:
     """
     Save an image with specific quality settings.
     
     Args:
         image: PIL Image object
-        path: Path to save the image
-        quality: JPEG quality (0-100, higher is better)
+        path: Path to save the image, or a binary file object (e.g. io.BytesIO)
+        quality: JPEG/WebP quality (0-100, higher is better)
         optimize: Whether to optimize the image
+        format: Image format (e.g. 'JPEG', 'WEBP'); required when saving to a file object
         
     Returns:
         True on success, False on failure
     """
     try:
-        # Get the file extension
-        _, ext = os.path.splitext(path)
-        ext = ext.lower()
-        
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if isinstance(path, str):
+            # Get the file extension
+            _, ext = os.path.splitext(path)
+            ext = ext.lower()
+            
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        else:
+            format = (format or 'JPEG').upper()
+            ext = '.jpg' if format == 'JPEG' else f".{format.lower()}"
         
         # For JPEG/JPG images, use quality parameter
         if ext in ['.jpg', '.jpeg']:
-            image.save(path, quality=quality, optimize=optimize)
+            image.save(path, format=format, quality=quality, optimize=optimize)
+        elif ext == '.webp':
+            image.save(path, format=format, quality=quality)
         elif ext == '.png':
             # For PNG, optimize and set compression level
-            image.save(path, optimize=optimize, compress_level=9)
+            image.save(path, format=format, optimize=optimize, compress_level=9)
         else:
             # For other formats, just save normally
-            image.save(path)
+            image.save(path, format=format)
         
-        logger.info(f"Saved image to {path}")
+        if isinstance(path, str):
+            logger.info(f"Saved image to {path}")
         return True
     except Exception as e:
         logger.error(f"Error saving image to {path}: {str(e)}")
         return False
 
+def prepare_image_for_upload(path: str, max_edge: int = 1568, format: str = 'JPEG',
+                             quality: int = 85) -> Tuple[bytes, str]:
+    """
+    Prepare an image for upload to an LLM API.
+    
+    Applies the EXIF orientation, caps the long edge and re-encodes the image
+    in memory, which keeps full-resolution phone photos from dominating
+    request upload time.
+    
+    Args:
+        path: Path to the image file
+        max_edge: Maximum length of the longest side in pixels (0 keeps the original size)
+        format: Output format ('JPEG' or 'WEBP')
+        quality: Output quality (0-100, higher is better)
+        
+    Returns:
+        Tuple of (encoded image bytes, media type)
+        
+    Raises:
+        FileNotFoundError: If the image file doesn't exist
+        IOError: If the image can't be read or encoded
+    """
+    format = format.upper()
+    image = open_image_with_orientation(path)
+    
+    # Cap the long edge, preserving aspect ratio
+    if max_edge and max(image.size) > max_edge:
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    
+    # JPEG has no alpha channel or palette
+    if format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    
+    buffer = io.BytesIO()
+    if not save_image_with_quality(image, buffer, quality=quality, format=format):
+        raise IOError(f"Error encoding image: {path}")
+    
+    data = buffer.getvalue()
+    logger.debug(f"Prepared {os.path.basename(path)} for upload: {image.size[0]}x{image.size[1]} {format}, "
+                 f"{format_file_size(len(data))}")
+    return data, IMAGE_MEDIA_TYPES.get(format, 'application/octet-stream')
+
 def get_exif_data(image: Union[Image.Image, str]) -> Dict[str, Any]:
     """
     Extract all EXIF data from an image.
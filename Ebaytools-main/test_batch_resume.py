@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that batch processing resumes interrupted runs
+
+Runs BatchProcessor against the local batch stand-in server, stops it while
+the batch job is still running, then resumes from the .batch.json state file
+and checks that every photo is reconciled without submitting it twice.
+"""
+import os
+import sys
+import shutil
+import tempfile
+
+# Add the ebay_tools to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ebay_tools'))
+
+from PIL import Image
+
+from ebay_tools.core.api import LLMApiClient, ApiConfig
+from ebay_tools.core.batch_api import BatchProcessor, get_batch_state_path
+from ebay_tools.core.processing import find_unprocessed_photos
+from ebay_tools.utils.batch_server import BatchStandInServer
+
+API_PATHS = {
+    "anthropic": "/anthropic/v1/messages",
+    "openai": "/openai/v1/chat/completions"
+}
+
+
+def make_queue(work_dir, items=2, photos=2):
+    """Create a small queue with distinct photos on disk"""
+    queue = []
+    for item_idx in range(items):
+        item = {"id": f"item-{item_idx}", "sku": f"SKU{item_idx}", "photos": [],
+                "process_photos": list(range(photos))}
+        for photo_idx in range(photos):
+            path = os.path.join(work_dir, f"item{item_idx}_photo{photo_idx}.jpg")
+            Image.new("RGB", (32, 32), (40 * item_idx, 40 * photo_idx, 120)).save(path, "JPEG")
+            item["photos"].append({"path": path})
+        queue.append(item)
+    return queue
+
+
+def make_processor(server, provider, state_path):
+    """Create a batch processor as a fresh run would"""
+    config = ApiConfig(api_key="test-key", api_url=server.url + API_PATHS[provider],
+                       delay=0, cache_path=":memory:")
+    return BatchProcessor(LLMApiClient(config), state_path, generate_final=False,
+                          log=lambda message: None, poll_interval=0.2)
+
+
+def check_batch_resume(provider):
+    """Interrupt a batch run, resume it and check the results"""
+    work_dir = tempfile.mkdtemp()
+    server = BatchStandInServer(delay=1.0).start()
+    try:
+        queue = make_queue(work_dir)
+        state_path = get_batch_state_path(os.path.join(work_dir, "queue.json"))
+
+        # First run: stop after the first status check, while the batch is still running
+        processor = make_processor(server, provider, state_path)
+        polls = []
+        result = processor.run(queue, find_unprocessed_photos(queue),
+                               report_progress=lambda current, total, message: polls.append(message),
+                               check_cancelled=lambda: bool(polls))
+        processor.close()
+
+        assert result["pending"], "interrupted run should leave the batch pending"
+        assert os.path.exists(state_path), "interrupted run should keep the state file"
+        assert len(server.batches) == 1, f"expected 1 submitted batch, got {len(server.batches)}"
+        assert not any(photo.get("processed") for item in queue for photo in item["photos"]), \
+            "no photo should be processed before the batch finished"
+        batch_id = next(iter(server.batches))
+
+        # Second run: a new processor picks up the batch from the state file
+        processor = make_processor(server, provider, state_path)
+        result = processor.run(queue, find_unprocessed_photos(queue))
+        processor.close()
+
+        assert len(server.batches) == 1, "resumed run should not submit the photos again"
+        submitted = [custom_id for custom_id, _ in server.batches[batch_id]["requests"]]
+        assert len(submitted) == len(set(submitted)) == 4, f"unexpected batch requests: {submitted}"
+        assert not result["pending"] and result["processed"] == 4 and result["failed"] == 0, result
+        assert not os.path.exists(state_path), "state file should be removed once reconciled"
+        for item in queue:
+            for photo in item["photos"]:
+                api_result = photo.get("api_result") or {}
+                assert photo.get("processed"), f"photo not processed: {photo['path']}"
+                assert api_result.get("response"), f"photo has no response: {photo['path']}"
+                assert api_result.get("batch_id") == batch_id, f"photo not from the batch: {photo['path']}"
+            assert item.get("processed"), f"item not completed: {item['sku']}"
+    finally:
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_batch_resume():
+    for provider in API_PATHS:
+        check_batch_resume(provider)
+
+
+if __name__ == "__main__":
+    print("Testing batch resume...")
+    print("=" * 50)
+    failures = 0
+    for provider in API_PATHS:
+        try:
+            check_batch_resume(provider)
+            print(f"   ✅ {provider}: interrupted batch resumed and reconciled")
+        except AssertionError as e:
+            failures += 1
+            print(f"   ❌ {provider}: {e}")
+    print("\n" + "=" * 50)
+    print("Test completed!")
+    sys.exit(1 if failures else 0)
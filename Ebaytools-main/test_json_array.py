@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the incremental queue array parser
+
+Checks that iter_json_array yields the same elements as json.loads for valid
+queue documents read at every chunk size, and that it rejects the malformed
+arrays json.loads rejects instead of silently skipping over them.
+"""
+import io
+import os
+import sys
+import json
+
+# Add the ebay_tools to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ebay_tools'))
+
+from ebay_tools.core.schema import iter_json_array
+
+VALID_DOCUMENTS = [
+    '[]',
+    ' \r\n[ ]\r\n ',
+    '[1]',
+    '[12345, -6.5e3, 0]',
+    '[true, false, null, "text"]',
+    '[{"sku": "SKU1", "photos": [{"path": "a, b].jpg"}]}, {"sku": "SKU2", "price": 19.99}]',
+    '[\n  {"sku": "SKU1"},\n  [1, [2, [3]]],\n  "\\u00e9\\"]"\n]\n',
+]
+
+MALFORMED_DOCUMENTS = [
+    '',
+    '   ',
+    '{"sku": "SKU1"}',
+    '[',
+    '[1',
+    '[1,',
+    '[,]',
+    '[,1]',
+    '[1,]',
+    '[1,,2]',
+    '[1 2]',
+    '[{"a": 1} {"b": 2}]',
+    '[1]]',
+    '[1] [2]',
+    '[1] x',
+    '[1}',
+    '[tru]',
+]
+
+
+def parse(document, chunk_size):
+    """Parse a document with iter_json_array at the given chunk size"""
+    return list(iter_json_array(io.StringIO(document), chunk_size=chunk_size))
+
+
+def check_round_trips():
+    """Valid documents parse like json.loads at every chunk boundary"""
+    for document in VALID_DOCUMENTS:
+        expected = json.loads(document)
+        for chunk_size in range(1, len(document) + 2):
+            result = parse(document, chunk_size)
+            assert result == expected, \
+                f"{document!r} at chunk size {chunk_size}: got {result!r}, expected {expected!r}"
+
+
+def check_malformed():
+    """Malformed documents raise ValueError at every chunk boundary"""
+    for document in MALFORMED_DOCUMENTS:
+        for chunk_size in range(1, len(document) + 2):
+            try:
+                result = parse(document, chunk_size)
+            except ValueError:
+                continue
+            raise AssertionError(f"{document!r} at chunk size {chunk_size} parsed as {result!r}")
+
+
+def test_round_trips():
+    check_round_trips()
+
+
+def test_malformed():
+    check_malformed()
+
+
+if __name__ == "__main__":
+    print("Testing incremental queue parsing...")
+    print("=" * 50)
+    failures = 0
+    for name, check in (("valid arrays round-trip", check_round_trips),
+                        ("malformed arrays rejected", check_malformed)):
+        try:
+            check()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            failures += 1
+            print(f"   ❌ {name}: {e}")
+    print("\n" + "=" * 50)
+    print("Test completed!")
+    sys.exit(1 if failures else 0)